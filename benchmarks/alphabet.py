@@ -0,0 +1,45 @@
+"""Compare DFA.minimize, DFA.equivalent_hopcroft_karp and DFA.product with
+and without alphabet compression on random automata over bytes whose
+symbols fall into few classes that act identically.
+
+Usage: python benchmarks/alphabet.py [num_states] [num_classes]
+"""
+
+import sys
+from pyform.bench.generators import permuted
+from pyform.bench.generators import random_dfa
+from pyform.bench.runner import timed
+
+def main(num_states=2000, num_classes=8):
+
+    classes = {b : b % num_classes for b in range(256)}
+    dfa     = random_dfa(num_states, num_classes,
+                         density=0.9).expand_alphabet(classes)
+    copy    = permuted(dfa)
+
+    # the operands of the product are smaller, since the product has up to
+    # 256 transitions per pair of states
+
+    left    = random_dfa(num_states // 10, num_classes, density=0.9,
+                         seed=1).expand_alphabet(classes)
+    right   = random_dfa(20, num_classes, density=0.9,
+                         seed=2).expand_alphabet(classes)
+
+    (reduced, _), elapsed = timed(dfa.compress_alphabet)
+    print('%-40s %9.3fs %6d classes' % ('compress_alphabet', elapsed,
+                                        len(reduced.sigma)))
+
+    for compress in (False, True):
+        suffix = ' (compressed)' if compress else ''
+        for name, f in (
+                ('minimize', lambda: dfa.minimize(compress=compress)),
+                ('equivalent_hopcroft_karp', lambda:
+                    dfa.equivalent_hopcroft_karp(copy, compress=compress)),
+                ('product', lambda: left.product(
+                    right, lambda a, b: a and b, compress=compress))):
+            _, elapsed = timed(f)
+            print('%-40s %9.3fs' % (name + suffix, elapsed))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,47 @@
+"""Compare memory consumption and running time of the nested dictionary and
+array-backed (CompactDFA) representations of random complete automata.
+
+Usage: python benchmarks/compact.py [num_states] [num_symbols]
+"""
+
+import sys
+import tracemalloc
+from pyform.automaton.compact import CompactDFA
+from pyform.bench.generators import random_complete
+from pyform.bench.runner import timed
+
+def traced(f):
+
+    tracemalloc.start()
+    result  = f()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+def main(num_states=100000, num_symbols=8):
+
+    dfa, peak = traced(lambda: random_complete(num_states, num_symbols))
+    print('%-32s %14d bytes' % ('dict construction (peak)', peak))
+
+    compact, peak = traced(lambda: CompactDFA.from_dfa(dfa))
+    print('%-32s %14d bytes' % ('compact conversion (peak)', peak))
+    print('%-32s %14d bytes' % ('compact table', compact.nbytes()))
+
+    for name, automaton in (('dict', dfa), ('compact', compact)):
+        _, elapsed = timed(lambda: sum(1 for _ in automaton.iterate()))
+        print('%-32s %13.3fs' % (name + ' iterate', elapsed))
+
+        minimal, elapsed = timed(automaton.minimize_valmari)
+        print('%-32s %13.3fs' % (name + ' minimize_valmari', elapsed))
+
+        other = minimal if automaton is dfa else minimal.compact()
+        _, elapsed = timed(lambda: automaton.equivalent_hopcroft_karp(other))
+        print('%-32s %13.3fs' % (name + ' equivalent_hopcroft_karp', elapsed))
+
+        _, elapsed = timed(
+            lambda: other.product(other, lambda a, b: a and not b))
+        print('%-32s %13.3fs' % (name + ' product', elapsed))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
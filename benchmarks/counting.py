@@ -0,0 +1,37 @@
+"""Time DFA.count for increasing lengths (int64 steps while counts are small,
+Python integers afterwards) against a dictionary-based dynamic program, and
+DFA.enumerate on a random partial automaton.
+
+Usage: python benchmarks/counting.py [num_states] [num_symbols] [num_words]
+"""
+
+import sys
+from itertools import islice
+from pyform.bench.generators import random_dfa
+from pyform.bench.runner import timed
+
+def dictionary_count(dfa, n):
+
+    counts = {q : int(q in dfa.finals) for q in dfa.states}
+    for _ in range(n):
+        counts = {q : sum(counts[r] for r in dfa.delta.get(q, {}).values())
+                  for q in dfa.states}
+    return counts[dfa.start]
+
+def main(num_states=2000, num_symbols=4, num_words=100000):
+
+    dfa = random_dfa(num_states, num_symbols, density=0.8)
+
+    for n in (10, 100, 1000, 3000):
+        result, elapsed = timed(lambda: dfa.count(n))
+        _, baseline = timed(lambda: dictionary_count(dfa, n))
+        print('%-24s %9.3fs (dictionary %9.3fs) %6d digits' % (
+            'count(%d)' % n, elapsed, baseline, len(str(result))))
+
+    words, elapsed = timed(lambda: list(islice(dfa.enumerate(), num_words)))
+    print('%-24s %9.3fs %12.0f words/s (up to length %d)' % (
+        'enumerate', elapsed, len(words) / elapsed, len(words[-1])))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
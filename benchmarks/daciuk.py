@@ -0,0 +1,80 @@
+"""Compare the construction of minimal acyclic automata from sorted word
+lists by DFA.from_words (both outputs) with building the trie and
+minimizing it, measuring time and peak resident set size in child
+processes.
+
+Usage: python benchmarks/daciuk.py [num_words] [seed]
+"""
+
+import random
+import resource
+import subprocess
+import sys
+import time
+from pyform.automaton.dfa import DFA
+
+SUFFIXES = ['', 's', 'ed', 'ing', 'er', 'ers', 'ly', 'ness']
+
+def peak():
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss << 10
+
+def words(num_words, seed=0):
+
+    """Sorted list of distinct random words with shared suffixes."""
+
+    rng   = random.Random(seed)
+    stems = set()
+    while len(stems) * len(SUFFIXES) < num_words:
+        stems.add(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz')
+                          for _ in range(rng.randrange(3, 10))))
+    return sorted(stem + suffix for stem in sorted(stems)
+                  for suffix in SUFFIXES if rng.random() < 0.8)
+
+def trie(words):
+
+    delta, finals = {0 : {}}, set()
+    for word in words:
+        q = 0
+        for a in word:
+            if a not in delta[q]:
+                delta[q][a] = len(delta)
+                delta[len(delta)] = {}
+            q = delta[q][a]
+        finals.add(q)
+
+    return DFA(
+        states = set(delta),
+        finals = finals,
+        start  = 0,
+        sigma  = set(a for q in delta for a in delta[q]),
+        delta  = delta
+    )
+
+def child(method, num_words, seed):
+
+    data   = words(num_words, seed)
+    before = peak()
+    begin  = time.perf_counter()
+    if method == 'from_words':
+        result = DFA.from_words(data)
+    elif method == 'compact':
+        result = DFA.from_words(data, compact=True)
+    else:
+        result = trie(data).minimize_valmari()
+    print('%-12s %9.3fs %10d states %8.1f MB peak RSS growth' % (
+        method, time.perf_counter() - begin, len(result.states),
+        (peak() - before) / 2 ** 20))
+
+def main(num_words=1000000, seed=0):
+
+    for method in ('from_words', 'compact', 'trie'):
+        subprocess.run([sys.executable, __file__, '--child', method,
+                        str(num_words), str(seed)], check=True)
+
+if __name__ == '__main__':
+
+    if sys.argv[1:2] == ['--child']:
+        child(sys.argv[2], *map(int, sys.argv[3:]))
+    else:
+        main(*map(int, sys.argv[1:]))
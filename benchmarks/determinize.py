@@ -0,0 +1,81 @@
+"""Compare the subset construction of NFA.determinize (integer bitsets) with a
+straightforward construction over frozensets on families of automata whose
+minimal DFAs are exponentially larger.
+
+Usage: python benchmarks/determinize.py [n]
+"""
+
+import sys
+from pyform.automaton.dfa import DFA
+from pyform.automaton.nfa import NFA
+from pyform.bench.generators import nth_from_end
+from pyform.bench.runner import timed
+
+def epsilon_chain(n):
+
+    # the same language with an epsilon transition before every step, so
+    # closures have to be folded into transitions
+
+    delta = {0 : {'a' : set([0, 1]), 'b' : set([0])}}
+    for q in range(1, n):
+        delta[q] = {None : set([n + q])}
+        delta[n + q] = {'a' : set([q + 1]), 'b' : set([q + 1])}
+
+    return NFA(set(range(2 * n)), set([n]), set(['a','b']), 0, delta)
+
+def frozenset_determinize(nfa):
+
+    def closure(states):
+
+        result   = set(states)
+        worklist = list(result)
+        while worklist:
+            q = worklist.pop()
+            for r in nfa.delta.get(q, {}).get(None, ()):
+                if r not in result:
+                    result.add(r)
+                    worklist.append(r)
+        return frozenset(result)
+
+    start    = closure([nfa.start])
+    ids      = {start : 0}
+    worklist = [start]
+    delta    = {}
+
+    while worklist:
+        subset = worklist.pop()
+        for a in nfa.sigma:
+            target = closure(
+                r for q in subset
+                for r in nfa.delta.get(q, {}).get(a, ())
+            )
+            if target:
+                if target not in ids:
+                    ids[target] = len(ids)
+                    worklist.append(target)
+                delta.setdefault(ids[subset], {})[a] = ids[target]
+
+    return DFA(
+        states = set(ids.values()),
+        finals = set(i for s, i in ids.items() if s & nfa.finals),
+        start  = 0,
+        sigma  = set(nfa.sigma),
+        delta  = delta
+    )
+
+def main(n=16):
+
+    for family in (nth_from_end, epsilon_chain):
+        nfa = family(n)
+        for name, f in (
+                ('frozenset', lambda: frozenset_determinize(nfa)),
+                ('bitset', nfa.determinize),
+                ('bitset + minimize', lambda: nfa.determinize(True))):
+            dfa, elapsed = timed(f)
+            print('%-40s %8d states %9.3fs' % (
+                '%s(%d) %s' % (family.__name__, n, name), len(dfa.states),
+                elapsed))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
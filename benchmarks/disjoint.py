@@ -0,0 +1,64 @@
+"""Compare DisjointSet and IntDisjointSet on random unions and finds over
+range(num_elems), including the bulk operations of IntDisjointSet, union and
+union_many of IntDisjointSet on the chain of pairs (i, i + 1), and
+DFA.equivalent_hopcroft_karp (which uses IntDisjointSet) on a random
+automaton and its minimal automaton.
+
+Usage: python benchmarks/disjoint.py [num_elems] [num_states]
+"""
+
+import sys
+import numpy as np
+from pyform.bench.generators import random_dfa
+from pyform.bench.runner import timed
+from pyform.common.disjoint import DisjointSet
+from pyform.common.disjoint import IntDisjointSet
+
+def unions(equiv, pairs):
+
+    for i, j in pairs:
+        equiv.union(i, j)
+
+def finds(equiv, items):
+
+    for i in items:
+        equiv.find(i)
+
+def main(num_elems=1000000, num_states=100000):
+
+    rng   = np.random.default_rng(0)
+    pairs = rng.integers(num_elems, size=(num_elems, 2))
+    items = rng.integers(num_elems, size=num_elems)
+
+    for name, equiv in (('DisjointSet', DisjointSet(range(num_elems))),
+                        ('IntDisjointSet', IntDisjointSet(num_elems))):
+        _, elapsed = timed(lambda: unions(equiv, pairs.tolist()))
+        print('%-32s %9.3fs' % (name + '.union', elapsed))
+        _, elapsed = timed(lambda: finds(equiv, items.tolist()))
+        print('%-32s %9.3fs' % (name + '.find', elapsed))
+
+    equiv = IntDisjointSet(num_elems)
+    _, elapsed = timed(lambda: equiv.union_many(pairs))
+    print('%-32s %9.3fs' % ('IntDisjointSet.union_many', elapsed))
+    _, elapsed = timed(lambda: equiv.find_many(items))
+    print('%-32s %9.3fs' % ('IntDisjointSet.find_many', elapsed))
+
+    chain = np.stack([np.arange(num_elems - 1), np.arange(1, num_elems)],
+                     axis=1)
+    equiv = IntDisjointSet(num_elems)
+    _, elapsed = timed(lambda: unions(equiv, chain.tolist()))
+    print('%-32s %9.3fs' % ('IntDisjointSet.union chain', elapsed))
+    equiv = IntDisjointSet(num_elems)
+    _, elapsed = timed(lambda: equiv.union_many(chain))
+    assert equiv.num_equiv == 1
+    print('%-32s %9.3fs' % ('IntDisjointSet.union_many chain', elapsed))
+
+    dfa     = random_dfa(num_states, 4, density=0.9)
+    minimal = dfa.minimize_valmari(engine='numpy')
+    result, elapsed = timed(lambda: dfa.equivalent_hopcroft_karp(minimal))
+    assert result == (True, None)
+    print('%-32s %9.3fs' % ('equivalent_hopcroft_karp', elapsed))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,49 @@
+"""Time DFA.equivalent_hopcroft_karp and measure its peak traced memory on a
+random automaton against an isomorphic copy (equivalent) and against the
+copy with one state's finality flipped (a witness is rebuilt), and compare
+repeated equivalent_hopcroft_karp calls with DFA.equivalent_many.
+
+Usage: python benchmarks/equivalence.py [num_states] [num_symbols] [copies]
+"""
+
+import sys
+import tracemalloc
+from pyform.automaton.dfa import DFA
+from pyform.bench.generators import permuted
+from pyform.bench.generators import random_dfa
+from pyform.bench.runner import timed
+
+def traced(f):
+
+    tracemalloc.start()
+    (result, elapsed) = timed(f)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main(num_states=20000, num_symbols=8, copies=10):
+
+    dfa   = random_dfa(num_states, num_symbols, density=0.9)
+    copy  = permuted(dfa)
+    other = permuted(dfa)
+    other.set_final(max(other.states), max(other.states) not in other.finals)
+
+    for name, f in (
+            ('equivalent', lambda: dfa.equivalent_hopcroft_karp(copy)),
+            ('not equivalent', lambda: dfa.equivalent_hopcroft_karp(other))):
+        (_, witness), elapsed, peak = traced(f)
+        print('%-32s %9.3fs %8.1f MB traced peak %6s witness length' % (
+            name, elapsed, peak / 2 ** 20,
+            '-' if witness is None else len(witness)))
+
+    dfas = [permuted(dfa, seed) for seed in range(copies)]
+    _, elapsed = timed(lambda: [dfa.equivalent_hopcroft_karp(copy)
+                                for copy in dfas])
+    print('%-32s %9.3fs' % ('%d x equivalent_hopcroft_karp' % copies,
+                            elapsed))
+    _, elapsed = timed(lambda: DFA.equivalent_many(dfa, dfas))
+    print('%-32s %9.3fs' % ('equivalent_many', elapsed))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
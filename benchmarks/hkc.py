@@ -0,0 +1,71 @@
+"""Compare NFA.equivalent_hkc and NFA.includes_antichain with determinizing
+both automata and running DFA.equivalent_hopcroft_karp on random NFAs with
+1.25 transitions per state and symbol on average, each against a copy with
+permuted states (equivalent) and against a copy with one transition
+removed (usually inequivalent).
+
+Usage: python benchmarks/hkc.py [num_states ...]
+"""
+
+import random
+import sys
+from pyform.automaton.nfa import NFA
+from pyform.bench.generators import random_nfa
+from pyform.bench.runner import timed
+
+def permuted(nfa, seed=0):
+
+    rng = random.Random(seed)
+    ids = sorted(nfa.states)
+    rng.shuffle(ids)
+
+    return NFA(
+        states = set(ids),
+        finals = set(ids[q] for q in nfa.finals),
+        start  = ids[nfa.start],
+        sigma  = set(nfa.sigma),
+        delta  = {
+            ids[q] : {a : set(ids[r] for r in targets)
+                      for a, targets in row.items()}
+            for q, row in nfa.delta.items()
+        }
+    )
+
+def without(nfa, seed=0):
+
+    (q, a, r) = random.Random(seed).choice(sorted(nfa.iterate()))
+    delta = {p : {b : set(t) for b, t in row.items()}
+             for p, row in nfa.delta.items()}
+    delta[q][a].discard(r)
+
+    return NFA(set(nfa.states), set(nfa.finals), set(nfa.sigma), nfa.start,
+               delta)
+
+def determinized(nfa1, nfa2):
+
+    dfa1 = nfa1.determinize()
+    return dfa1.equivalent_hopcroft_karp(nfa2.determinize())[0], \
+           len(dfa1.states)
+
+def main(*sizes):
+
+    for num_states in sizes or (60, 120, 150):
+        nfa = random_nfa(num_states, 2, density=1.25 / num_states,
+                         seed=num_states)
+        for name, other in (('permuted', permuted(nfa)),
+                            ('without', without(nfa))):
+            label = 'random(%d) %s' % (num_states, name)
+            (result, size), elapsed = timed(lambda: determinized(nfa, other))
+            print('%-28s %-24s %-5s %9.3fs %8d DFA states' % (
+                label, 'determinize + HK', result, elapsed, size))
+            (result, _), elapsed = timed(lambda: nfa.equivalent_hkc(other))
+            print('%-28s %-24s %-5s %9.3fs' % (
+                label, 'equivalent_hkc', result, elapsed))
+            (result, _), elapsed = timed(
+                lambda: nfa.includes_antichain(other))
+            print('%-28s %-24s %-5s %9.3fs' % (
+                label, 'includes_antichain', result, elapsed))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,42 @@
+"""Compare full determinization with the lazy DFA (LazyDFA) on automata for
+"the n-th symbol from the end is a", whose DFAs have 2^n states, for inputs
+that visit few of them. Reports running times and cache counters for both
+eviction policies and several capacities.
+
+Usage: python benchmarks/lazy.py [n] [length] [density]
+"""
+
+import random
+import sys
+from pyform.automaton.lazy import LazyDFA
+from pyform.bench.generators import nth_from_end
+from pyform.bench.runner import timed
+
+def main(n=24, length=1000000, density=0.01):
+
+    # sparse occurrences of a keep the number of visited subsets small
+
+    rng  = random.Random(0)
+    text = ''.join('a' if rng.random() < density else 'b'
+                   for _ in range(length))
+    nfa  = nth_from_end(n)
+
+    if n <= 16:
+        dfa, elapsed = timed(nfa.determinize)
+        print('%-32s %9.3fs %8d states' % ('determinize', elapsed,
+                                            len(dfa.states)))
+        _, elapsed = timed(lambda: dfa.accepts(text))
+        print('%-32s %9.3fs' % ('dfa accepts', elapsed))
+
+    for eviction in ('flush', 'lru'):
+        for capacity in (1 << 8, 1 << 12, 1 << 16):
+            lazy = LazyDFA.from_nfa(nfa, capacity, eviction)
+            _, elapsed = timed(lambda: lazy.accepts(text))
+            print('%-32s %9.3fs %8d hits %8d misses %8d evictions' % (
+                'lazy %s %d' % (eviction, capacity), elapsed, lazy.hits,
+                lazy.misses, lazy.evictions))
+
+if __name__ == '__main__':
+
+    args = sys.argv[1:]
+    main(*[int(arg) for arg in args[:2]] + [float(arg) for arg in args[2:]])
@@ -0,0 +1,141 @@
+"""Measure the peak resident set size of DFA.minimize_valmari (both engines)
+and of a Partition of the transitions (cords) on random partial automata,
+with the current Partition and with a baseline copy of the list-based
+Partition it replaced (ListPartition: Python lists and an attribute
+dictionary, 64-bit arrays in from_keys and no shared mark buffers). Every
+measurement runs in a fresh child process and reports its peak RSS and the
+growth of the peak during the measured step.
+
+Usage: python benchmarks/memory.py [num_states] [num_symbols]
+"""
+
+import resource
+import subprocess
+import sys
+import time
+import numpy as np
+from pyform.automaton import dfa as dfa_module
+from pyform.bench.generators import random_dfa
+from pyform.common.partition import Partition
+from pyform.common.partition import typed_array
+
+class ListPartition(Partition):
+
+    # the constructors of Partition before typed arrays and __slots__ (the
+    # buffers argument is ignored, so every partition has its own marked and
+    # touched arrays)
+
+    def __init__(self, count, key=None, buffers=None):
+
+        self.elements    = list(range(count))
+        self.location    = list(range(count))
+        self.first       = [0] * count
+        self.past        = [0] * count
+        self.setof       = [0] * count
+        self.marked      = [0] * count + [0]
+        self.touched     = [0] * count + [0]
+        self.num_touched = 0
+
+        if not (count and key):
+            self.size = int(bool(count))
+            if self.size:
+                self.past[0] = count
+            return
+
+        self.size = 0
+        self.elements.sort(key=key)
+
+        partition = key(self.elements[0])
+        for i in range(count):
+            element = self.elements[i]
+            current = key(element)
+            if partition != current:
+                partition = current
+                self.past[self.size]  = i
+                self.size += 1
+                self.first[self.size] = i
+            self.setof[element]    = self.size
+            self.location[element] = i
+
+        self.past[self.size] = count
+        self.size += 1
+
+    @classmethod
+    def from_keys(cls, keys, buffers=None):
+
+        keys  = np.asarray(keys, dtype=np.int64)
+        count = len(keys)
+        valid = int(np.count_nonzero(keys >= 0))
+        order = np.argsort(np.where(keys < 0, np.iinfo(np.int64).max, keys),
+                           kind='stable')
+
+        bounds = np.flatnonzero(np.diff(keys[order[:valid]])) + 1
+        size   = len(bounds) + 1 if valid else 0
+
+        partition = cls.__new__(cls)
+        partition.size        = size
+        partition.num_touched = 0
+
+        partition.elements, elements = typed_array(count)
+        partition.location, location = typed_array(count)
+        partition.setof,    setof    = typed_array(count)
+        partition.first,    first    = typed_array(count)
+        partition.past,     past     = typed_array(count)
+        partition.marked,   _        = typed_array(count + 1)
+        partition.touched,  _        = typed_array(count + 1)
+
+        elements[:]     = order
+        location[order] = np.arange(count)
+
+        if size:
+            first[1:size]        = bounds
+            past[:size - 1]      = bounds
+            past[size - 1]       = valid
+            setof[order[:valid]] = np.repeat(np.arange(size),
+                                             past[:size] - first[:size])
+
+        return partition
+
+VARIANTS = {'arrays' : Partition, 'lists' : ListPartition}
+
+def peak():
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss << 10
+
+def child(task, variant, num_states, num_symbols):
+
+    partition = VARIANTS[variant]
+    dfa_module.Partition = partition
+
+    dfa = random_dfa(num_states, num_symbols, density=0.9)
+    if task == 'cords':
+        labels = [a for q, a, r in dfa.iterate()]
+        before = peak()
+        begin  = time.perf_counter()
+        partition(len(labels), labels.__getitem__)
+        detail = '%8.1f bytes per transition' % (
+            (peak() - before) / len(labels))
+    else:
+        before = peak()
+        begin  = time.perf_counter()
+        result = dfa.minimize_valmari(engine=task)
+        detail = '%8d states' % len(result.states)
+
+    print('%-8s %-8s %8.3fs %8.1f MB peak RSS %8.1f MB growth %s' % (
+        task, variant, time.perf_counter() - begin, peak() / 2 ** 20,
+        (peak() - before) / 2 ** 20, detail))
+
+def main(num_states=200000, num_symbols=4):
+
+    for task in ('cords', 'python', 'numpy'):
+        for variant in ('lists', 'arrays'):
+            subprocess.run([sys.executable, __file__, '--child', task,
+                            variant, str(num_states), str(num_symbols)],
+                           check=True)
+
+if __name__ == '__main__':
+
+    if sys.argv[1:2] == ['--child']:
+        child(sys.argv[2], sys.argv[3], *map(int, sys.argv[4:]))
+    else:
+        main(*map(int, sys.argv[1:]))
@@ -0,0 +1,31 @@
+"""Compare the minimization strategies of DFA.minimize on random complete and
+partial automata of various sizes and alphabets.
+
+Usage: python benchmarks/minimize.py
+"""
+
+import time
+from pyform.bench.generators import random_dfa
+
+def main():
+
+    strategies = ('valmari', 'hopcroft', 'moore')
+    print('%8s %8s %8s' % ('states', 'symbols', 'density') +
+          ''.join('%10s' % s for s in strategies) + '%10s' % 'auto')
+
+    for num_states in (10, 100, 1000, 10000):
+        for num_symbols in (2, 8):
+            for density in (1.0, 0.5):
+                dfa = random_dfa(num_states, num_symbols, density)
+                row = '%8d %8d %8.1f' % (num_states, num_symbols, density)
+                for strategy in strategies + ('auto',):
+                    repeat = max(1, 1000 // num_states)
+                    begin  = time.perf_counter()
+                    for _ in range(repeat):
+                        dfa.minimize(strategy)
+                    row += '%9.4fs' % ((time.perf_counter() - begin) / repeat)
+                print(row)
+
+if __name__ == '__main__':
+
+    main()
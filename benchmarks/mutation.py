@@ -0,0 +1,74 @@
+"""Compare incremental maintenance of the accessible and coaccessible states
+of a DFA under random edits (DFA.add_transition, DFA.remove_transition and
+DFA.set_final) with recomputation from scratch.
+
+Usage: python benchmarks/mutation.py [num_states] [num_symbols] [num_edits]
+"""
+
+import random
+import sys
+from pyform.automaton.dfa import DFA
+from pyform.bench.generators import random_dfa
+from pyform.bench.runner import timed
+
+def edit(dfa, rng):
+
+    """Apply a random edit to dfa."""
+
+    states = len(dfa.states)
+    choice = rng.random()
+    if choice < 0.45:
+        dfa.add_transition(rng.randrange(states),
+                           rng.choice(sorted(dfa.sigma)),
+                           rng.randrange(states))
+    elif choice < 0.9:
+        q = rng.randrange(states)
+        while q not in dfa.delta:
+            q = rng.randrange(states)
+        dfa.remove_transition(q, rng.choice(list(dfa.delta[q])))
+    else:
+        dfa.set_final(rng.randrange(states), rng.random() < 0.5)
+
+def query(dfa):
+
+    return len(dfa.accessible()), len(dfa.coaccessible())
+
+def fresh(dfa):
+
+    return DFA(
+        states = set(dfa.states),
+        finals = set(dfa.finals),
+        start  = dfa.start,
+        sigma  = set(dfa.sigma),
+        delta  = {q : dict(m) for q, m in dfa.delta.items()}
+    )
+
+def main(num_states=100000, num_symbols=4, num_edits=1000):
+
+    dfa = random_dfa(num_states, num_symbols, density=0.9)
+    _, elapsed = timed(lambda: query(dfa))
+    print('%-32s %9.3fs' % ('initial query', elapsed))
+
+    rng = random.Random(1)
+    def incremental():
+        for _ in range(num_edits):
+            edit(dfa, rng)
+            query(dfa)
+    _, elapsed = timed(incremental)
+    print('%-32s %9.3fs %9.6fs per edit' % ('incremental', elapsed,
+                                            elapsed / num_edits))
+
+    # recomputation from scratch is timed on a few edits only
+
+    rebuilds = max(1, num_edits // 100)
+    def scratch():
+        for _ in range(rebuilds):
+            edit(dfa, rng)
+            query(fresh(dfa))
+    _, elapsed = timed(scratch)
+    print('%-32s %9.3fs %9.6fs per edit' % ('from scratch', elapsed,
+                                            elapsed / rebuilds))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,43 @@
+"""Measure the scaling of DFA.scan_parallel with the number of workers on a
+random file, against a sequential scan with StreamMatcher.
+
+Usage: python benchmarks/parallel.py [num_bytes] [num_states]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pyform.bench.generators import random_complete
+from pyform.automaton.stream import StreamMatcher
+
+def main(num_bytes=1 << 26, num_states=16):
+
+    dfa = random_complete(num_states, range(256)).minimize_valmari()
+    print('minimized states: %d' % len(dfa.states))
+
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(os.urandom(num_bytes))
+
+    try:
+        matcher = StreamMatcher(dfa)
+        begin = time.perf_counter()
+        matcher.scan(f.name)
+        baseline = time.perf_counter() - begin
+        print('%-12s %8.3fs' % ('sequential', baseline))
+
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            begin = time.perf_counter()
+            state = dfa.scan_parallel(f.name, workers=workers)
+            elapsed = time.perf_counter() - begin
+            assert state == matcher.state
+            print('%-12s %8.3fs %8.2fx' % (
+                '%d workers' % workers, elapsed, baseline / elapsed))
+            workers *= 2
+    finally:
+        os.unlink(f.name)
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
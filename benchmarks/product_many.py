@@ -0,0 +1,59 @@
+"""Compare the peak intermediate state count and running time of chained
+pairwise products (minimized after every step) with DFA.product_many on the
+intersection and union of random automata.
+
+Usage: python benchmarks/product_many.py [num_dfas] [num_states] [num_symbols]
+    [workers]
+"""
+
+import functools
+import sys
+import time
+from pyform.automaton.dfa import DFA
+from pyform.bench.generators import random_dfa
+
+def apply(f, *bits):
+
+    # picklable form of f(bits) for workers
+
+    return f(bits)
+
+def chained(dfas, f):
+
+    # combine left to right, tracking the largest intermediate product
+
+    result = dfas[0]
+    peak   = len(result.states)
+    for dfa in dfas[1:]:
+        result = result.product(dfa, f)
+        peak   = max(peak, len(result.states))
+        result = result.minimize()
+    return result, peak
+
+def main(num_dfas=20, num_states=8, num_symbols=4, workers=0):
+
+    dfas = [random_dfa(num_states, num_symbols, density=0.8,
+                       final_ratio=0.1, seed=seed) for seed in
+            range(num_dfas)]
+
+    for name, f, g in (('intersection', all, lambda a, b: a and b),
+                       ('union', any, lambda a, b: a or b)):
+        begin = time.perf_counter()
+        result, peak = chained(dfas, g)
+        print('%-32s %8d states %8d peak %9.3fs' % (
+            name + ' chained', len(result.states), peak,
+            time.perf_counter() - begin))
+
+        steps  = []
+        begin  = time.perf_counter()
+        result = DFA.product_many(dfas, functools.partial(apply, f),
+                                  workers=workers or None, steps=steps,
+                                  monotone=True)
+        print('%-32s %8d states %8d peak %9.3fs' % (
+            name + ' product_many', len(result.states),
+            max(step.states for step in steps),
+            time.perf_counter() - begin))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
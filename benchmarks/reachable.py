@@ -0,0 +1,64 @@
+"""Compare DFA.reachable, DFA.productive and DFA.trim (on the first call,
+which builds the cached adjacency indexes, and on repeated calls) with
+traversals of the nested dictionaries on random automata and chains.
+
+Usage: python benchmarks/reachable.py [num_states] [num_symbols]
+"""
+
+import sys
+from pyform.bench.generators import chain
+from pyform.bench.generators import random_dfa
+from pyform.bench.runner import timed
+
+def traverse(dfa):
+
+    """States reachable from the start state and productive states by search
+    over the dictionaries (the reverse map is rebuilt per call)."""
+
+    inverse = {}
+    for q, a, r in dfa.iterate():
+        if r not in inverse:
+            inverse[r] = []
+        inverse[r].append(q)
+
+    reached  = set([dfa.start])
+    worklist = [dfa.start]
+    while worklist:
+        for r in dfa.delta.get(worklist.pop(), {}).values():
+            if r not in reached:
+                reached.add(r)
+                worklist.append(r)
+
+    useful   = set(dfa.finals)
+    worklist = list(useful)
+    while worklist:
+        for q in inverse.get(worklist.pop(), ()):
+            if q not in useful:
+                useful.add(q)
+                worklist.append(q)
+
+    return reached, useful
+
+def main(num_states=1000000, num_symbols=2):
+
+    automata = (
+        ('random', random_dfa(num_states, num_symbols, density=0.9)),
+        ('chain', chain(num_states, num_symbols)),
+    )
+
+    for name, dfa in automata:
+        _, elapsed = timed(lambda: traverse(dfa))
+        print('%-8s %-28s %9.3fs' % (name, 'dictionaries', elapsed))
+        for label in ('first', 'cached'):
+            _, elapsed = timed(lambda: dfa.reachable([dfa.start], dfa.sigma))
+            print('%-8s %-28s %9.3fs' % (name, 'reachable (%s)' % label,
+                                         elapsed))
+            _, elapsed = timed(lambda: dfa.productive(dfa.finals, dfa.sigma))
+            print('%-8s %-28s %9.3fs' % (name, 'productive (%s)' % label,
+                                         elapsed))
+        _, elapsed = timed(dfa.trim)
+        print('%-8s %-28s %9.3fs' % (name, 'trim (cached)', elapsed))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,33 @@
+"""Measure compile times of regular expressions with large character classes
+over an alphabet of Unicode characters, cold and from the compiled-pattern
+cache (which includes copying the cached automaton).
+
+Usage: python benchmarks/regex.py [alphabet_size]
+"""
+
+import sys
+from pyform import regex
+from pyform.bench.runner import timed
+
+PATTERNS = [
+    '[a-z]+@[a-z]+\\.(com|org)',
+    '[^a]*a[^a]{4}',
+    '.*[Ā-῿]{3}.*',
+    '([Ѐ-ӿ]|[԰-֏])+[0-9]{2,4}',
+    '(.[^　-ヿ]){1,8}',
+]
+
+def main(alphabet_size=1 << 14):
+
+    alphabet = frozenset(map(chr, range(alphabet_size)))
+
+    for pattern in PATTERNS:
+        regex.cache_clear()
+        dfa, cold = timed(lambda: regex.compile(pattern, alphabet))
+        _, warm   = timed(lambda: regex.compile(pattern, alphabet))
+        print('%-48s %6d states %9.3fs cold %9.6fs cached' % (
+            ascii(pattern), len(dfa.states), cold, warm))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,35 @@
+"""Compare running a random automaton on many words with a Python loop over
+the nested dictionary transition function and with DFA.accepts_many.
+
+Usage: python benchmarks/run_many.py [num_words] [max_length]
+"""
+
+import random
+import sys
+import time
+from pyform.bench.generators import random_complete
+
+def main(num_words=100000, max_length=64):
+
+    rng   = random.Random(1)
+    dfa   = random_complete(1000, 'abcdefgh')
+    words = [
+        ''.join(rng.choice('abcdefgh')
+                for _ in range(rng.randrange(max_length)))
+        for _ in range(num_words)
+    ]
+
+    begin    = time.perf_counter()
+    expected = [dfa.accepts(word) for word in words]
+    print('%-24s %8.3fs' % ('python loop', time.perf_counter() - begin))
+
+    dfa.compact()
+    begin  = time.perf_counter()
+    result = dfa.accepts_many(words)
+    print('%-24s %8.3fs' % ('accepts_many', time.perf_counter() - begin))
+
+    assert result.tolist() == expected
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
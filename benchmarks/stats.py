@@ -0,0 +1,54 @@
+"""Compare the times of DFA.minimize_valmari and DFA.equivalent_hopcroft_karp
+with and without statistics on a random partial automaton, and print the
+collected statistics.
+
+Usage: python benchmarks/stats.py [num_states] [num_symbols] [repeat]
+"""
+
+import sys
+import time
+from pyform.bench.generators import random_dfa
+from pyform.common.stats import Stats
+
+def timed(f, repeat):
+
+    best = None
+    for _ in range(repeat):
+        begin   = time.perf_counter()
+        f()
+        elapsed = time.perf_counter() - begin
+        best    = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main(num_states=100000, num_symbols=4, repeat=3):
+
+    dfa     = random_dfa(num_states, num_symbols, density=0.9)
+    minimal = dfa.minimize_valmari()
+
+    operations = (
+        ('minimize_valmari (python)',
+         lambda stats: dfa.minimize_valmari('python', stats)),
+        ('minimize_valmari (numpy)',
+         lambda stats: dfa.minimize_valmari('numpy', stats)),
+        ('equivalent_hopcroft_karp',
+         lambda stats: dfa.equivalent_hopcroft_karp(minimal, stats)),
+    )
+
+    for name, operation in operations:
+        disabled = timed(lambda: operation(None), repeat)
+        enabled  = timed(lambda: operation(Stats()), repeat)
+        print('%-28s %9.3fs disabled %9.3fs enabled (%.2fx)' % (
+            name, disabled, enabled, enabled / disabled))
+
+        stats = Stats()
+        operation(stats)
+        for phase, seconds in stats.phases.items():
+            print('    %-24s %9.3fs' % (phase, seconds))
+        for counter, count in sorted(stats.counters.items()):
+            print('    %-24s %10d' % (counter, count))
+        for peak, size in sorted(stats.peaks.items()):
+            print('    %-24s %10d (peak)' % (peak, size))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
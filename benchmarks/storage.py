@@ -0,0 +1,45 @@
+"""Compare loading times of random automata from the binary format (DFA.load,
+memory-mapped and read into memory) and from pickles.
+
+Usage: python benchmarks/storage.py [num_states] [num_symbols]
+"""
+
+import os
+import pickle
+import random
+import sys
+import tempfile
+from pyform.automaton.dfa import DFA
+from pyform.bench.generators import random_complete
+from pyform.bench.runner import timed
+
+def main(num_states=1000000, num_symbols=8):
+
+    dfa  = random_complete(num_states, num_symbols)
+    word = [random.Random(1).randrange(num_symbols) for _ in range(1000)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dfa.bin')
+        _, elapsed = timed(lambda: dfa.save(path))
+        print('%-32s %9.3fs %12d bytes' % ('save', elapsed,
+                                            os.path.getsize(path)))
+
+        pickled = os.path.join(directory, 'dfa.pickle')
+        with open(pickled, 'wb') as f:
+            _, elapsed = timed(lambda: pickle.dump(dfa, f))
+        print('%-32s %9.3fs %12d bytes' % ('pickle dump', elapsed,
+                                            os.path.getsize(pickled)))
+
+        for name, load in (
+                ('load (mmap)', lambda: DFA.load(path)),
+                ('load (read)', lambda: DFA.load(path, mmap=False)),
+                ('pickle load', lambda: pickle.load(open(pickled, 'rb')))):
+            loaded, elapsed = timed(load)
+            print('%-32s %9.3fs' % (name, elapsed))
+            _, elapsed = timed(lambda: loaded.accepts(word))
+            print('%-32s %9.3fs' % (name + ' + accepts', elapsed))
+            del loaded
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,33 @@
+"""Measure the throughput of StreamMatcher on a random file scanned with the
+byte table and with symbol lookup.
+
+Usage: python benchmarks/stream.py [num_bytes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pyform.bench.generators import random_complete
+from pyform.automaton.stream import StreamMatcher
+
+def main(num_bytes=1 << 24):
+
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(os.urandom(num_bytes))
+
+    try:
+        for name, symbols in (('byte table', range(256)),
+                              ('symbol lookup', range(-1, 256))):
+            matcher = StreamMatcher(random_complete(100, list(symbols)))
+            begin = time.perf_counter()
+            matcher.scan(f.name)
+            elapsed = time.perf_counter() - begin
+            print('%-16s %8.3fs %8.1f MB/s' % (
+                name, elapsed, num_bytes / elapsed / 2 ** 20))
+    finally:
+        os.unlink(f.name)
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""Time RangeDFA.run on ASCII and CJK text (table and binary search lookups)
+and RangeDFA.minimize, RangeDFA.product and RangeDFA.equivalent on random
+range-labelled automata over the Unicode code points.
+
+Usage: python benchmarks/symbolic.py [num_states] [num_ranges] [length]
+"""
+
+import random
+import sys
+from pyform.automaton.symbolic import RangeDFA
+from pyform.automaton.symbolic import boundaries
+from pyform.bench.runner import timed
+
+def random_range_dfa(num_states, num_ranges, seed=0):
+
+    """Random automaton whose states have num_ranges ranges each, with cuts
+    drawn from ASCII and the CJK ideographs."""
+
+    rng   = random.Random(seed)
+    cuts  = list(range(128)) + list(range(0x4e00, 0xa000, 16))
+    delta = {}
+    for q in range(num_states):
+        points   = sorted(rng.sample(cuts, 2 * num_ranges))
+        delta[q] = [(lo, hi, rng.randrange(num_states))
+                    for lo, hi in zip(points[::2], points[1::2])]
+
+    return RangeDFA(
+        states = set(range(num_states)),
+        finals = set(q for q in range(num_states) if rng.random() < 0.5),
+        start  = 0,
+        delta  = delta
+    )
+
+def main(num_states=2000, num_ranges=16, length=1000000):
+
+    dfa   = random_range_dfa(num_states, num_ranges)
+    other = random_range_dfa(num_states // 10, num_ranges, seed=1)
+    rng   = random.Random(2)
+
+    # words that never leave the automaton, drawn from its ranges
+
+    for name, low in (('ascii', True), ('cjk', False)):
+        word, state = [], dfa.start
+        while len(word) < length:
+            row = [(lo, hi, r) for lo, hi, r in dfa.delta[state]
+                   if (hi < 128) == low] or dfa.delta[state]
+            lo, hi, state = rng.choice(row)
+            word.append(rng.randint(lo, hi))
+        _, elapsed = timed(lambda: dfa.run(word))
+        print('%-24s %9.3fs %12.0f symbols/s' % ('run (%s)' % name, elapsed,
+                                                length / elapsed))
+
+    print('%-24s %9d' % ('elementary intervals', len(boundaries([dfa])) - 1))
+    for name, f in (
+            ('minimize', dfa.minimize),
+            ('product', lambda: dfa.product(other, lambda a, b: a and b)),
+            ('equivalent', lambda: dfa.equivalent(dfa.minimize()))):
+        _, elapsed = timed(f)
+        print('%-24s %9.3fs' % (name, elapsed))
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
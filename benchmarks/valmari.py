@@ -0,0 +1,27 @@
+"""Compare the python and numpy engines of DFA.minimize_valmari on random
+partial automata.
+
+Usage: python benchmarks/valmari.py [num_states] [num_symbols]
+"""
+
+import sys
+import time
+from pyform.bench.generators import random_dfa
+
+def main(num_states=100000, num_symbols=8):
+
+    dfa = random_dfa(num_states, num_symbols, density=0.9)
+    results = {}
+
+    for engine in ('python', 'numpy'):
+        begin = time.perf_counter()
+        results[engine] = dfa.minimize_valmari(engine=engine)
+        print('%-8s %8.3fs %10d states' % (
+            engine, time.perf_counter() - begin,
+            len(results[engine].states)))
+
+    assert results['numpy'].isomorphic(results['python']) is not None
+
+if __name__ == '__main__':
+
+    main(*map(int, sys.argv[1:]))
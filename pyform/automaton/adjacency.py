@@ -0,0 +1,545 @@
+import heapq
+import numpy as np
+from array import array
+from collections import deque
+from itertools import repeat
+from pyform.common.alphabet import sort_symbols
+from pyform.common.partition import ranges
+from pyform.common.partition import typed_array
+
+class Adjacency(object):
+
+    """Forward or reverse adjacency index of a DFA in compressed sparse row
+    form, for traversals of the transition graph in O(N + M) time (see
+    DFA.reachable, DFA.productive and DFA.trim). The index is built once per
+    direction and cached by DFA.adjacency.
+
+    States are renumbered to state ids in sorted order (the identity if the
+    states are range(n)) and symbols to symbol ids in sorted order (see
+    sort_symbols). The edges of state id i are the indices offset[i] to
+    offset[i + 1] - 1 of targets and labels: targets[j] is the state id at
+    the other end of the edge and labels[j] its symbol id. In the forward
+    index the edges of a state are its outgoing transitions, in the reverse
+    index its incoming transitions, so every predecessor of a state on every
+    symbol is recorded. As in ValmariState.make_adjacent, the edges are
+    grouped by a stable counting sort.
+
+    The index is updated in place when the DFA is modified (see add, remove
+    and add_state). Removed edges keep their places with label -1, added
+    edges are stored in extra and added states and symbols receive the next
+    free ids. Once the edits outnumber a fraction REBUILD of the edges the
+    index is stale and DFA.adjacency rebuilds it, so updates take amortized
+    constant time besides the scan of the row of a removed edge.
+
+    Attributes:
+        names       : Sorted NumPy array of states (state ids to states).
+        identity    : Boolean indicating whether state ids are states.
+        symbols     : List mapping symbol ids to symbols.
+        index       : Dictionary mapping symbols to symbol ids.
+        forwards    : Boolean indicating whether the index is forward.
+        offset      : Array of offsets into targets and labels.
+        targets     : Array of state ids.
+        labels      : Array of symbol ids (-1 for removed edges).
+        extra       : Dictionary mapping state ids to lists of pairs (target,
+            label) of added edges.
+        extra_names : List of added states (state ids len(names) onwards).
+        extra_ids   : Dictionary mapping added states to state ids.
+        num_edits   : Number of edits since the index was built.
+    """
+
+    # frontiers smaller than this are expanded without NumPy
+
+    FRONTIER = 64
+
+    # the index is stale after more than REBUILD * M + 64 edits
+
+    REBUILD = 0.25
+
+    def __init__(self, dfa, forwards=True):
+
+        self.forwards = forwards
+        self.symbols  = sort_symbols(dfa.sigma)
+        self.index    = {a : i for i, a in enumerate(self.symbols)}
+        self.names    = np.sort(np.fromiter(dfa.states, dtype=np.int64,
+                                            count=len(dfa.states)))
+
+        num_states    = len(self.names)
+        self.identity = not num_states or bool(
+            self.names[0] == 0 and self.names[-1] == num_states - 1)
+
+        self.extra       = {}
+        self.extra_names = []
+        self.extra_ids   = {}
+        self.num_edits   = 0
+
+        tails, labels, heads = array('q'), array('q'), array('q')
+        for q, m in dfa.delta.items():
+            tails.extend(repeat(q, len(m)))
+            labels.extend(map(self.index.__getitem__, m.keys()))
+            heads.extend(m.values())
+
+        sources = self.ids(np.frombuffer(tails if forwards else heads,
+                                         dtype=np.int64))
+        targets = self.ids(np.frombuffer(heads if forwards else tails,
+                                         dtype=np.int64))
+        order   = np.argsort(sources, kind='stable')
+
+        self.offset,  self.offset_view  = typed_array(num_states + 1)
+        self.targets, self.targets_view = typed_array(len(order))
+        self.labels,  self.labels_view  = typed_array(len(order))
+
+        self.offset_view[1:] = np.cumsum(
+            np.bincount(sources, minlength=num_states))
+        self.targets_view[:] = targets[order]
+        self.labels_view[:]  = np.frombuffer(labels, dtype=np.int64)[order]
+
+    def ids(self, states):
+
+        """State ids of states (which must be states of the DFA).
+
+        Args:
+            states : NumPy array of states.
+
+        Returns:
+            NumPy array of state ids.
+        """
+
+        if self.extra_ids:
+            return np.fromiter(map(self.id, states.tolist()), dtype=np.int64,
+                               count=len(states))
+        if self.identity:
+            return states
+        return np.searchsorted(self.names, states)
+
+    def id(self, state):
+
+        """State id of state, or None if state is not a state of the DFA.
+
+        Args:
+            state : Integer.
+
+        Returns:
+            Integer or None.
+        """
+
+        size = len(self.names)
+        if self.identity:
+            if 0 <= state < size:
+                return state
+        else:
+            i = int(np.searchsorted(self.names, state))
+            if i < size and self.names[i] == state:
+                return i
+
+        return self.extra_ids.get(state)
+
+    def name(self, i):
+
+        """State of state id i.
+
+        Args:
+            i : Integer.
+
+        Returns:
+            Integer.
+        """
+
+        size = len(self.names)
+        if i >= size:
+            return self.extra_names[i - size]
+        return i if self.identity else int(self.names[i])
+
+    def states(self, reached):
+
+        """States of the DFA indicated by a boolean array over state ids.
+
+        Args:
+            reached : Boolean NumPy array (see search).
+
+        Returns:
+            NumPy array of states.
+        """
+
+        reached = np.flatnonzero(reached)
+        if self.extra_names:
+            return np.fromiter(map(self.name, reached.tolist()),
+                               dtype=np.int64, count=len(reached))
+        return reached if self.identity else self.names[reached]
+
+    def mask(self, symbols):
+
+        """Symbol ids permitted by symbols, or None if every symbol of the
+        DFA is permitted.
+
+        Args:
+            symbols : Iterable of symbols or None.
+
+        Returns:
+            Bytearray indexed by symbol ids or None.
+        """
+
+        if symbols is None:
+            return None
+
+        symbols = set(symbols)
+        if all(a in symbols for a in self.symbols):
+            return None
+        return bytearray(a in symbols for a in self.symbols)
+
+    def levels(self, roots, allowed=None):
+
+        """Breadth-first distances of the state ids reachable from roots via
+        edges with permitted symbol ids. Each level is expanded with NumPy
+        unless the frontier is small, so the search takes O(N + M) time with
+        a small constant on both wide and deep graphs.
+
+        Args:
+            roots   : NumPy array of state ids.
+            allowed : Bytearray indexed by symbol ids or None (see mask).
+
+        Returns:
+            NumPy array of 32-bit integers (-1 for unreached state ids).
+        """
+
+        offset, targets, labels = self.offset, self.targets, self.labels
+        size  = len(self.names)
+        extra = self.extra
+
+        distance = array('i', [-1]) * (size + len(self.extra_names))
+        view     = np.frombuffer(distance, dtype=np.int32)
+        frontier = np.unique(np.asarray(roots, dtype=np.int64))
+        level    = 0
+        view[frontier] = level
+
+        while len(frontier):
+            level += 1
+            if len(frontier) < self.FRONTIER:
+                following = []
+                for q in (frontier.tolist() if isinstance(frontier, np.ndarray)
+                          else frontier):
+                    edges = zip(targets[offset[q]:offset[q + 1]],
+                                labels[offset[q]:offset[q + 1]]) \
+                            if q < size else ()
+                    for edge in (edges, extra.get(q, ())):
+                        for r, a in edge:
+                            if distance[r] < 0 and a >= 0 and (
+                                    allowed is None or allowed[a]):
+                                distance[r] = level
+                                following.append(r)
+                frontier = following
+            else:
+                frontier = np.asarray(frontier, dtype=np.int64)
+                inner    = frontier[frontier < size]
+                indices  = ranges(self.offset_view[inner],
+                                  self.offset_view[inner + 1])
+                if self.num_edits or allowed is not None:
+                    indices = indices[self.labels_view[indices] >= 0]
+                if allowed is not None:
+                    permitted = np.frombuffer(allowed, dtype=bool)
+                    indices   = indices[permitted[self.labels_view[indices]]]
+                following = self.targets_view[indices]
+                if extra:
+                    following = np.concatenate([following, np.array([
+                        r for q in frontier.tolist() for r, a in
+                        extra.get(q, ()) if allowed is None or allowed[a]
+                    ], dtype=np.int64)])
+                following = np.unique(following)
+                frontier  = following[view[following] < 0]
+                view[frontier] = level
+
+        return view
+
+    def search(self, roots, allowed=None):
+
+        """The state ids reachable from roots via edges with permitted symbol
+        ids (see levels).
+
+        Args:
+            roots   : NumPy array of state ids.
+            allowed : Bytearray indexed by symbol ids or None (see mask).
+
+        Returns:
+            Boolean NumPy array indicating reached state ids.
+        """
+
+        return self.levels(roots, allowed) >= 0
+
+    def closure(self, states, symbols=None):
+
+        """The states reached from states via edges on symbols (including
+        states).
+
+        Args:
+            states  : Iterable of states of the DFA.
+            symbols : Iterable of symbols or None (every symbol).
+
+        Returns:
+            Set of states.
+        """
+
+        roots   = self.ids(np.fromiter(states, dtype=np.int64))
+        reached = self.states(self.search(roots, self.mask(symbols)))
+
+        return set(reached.tolist())
+
+    def neighbours(self, state):
+
+        """States at the other ends of the edges of state.
+
+        Args:
+            state : State of the DFA.
+
+        Returns:
+            List of states (with repetitions for parallel edges).
+        """
+
+        i = self.id(state)
+        if i is None:
+            return []
+
+        ids = [r for r, a in self.extra.get(i, ())]
+        if i < len(self.names):
+            begin, end = self.offset[i], self.offset[i + 1]
+            ids.extend(r for r, a in zip(self.targets[begin:end],
+                                         self.labels[begin:end]) if a >= 0)
+
+        if self.identity and not self.extra_names:
+            return ids
+        return [self.name(r) for r in ids]
+
+    def add_state(self, state):
+
+        """Record new state of the DFA.
+
+        Args:
+            state : Integer.
+        """
+
+        self.extra_ids[state] = len(self.names) + len(self.extra_names)
+        self.extra_names.append(state)
+
+    def add(self, state, symbol, other):
+
+        """Record new edge of state to other on symbol (a transition from
+        state to other in the forward index and from other to state in the
+        reverse index).
+
+        Args:
+            state  : State of the DFA.
+            symbol : Symbol.
+            other  : State of the DFA.
+        """
+
+        if symbol not in self.index:
+            self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+        i = self.id(state)
+        if i not in self.extra:
+            self.extra[i] = []
+        self.extra[i].append((self.id(other), self.index[symbol]))
+        self.num_edits += 1
+
+    def remove(self, state, symbol, other):
+
+        """Remove edge of state to other on symbol (see add).
+
+        Args:
+            state  : State of the DFA.
+            symbol : Symbol.
+            other  : State of the DFA.
+        """
+
+        i    = self.id(state)
+        edge = (self.id(other), self.index[symbol])
+        self.num_edits += 1
+
+        if edge in self.extra.get(i, ()):
+            self.extra[i].remove(edge)
+            return
+
+        for j in range(self.offset[i], self.offset[i + 1]):
+            if (self.targets[j], self.labels[j]) == edge:
+                self.labels[j] = -1
+                return
+
+    def stale(self):
+
+        """Whether the index should be rebuilt.
+
+        Returns:
+            Boolean.
+        """
+
+        return self.num_edits > self.REBUILD * len(self.targets) + 64
+
+class Distances(object):
+
+    """Breadth-first distances from a set of roots in a graph with changing
+    edges and roots, maintained incrementally. DFA maintains the distances
+    from the start state (forwards) and to the final states (backwards) to
+    keep the sets of accessible and coaccessible states up to date.
+
+    Insertions of edges and roots decrease distances, which are propagated
+    from the changed state by breadth-first search. Deletions only affect the
+    states all of whose shortest paths use the deleted edge or root. These
+    are found by following the edges of the shortest paths from the head of
+    the deleted edge, and their distances are recomputed from their
+    unaffected predecessors [1]. The cost of each update is proportional to
+    the number of edges of the states whose distances change.
+
+    [1] Ramalingam, G. and Reps, Thomas. 1996. On the computational
+    complexity of dynamic graph problems. Theoretical Computer Science.
+    158(1): 233-77.
+
+    Attributes:
+        roots        : Set of roots.
+        distance     : Dictionary mapping reached states to distances.
+        successors   : Function of states returning their successors.
+        predecessors : Function of states returning their predecessors.
+    """
+
+    def __init__(self, roots, distance, successors, predecessors):
+
+        self.roots        = roots
+        self.distance     = distance
+        self.successors   = successors
+        self.predecessors = predecessors
+
+    def insert(self, state, other):
+
+        """Update distances after insertion of an edge from state to other.
+
+        Args:
+            state : State.
+            other : State.
+
+        Returns:
+            Set of newly reached states.
+        """
+
+        if state not in self.distance:
+            return set()
+
+        return self._decrease(other, self.distance[state] + 1)
+
+    def delete(self, state, other):
+
+        """Update distances after deletion of an edge from state to other.
+
+        Args:
+            state : State.
+            other : State.
+
+        Returns:
+            Set of states that are no longer reached.
+        """
+
+        distance = self.distance
+        if state not in distance or other in self.roots or \
+           distance.get(other) != distance[state] + 1:
+            return set()
+
+        return self._increase(other)
+
+    def add_root(self, state):
+
+        """Update distances after addition of root state.
+
+        Args:
+            state : State.
+
+        Returns:
+            Set of newly reached states.
+        """
+
+        self.roots.add(state)
+        return self._decrease(state, 0)
+
+    def remove_root(self, state):
+
+        """Update distances after removal of root state.
+
+        Args:
+            state : State.
+
+        Returns:
+            Set of states that are no longer reached.
+        """
+
+        self.roots.discard(state)
+        return self._increase(state)
+
+    def _tight(self, state, excluded=()):
+
+        # whether state has an unexcluded predecessor on a shortest path
+
+        level = self.distance[state] - 1
+        return any(p not in excluded and self.distance.get(p) == level
+                   for p in self.predecessors(state))
+
+    def _decrease(self, state, level):
+
+        distance = self.distance
+        if distance.get(state, level + 1) <= level:
+            return set()
+
+        reached = set()
+        queue   = deque([(state, level)])
+        while queue:
+            q, level = queue.popleft()
+            if distance.get(q, level + 1) <= level:
+                continue
+            if q not in distance:
+                reached.add(q)
+            distance[q] = level
+            for r in self.successors(q):
+                if distance.get(r, level + 2) > level + 1:
+                    queue.append((r, level + 1))
+
+        return reached
+
+    def _increase(self, state):
+
+        distance = self.distance
+        if state not in distance or state in self.roots or self._tight(state):
+            return set()
+
+        # states all of whose shortest paths pass through affected states
+        # (processed in order of distance, so that the affected predecessors
+        # of a state are known when it is examined)
+
+        affected = set([state])
+        queue    = deque([state])
+        while queue:
+            q = queue.popleft()
+            for r in self.successors(q):
+                if r not in affected and r not in self.roots and \
+                   distance.get(r) == distance[q] + 1 and \
+                   not self._tight(r, affected):
+                    affected.add(r)
+                    queue.append(r)
+
+        # recompute distances of affected states from unaffected predecessors
+
+        for q in affected:
+            del distance[q]
+
+        heap = []
+        for q in affected:
+            levels = [distance[p] for p in self.predecessors(q)
+                      if p in distance]
+            if levels:
+                heap.append((min(levels) + 1, q))
+        heapq.heapify(heap)
+
+        while heap:
+            level, q = heapq.heappop(heap)
+            if q in distance:
+                continue
+            distance[q] = level
+            for r in self.successors(q):
+                if r in affected and r not in distance:
+                    heapq.heappush(heap, (level + 1, r))
+
+        return set(q for q in affected if q not in distance)
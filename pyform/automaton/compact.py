@@ -0,0 +1,475 @@
+import numpy as np
+from collections.abc import Mapping
+from pyform.automaton.dfa import DFA
+from pyform.common.alphabet import sort_symbols
+
+class CompactDFA(DFA):
+
+    """Deterministic finite automaton with dense transition table.
+
+    Array-backed variant of DFA for large automata. Symbols are interned to
+    symbol ids in range(len(symbols)) and states are renumbered to state ids
+    in range(num_states). The transition function is stored in a dense NumPy
+    array of shape (num_states, num_symbols) where table[q, i] == r iff there
+    is a transition from state q to state r on symbol symbols[i], and table[q,
+    i] == SENTINEL iff there is no such transition.
+
+    Instances expose the attributes of DFA (states, finals, start, sigma and
+    delta) in terms of state ids, so every method of DFA accepts instances of
+    this class. The attribute delta is a read-only view of the table. Methods
+    with array-specific implementations override their DFA counterparts.
+    Instances are immutable; the original state numbers are recorded in names
+    so that to_dfa inverts from_dfa.
+
+    Attributes:
+        table     : Array of shape (num_states, num_symbols) of state ids.
+        symbols   : List mapping symbol ids to symbols.
+        index     : Dictionary mapping symbols to symbol ids.
+        names     : List mapping state ids to original states.
+        accepting : Boolean array indicating final states.
+    """
+
+    SENTINEL = -1
+
+    def __init__(self, table, finals, start, symbols, names=None):
+
+        table = np.asarray(table)
+        if table.ndim != 2:
+            table = table.reshape(len(table), len(symbols))
+
+        self.table   = table.astype(_state_dtype(table.shape[0]), copy=False)
+        self.symbols = list(symbols)
+        self.index   = {a : i for i, a in enumerate(self.symbols)}
+        self.names   = list(range(table.shape[0])) if names is None \
+                       else list(names)
+
+        self.table.flags.writeable = False
+
+        finals = frozenset(finals)
+        self.accepting = np.zeros(self.table.shape[0], dtype=bool)
+        self.accepting[list(finals)] = True
+
+        self._runtable = None
+        self._encoding = None
+
+        super().__init__(
+            states = range(self.table.shape[0]),
+            finals = finals,
+            sigma  = frozenset(self.symbols),
+            start  = start,
+            delta  = TableDelta(self)
+        )
+
+    @classmethod
+    def from_dfa(cls, dfa):
+
+        """Construct array-backed automaton from DFA. States are renumbered in
+        sorted order and symbols are interned in sorted order (see
+        sort_symbols).
+
+        Args:
+            dfa : DFA instance.
+
+        Returns:
+            CompactDFA instance equivalent to and isomorphic with dfa.
+        """
+
+        if isinstance(dfa, CompactDFA):
+            return dfa
+
+        names   = sorted(dfa.states)
+        ids     = {q : i for i, q in enumerate(names)}
+        symbols = sort_symbols(dfa.sigma)
+        index   = {a : i for i, a in enumerate(symbols)}
+
+        table = np.full((len(names), len(symbols)), cls.SENTINEL,
+                        dtype=_state_dtype(len(names)))
+
+        for q, a, r in dfa.iterate():
+            table[ids[q], index[a]] = ids[r]
+
+        return cls(
+            table   = table,
+            finals  = (ids[q] for q in dfa.finals),
+            start   = ids[dfa.start],
+            symbols = symbols,
+            names   = names
+        )
+
+    def to_dfa(self):
+
+        """Construct dictionary-backed DFA with the original state numbers.
+        States without outgoing transitions are omitted from delta.
+
+        Returns:
+            DFA instance such that CompactDFA.from_dfa(dfa).to_dfa() has the
+            same states, finals, start, sigma and transitions as dfa.
+        """
+
+        delta = {}
+        for q, a, r in self.iterate():
+            q = self.names[q]
+            if q not in delta:
+                delta[q] = {}
+            delta[q][a] = self.names[r]
+
+        return DFA(
+            states = set(self.names),
+            finals = set(self.names[q] for q in self.finals),
+            start  = self.names[self.start],
+            sigma  = set(self.symbols),
+            delta  = delta
+        )
+
+    def compact(self):
+
+        return self
+
+    def iterate(self):
+
+        """Generator yielding transitions as triples (q, a, r) in order of
+        state ids and symbol ids (see DFA.iterate).
+
+        Returns:
+            Generator yielding transitions as triples.
+        """
+
+        tails, labels = np.nonzero(self.table != self.SENTINEL)
+        heads = self.table[tails, labels]
+
+        return (
+            (q, self.symbols[i], r)
+            for q, i, r in zip(tails.tolist(), labels.tolist(), heads.tolist())
+        )
+
+    def step(self, state, symbol):
+
+        """The state obtained by transitioning from state on symbol, or None
+        if there is no such transition.
+
+        Args:
+            state  : State id.
+            symbol : Hashable object.
+
+        Returns:
+            State id or None.
+        """
+
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+        r = self.table.item(state, i)
+        return None if r == self.SENTINEL else r
+
+    def run(self, word):
+
+        state = self.start
+        for symbol in word:
+            state = self.step(state, symbol)
+            if state is None:
+                return None
+
+        return state
+
+    def encode(self, words):
+
+        """Encode words as a padded array of symbol ids. Symbols outside the
+        alphabet are encoded as len(symbols). Words of strings (bytes) over an
+        alphabet of single characters (integers in range(256)) are encoded
+        without iterating over their symbols in Python.
+
+        Args:
+            words : List of words (sequences of symbols).
+
+        Returns:
+            (codes, lengths) where codes is an array of shape (len(words),
+            max(lengths)) such that codes[i, :lengths[i]] encodes words[i].
+        """
+
+        unknown = len(self.symbols)
+        lengths = np.fromiter(map(len, words), dtype=np.intp,
+                              count=len(words))
+        width   = int(lengths.max()) if len(words) else 0
+        codes   = np.full((len(words), width), unknown,
+                          dtype=_state_dtype(unknown + 1))
+
+        encoded = self._codepoints(words)
+        if encoded is not None:
+            lookup, points = encoded
+            flat = np.where(
+                points < len(lookup),
+                lookup[np.minimum(points, len(lookup) - 1)],
+                unknown
+            )
+        else:
+            flat = np.fromiter(
+                (self.index.get(a, unknown) for word in words for a in word),
+                dtype=codes.dtype,
+                count=int(lengths.sum())
+            )
+
+        # boolean assignment fills the padded array in row-major order
+
+        codes[np.arange(width) < lengths[:, None]] = flat
+        return codes, lengths
+
+    def run_many(self, words):
+
+        """Run the automaton on many words at once (see DFA.run). The words
+        are encoded as a padded array of symbol ids (see encode) and sorted by
+        decreasing length. The states of all words that have not ended are
+        then advanced together using one table lookup per position. Undefined
+        transitions and symbols outside the alphabet lead to a dead state
+        appended to the table, so no word is handled individually.
+
+        Args:
+            words : Iterable of words (sequences of symbols).
+
+        Returns:
+            NumPy array whose i-th element is the state id reached on the i-th
+            word, or SENTINEL if some transition is undefined.
+        """
+
+        words          = list(words)
+        codes, lengths = self.encode(words)
+
+        dead   = self.table.shape[0]
+        table  = self._extended_table()
+        order  = np.argsort(-lengths, kind='stable')
+        codes  = np.ascontiguousarray(codes[order].T)
+        ending = -lengths[order]
+        states = np.full(len(words), self.start, dtype=table.dtype)
+
+        for i in range(codes.shape[0]):
+            active = int(np.searchsorted(ending, -i, side='left'))
+            states[:active] = table[states[:active], codes[i, :active]]
+
+        result = np.empty_like(states)
+        result[order] = states
+        result[result == dead] = self.SENTINEL
+        return result
+
+    def accepts_many(self, words):
+
+        """Determine which of many words the automaton accepts (see
+        run_many).
+
+        Args:
+            words : Iterable of words (sequences of symbols).
+
+        Returns:
+            Boolean NumPy array whose i-th element indicates whether the i-th
+            word is accepted.
+        """
+
+        # the sentinel (-1) indexes the rejecting entry appended to accepting
+
+        return np.append(self.accepting, False)[self.run_many(words)]
+
+    def _extended_table(self):
+
+        """Transition table extended with a dead state and a column for
+        symbols outside the alphabet, in which undefined transitions lead to
+        the dead state. The result is cached."""
+
+        if self._runtable is None:
+            dead  = self.table.shape[0]
+            table = np.full((dead + 1, len(self.symbols) + 1), dead,
+                            dtype=_state_dtype(dead + 1))
+            table[:dead, :-1] = self.table
+            table[table == self.SENTINEL] = dead
+            self._runtable = table
+
+        return self._runtable
+
+    def _codepoints(self, words):
+
+        """Array mapping character codes (or byte values) to symbol ids and
+        the array of concatenated character codes of words, if the words and
+        alphabet permit encoding without iterating over symbols, and None
+        otherwise. The lookup arrays are cached."""
+
+        if self._encoding is None:
+            self._encoding = {}
+            if self.symbols and all(isinstance(a, str) and len(a) == 1
+                                    for a in self.symbols):
+                points = [ord(a) for a in self.symbols]
+                kind   = str
+            elif self.symbols and all(type(a) is int and 0 <= a < 256
+                                      for a in self.symbols):
+                points = self.symbols
+                kind   = bytes
+            else:
+                return None
+            lookup = np.full(max(points) + 1, len(self.symbols),
+                             dtype=_state_dtype(len(self.symbols) + 1))
+            lookup[points] = np.arange(len(self.symbols))
+            self._encoding[kind] = lookup
+
+        if str in self._encoding and \
+           all(isinstance(word, str) for word in words):
+            return self._encoding[str], np.frombuffer(
+                ''.join(words).encode('utf-32-le', 'surrogatepass'),
+                dtype=np.uint32)
+
+        if bytes in self._encoding and \
+           all(isinstance(word, (bytes, bytearray)) for word in words):
+            return self._encoding[bytes], np.frombuffer(
+                b''.join(words), dtype=np.uint8)
+
+        return None
+
+    def product(self, dfa, f):
+
+        """Generalized product of current and argument automata with respect
+        to boolean function f (see DFA.product). If the argument automaton is
+        also array-backed, the product is constructed from the tables and
+        returned as an array-backed automaton.
+
+        Args:
+            dfa : DFA instance.
+            f   : Boolean function of two variables.
+
+        Returns:
+            Generalized product of current and argument automata with respect
+            to boolean function f.
+        """
+
+        if not isinstance(dfa, CompactDFA):
+            return super().product(dfa, f)
+
+        symbols = sort_symbols(self.sigma.union(dfa.sigma))
+        columns = [
+            (self.index.get(a, self.SENTINEL), dfa.index.get(a, self.SENTINEL))
+            for a in symbols
+        ]
+
+        # the pair (SENTINEL, SENTINEL) represents the inserted sink state
+
+        states   = {(self.start, dfa.start) : 0}
+        rows     = []
+        worklist = [(self.start, dfa.start)]
+
+        while worklist:
+            q1, r1 = worklist.pop()
+            row  = [0] * len(columns)
+            row1 = self.table[q1].tolist() if q1 != self.SENTINEL else None
+            row2 = dfa.table[r1].tolist() if r1 != self.SENTINEL else None
+            for k, (i, j) in enumerate(columns):
+                q2 = row1[i] if row1 is not None and i != self.SENTINEL \
+                     else self.SENTINEL
+                r2 = row2[j] if row2 is not None and j != self.SENTINEL \
+                     else self.SENTINEL
+                if (q2, r2) not in states:
+                    states[(q2, r2)] = len(states)
+                    worklist.append((q2, r2))
+                row[k] = states[(q2, r2)]
+            rows.append((states[(q1, r1)], row))
+
+        table = np.empty((len(states), len(symbols)),
+                         dtype=_state_dtype(len(states)))
+        for source, row in rows:
+            table[source] = row
+
+        return CompactDFA(
+            table   = table,
+            finals  = (
+                states[(q1, r1)]
+                for (q1, r1) in states
+                if f(q1 in self.finals, r1 in dfa.finals)
+            ),
+            start   = 0,
+            symbols = symbols
+        )
+
+    def nbytes(self):
+
+        """Number of bytes consumed by the transition table.
+
+        Returns:
+            Integer.
+        """
+
+        return self.table.nbytes
+
+class TableDelta(Mapping):
+
+    """Read-only view of the transition table of a CompactDFA as a partial
+    transition function. States without outgoing transitions are undefined,
+    as they would be in the nested dictionary representation.
+
+    Attributes:
+        dfa     : CompactDFA instance.
+        defined : Boolean array indicating states with outgoing transitions.
+    """
+
+    def __init__(self, dfa):
+
+        self.dfa     = dfa
+        self.defined = (dfa.table != dfa.SENTINEL).any(axis=1)
+
+    def __getitem__(self, state):
+
+        if state not in self:
+            raise KeyError(state)
+        return TableRow(self.dfa, state)
+
+    def __contains__(self, state):
+
+        return isinstance(state, (int, np.integer)) and \
+               0 <= state < len(self.defined) and \
+               bool(self.defined[state])
+
+    def __iter__(self):
+
+        return iter(np.flatnonzero(self.defined).tolist())
+
+    def __len__(self):
+
+        return int(np.count_nonzero(self.defined))
+
+class TableRow(Mapping):
+
+    """Read-only view of the outgoing transitions of a single state of a
+    CompactDFA as a dictionary mapping symbols to state ids.
+
+    Attributes:
+        dfa   : CompactDFA instance.
+        state : State id.
+    """
+
+    def __init__(self, dfa, state):
+
+        self.dfa   = dfa
+        self.state = state
+
+    def __getitem__(self, symbol):
+
+        target = self.dfa.step(self.state, symbol)
+        if target is None:
+            raise KeyError(symbol)
+        return target
+
+    def __contains__(self, symbol):
+
+        return self.dfa.step(self.state, symbol) is not None
+
+    def __iter__(self):
+
+        row = self.dfa.table[self.state]
+        return (
+            self.dfa.symbols[i]
+            for i in np.flatnonzero(row != self.dfa.SENTINEL).tolist()
+        )
+
+    def __len__(self):
+
+        row = self.dfa.table[self.state]
+        return int(np.count_nonzero(row != self.dfa.SENTINEL))
+
+def _state_dtype(num_states):
+
+    """Smallest signed integer type that represents state ids in
+    range(num_states) and the sentinel."""
+
+    return np.int32 if num_states < 2 ** 31 else np.int64
@@ -0,0 +1,162 @@
+import numpy as np
+from pyform.common.alphabet import sort_symbols
+
+class WordCounter(object):
+
+    """Stores the useful part of a DFA (the states that are reachable from
+    the start state and can reach some final state) in compressed sparse row
+    form for counting accepted words by length (DFA.count).
+
+    The useful states are renumbered in range(num_states). The transitions of
+    state i are the indices offset[i] to offset[i + 1] - 1 of targets, so a
+    state with k transitions to the same state contributes k edges. Let
+    v_m[i] be the number of words of length m leading from state i to a final
+    state. Then v_0 is the indicator vector of the final states and v_{m+1}
+    [i] is the sum of v_m over the targets of i, which is one gather and one
+    segmented sum (numpy.add.reduceat) per step. Counts are int64 as long as
+    no step can overflow, that is, while the largest count times the largest
+    out-degree is below 2 ** 63, and Python integers (object arrays)
+    afterwards.
+
+    Attributes:
+        num_states : Number of useful states.
+        start      : Start state id (None if the start state is useless).
+        finals     : Boolean array indicating final states.
+        offset     : Array of offsets into targets.
+        targets    : Array of state ids.
+    """
+
+    LIMIT = 2 ** 63
+
+    def __init__(self, dfa):
+
+        useful = dfa.accessible() & dfa.coaccessible()
+        names  = sorted(useful)
+        ids    = {q : i for i, q in enumerate(names)}
+
+        self.num_states = len(names)
+        self.start      = ids.get(dfa.start)
+        self.finals     = np.array([q in dfa.finals for q in names],
+                                   dtype=bool)
+
+        targets = []
+        offset  = [0]
+        for q in names:
+            targets.extend(ids[r] for r in dfa.delta.get(q, {}).values()
+                           if r in ids)
+            offset.append(len(targets))
+
+        self.offset  = np.array(offset, dtype=np.int64)
+        self.targets = np.array(targets, dtype=np.int64)
+
+    def count(self, n, upto=False):
+
+        """Number of accepted words of length n, or of length at most n.
+
+        Args:
+            n    : Nonnegative integer.
+            upto : Boolean indicating whether to count the words of every
+                length up to n.
+
+        Returns:
+            Integer.
+        """
+
+        if self.start is None:
+            return 0
+
+        degree = np.diff(self.offset)
+        rows   = np.flatnonzero(degree)
+        starts = self.offset[rows]
+        spread = int(degree.max()) if len(rows) else 0
+
+        counts = self.finals.astype(np.int64)
+        total  = int(counts[self.start])
+        for _ in range(n):
+            if counts.dtype != object and \
+               int(counts.max()) * spread >= self.LIMIT:
+                counts = counts.astype(object)
+            following = np.zeros(self.num_states, dtype=counts.dtype)
+            if len(rows):
+                following[rows] = np.add.reduceat(counts[self.targets],
+                                                  starts)
+            counts = following
+            total += int(counts[self.start])
+
+        return total if upto else int(counts[self.start])
+
+def enumerate_words(dfa, max_length=None):
+
+    """Generator yielding the words accepted by a DFA in shortlex order (by
+    length, then lexicographically by the order of sort_symbols), as lists
+    of symbols (see DFA.enumerate).
+
+    The search is restricted to the useful states (reachable from the start
+    state and reaching some final state), so that an unreachable cycle does
+    not keep the generator running after the last word. The words of length
+    m are generated by a depth-first search from the start state that only
+    enters states from which some final state is reachable in exactly the
+    remaining number of steps. These sets of states are computed backwards
+    from the final states one length at a time, so no branch of the search
+    is dead and the generator stops as soon as a set is empty, since no
+    longer words are accepted then.
+
+    Args:
+        dfa        : DFA instance.
+        max_length : Largest length of the generated words, or None.
+
+    Yields:
+        Lists of symbols.
+    """
+
+    useful = dfa.accessible() & dfa.coaccessible()
+    if dfa.start not in useful:
+        return
+
+    order = {a : i for i, a in enumerate(sort_symbols(dfa.sigma))}
+    rows  = {}
+    preds = {}
+    for q in useful:
+        row = sorted(((a, r) for a, r in dfa.delta.get(q, {}).items()
+                      if r in useful), key=lambda item: order[item[0]])
+        rows[q] = row
+        for a, r in row:
+            preds.setdefault(r, set()).add(q)
+
+    # exact[m] is the set of states with a path of length m to a final state
+
+    exact  = [set(dfa.finals) & useful]
+    length = 0
+
+    while exact[length] and (max_length is None or length <= max_length):
+        if dfa.start in exact[length]:
+            yield from _words(rows, exact, dfa.start, length)
+        following = set()
+        for r in exact[length]:
+            following.update(preds.get(r, ()))
+        exact.append(following)
+        length += 1
+
+def _words(rows, exact, start, length):
+
+    # words of the given length from start to a final state, in order, by
+    # depth-first search over states in the sets exact
+
+    word  = []
+    stack = [iter(rows[start])]
+    while stack:
+        if len(word) == length:
+            yield list(word)
+            stack.pop()
+            if word:
+                word.pop()
+            continue
+        for a, r in stack[-1]:
+            if r in exact[length - len(word) - 1]:
+                word.append(a)
+                stack.append(iter(rows[r]))
+                break
+        else:
+            stack.pop()
+            if word:
+                word.pop()
@@ -0,0 +1,237 @@
+import numpy as np
+from array import array
+from pyform.automaton.compact import CompactDFA
+from pyform.automaton.compact import _state_dtype
+from pyform.automaton.dfa import DFA
+from pyform.common.alphabet import sort_symbols
+from pyform.common.partition import view
+
+class DaciukBuilder(object):
+
+    """Incremental construction of minimal acyclic DFAs from sorted words.
+
+    Implementation of the algorithm of Daciuk et al. for sorted input [1].
+    Words are added in lexicographic order (see add) and the automaton is
+    kept minimal as it grows, so the trie of the words is never built. Only
+    the states on the path of the last word added may still change. When a
+    word is added, the states of the previous path below the longest common
+    prefix of both words are frozen: each is replaced by an equivalent
+    frozen state if the register contains one and registered otherwise.
+    Frozen states are never modified again, and no two of them are
+    equivalent, so the memory taken by the builder is proportional to the
+    size of the minimal automaton plus the length of the longest word.
+
+    Frozen states are numbered in the order in which they are registered
+    (the start state is registered last, see finish) and stored in typed
+    arrays in compressed sparse row form: the transitions of state q are
+    the indices offset[q] to offset[q + 1] - 1 of labels and targets, in
+    increasing order of their symbols. The register maps hashes of the
+    signatures of frozen states (finality and transitions) to states.
+    Signatures with colliding hashes are stored under the next free integer
+    key, so lookups probe consecutive keys until an equal state or a free
+    key is found.
+
+    [1] Daciuk, Jan, Mihov, Stoyan, Watson, Bruce W. and Watson, Richard E.
+    2000. Incremental construction of minimal acyclic finite-state automata.
+    Computational Linguistics. 26(1): 3-16.
+
+    Attributes:
+        symbols   : List mapping symbol ids to symbols (in order of first
+            occurrence).
+        index     : Dictionary mapping symbols to symbol ids.
+        offset    : Array of offsets into labels and targets.
+        labels    : Array of symbol ids of the transitions of frozen states.
+        targets   : Array of states of the transitions of frozen states.
+        accepting : Bytearray indicating final frozen states.
+        register  : Dictionary mapping signature hashes to frozen states.
+        path      : List of the unfrozen states on the path of the last word,
+            each a triple (final, labels, targets) of a boolean and lists.
+        previous  : Last word added or None.
+        start     : Start state once finish has been called, else None.
+    """
+
+    def __init__(self):
+
+        self.symbols   = []
+        self.index     = {}
+        self.offset    = array('q', [0])
+        self.labels    = array('i')
+        self.targets   = array('q')
+        self.accepting = bytearray()
+        self.register  = {}
+        self.path      = [[False, [], []]]
+        self.previous  = None
+        self.start     = None
+
+    def add(self, word):
+
+        """Add word to the language of the automaton. Words must be added in
+        increasing lexicographic order; repetitions of the last word are
+        ignored.
+
+        Args:
+            word : Sequence of hashable objects (such as a string).
+
+        Raises:
+            ValueError if word precedes the last word or the builder is
+            finished.
+        """
+
+        if self.start is not None:
+            raise ValueError('builder already finished')
+
+        previous = self.previous
+        if previous is not None and word <= previous:
+            if word == previous:
+                return
+            raise ValueError('words not sorted: %r after %r' % (
+                word, previous))
+
+        # freeze the previous path below the common prefix
+
+        prefix = 0
+        if previous is not None:
+            limit = min(len(word), len(previous))
+            while prefix < limit and word[prefix] == previous[prefix]:
+                prefix += 1
+        self._freeze(prefix)
+
+        # append the suffix to the path
+
+        path  = self.path
+        index = self.index
+        for symbol in word[prefix:]:
+            a = index.get(symbol)
+            if a is None:
+                a = index[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            path[-1][1].append(a)
+            path[-1][2].append(-1)
+            path.append([False, [], []])
+
+        path[-1][0]   = True
+        self.previous = word
+
+    def extend(self, words):
+
+        """Add words in order (see add).
+
+        Args:
+            words : Iterable of sequences of hashable objects.
+        """
+
+        for word in words:
+            self.add(word)
+
+    def finish(self):
+
+        """Freeze the remaining states. No words may be added afterwards.
+
+        Returns:
+            The start state.
+        """
+
+        if self.start is None:
+            self._freeze(0)
+            final, labels, targets = self.path.pop()
+            self.start = self._register(final, labels, targets)
+        return self.start
+
+    def num_states(self):
+
+        """Number of frozen states (of the minimal automaton once finish has
+        been called).
+
+        Returns:
+            Integer.
+        """
+
+        return len(self.accepting)
+
+    def to_dfa(self):
+
+        """Finish the construction (see finish) and construct the minimal
+        DFA of the words added. The states of the result are range(n).
+
+        Returns:
+            DFA instance.
+        """
+
+        start = self.finish()
+        delta = {}
+        for q in range(self.num_states()):
+            begin, end = self.offset[q], self.offset[q + 1]
+            if begin < end:
+                delta[q] = {self.symbols[a] : r for a, r in zip(
+                    self.labels[begin:end], self.targets[begin:end])}
+
+        return DFA(
+            states = set(range(self.num_states())),
+            finals = set(q for q, final in enumerate(self.accepting) if final),
+            start  = start,
+            sigma  = set(self.symbols),
+            delta  = delta
+        )
+
+    def to_compact(self):
+
+        """Finish the construction (see finish) and construct the minimal
+        array-backed automaton of the words added, without building
+        dictionaries. Symbols are interned in sorted order (see
+        sort_symbols).
+
+        Returns:
+            CompactDFA instance.
+        """
+
+        start      = self.finish()
+        num_states = self.num_states()
+        symbols    = sort_symbols(self.symbols)
+        order      = {a : i for i, a in enumerate(symbols)}
+        columns    = np.array([order[a] for a in self.symbols], dtype=np.int64)
+
+        offset = view(self.offset)
+        rows   = np.repeat(np.arange(num_states), np.diff(offset))
+        table  = np.full((num_states, len(symbols)), CompactDFA.SENTINEL,
+                         dtype=_state_dtype(num_states))
+        table[rows, columns[view(self.labels)]] = view(self.targets)
+
+        accepting = np.frombuffer(bytes(self.accepting), dtype=np.uint8)
+        return CompactDFA(
+            table   = table,
+            finals  = np.flatnonzero(accepting).tolist(),
+            start   = start,
+            symbols = symbols
+        )
+
+    def _freeze(self, depth):
+
+        """Freeze the states of the path deeper than depth."""
+
+        path = self.path
+        while len(path) > depth + 1:
+            final, labels, targets = path.pop()
+            path[-1][2][-1] = self._register(final, labels, targets)
+
+    def _register(self, final, labels, targets):
+
+        """Frozen state equivalent to the given state, registered if there
+        is none."""
+
+        key = hash((final, tuple(labels), tuple(targets)))
+        while key in self.register:
+            q = self.register[key]
+            begin, end = self.offset[q], self.offset[q + 1]
+            if self.accepting[q] == final and \
+               self.labels[begin:end].tolist() == labels and \
+               self.targets[begin:end].tolist() == targets:
+                return q
+            key += 1
+
+        q = len(self.accepting)
+        self.register[key] = q
+        self.accepting.append(final)
+        self.labels.extend(labels)
+        self.targets.extend(targets)
+        self.offset.append(len(self.labels))
+        return q
@@ -1,10 +1,19 @@
+import hashlib
+import numpy as np
 from bidict import bidict
 from collections import deque
-from itertools import chain
+from pyform.automaton.adjacency import Distances
 from pyform.automaton.fa import FA
-from pyform.common.disjoint import DisjointSet
+from pyform.automaton.hopcroft import RefinementState
+from pyform.common.alphabet import sort_symbols
+from pyform.common.alphabet import symbol_classes
 from pyform.common.partition import Partition
+from pyform.common.partition import shared_buffers
+from pyform.common.partition import view
+from pyform.common.stats import CountingPartition
+from pyform.common.stats import phases
 from pyform.automaton.valmari import ValmariState
+from pyform.automaton.valmari import ArrayValmariState
 
 class DFA(FA):
 
@@ -13,8 +22,12 @@ class DFA(FA):
     Implementation of deterministic finite automata with partial transition
     functions. States are represented as integers. Symbols must be hashable
     objects. The alphabet may be empty but there must be at least one state
-    (the start state). No method of this class modifies any data structure
-    passed to init.
+    (the start state). Only the mutation methods (add_state, add_transition,
+    remove_transition and set_final) modify the data structures passed to
+    init. Derived data structures (such as the array-backed form used by
+    run_many) are cached on first use and are updated or discarded by the
+    mutation methods, so automata must not be modified otherwise after such
+    methods have been called.
 
     The transition function may be partial and is represented using nested
     dictionaries. There is a transition from state q to state r on symbol a
@@ -32,6 +45,12 @@ class DFA(FA):
             state q to state r on symbol a and undefined otherwise).
     """
     
+    # thresholds for the choice of strategy by minimize(strategy='auto')
+
+    MOORE_STATES     = 16
+    HOPCROFT_SYMBOLS = 16
+    HOPCROFT_DENSITY = 0.5
+
     def __init__(self, states, finals, sigma, start, delta):
 
         self.states = states
@@ -40,6 +59,14 @@ class DFA(FA):
         self.sigma  = sigma
         self.delta  = delta
 
+        self._compact      = None
+        self._canonical    = None
+        self._fingerprint  = None
+        self._forward      = None
+        self._reverse      = None
+        self._accessible   = None
+        self._coaccessible = None
+
     def validate(self):
 
         raise NotImplementedError
@@ -59,6 +86,231 @@ class DFA(FA):
             for a, r in m.items()
         )
 
+    def compact(self):
+
+        """Construct equivalent array-backed automaton (see CompactDFA). The
+        states of the result are renumbered in sorted order; the original
+        states are recovered by CompactDFA.to_dfa. The result is cached.
+
+        Returns:
+            CompactDFA instance isomorphic with the current automaton.
+        """
+
+        from pyform.automaton.compact import CompactDFA
+
+        if self._compact is None:
+            self._compact = CompactDFA.from_dfa(self)
+        return self._compact
+
+    def adjacency(self, forwards=True):
+
+        """Forward or reverse adjacency index of the transition graph in
+        compressed sparse row form (see Adjacency). Both indexes are cached.
+
+        Args:
+            forwards : Boolean indicating whether the index records outgoing
+                (True) or incoming (False) transitions.
+
+        Returns:
+            Adjacency instance.
+        """
+
+        from pyform.automaton.adjacency import Adjacency
+
+        if forwards:
+            if self._forward is None:
+                self._forward = Adjacency(self, forwards=True)
+            return self._forward
+
+        if self._reverse is None:
+            self._reverse = Adjacency(self, forwards=False)
+        return self._reverse
+
+    def save(self, path):
+
+        """Write the automaton to a file in a versioned binary format with a
+        symbol table and the transitions as flat arrays in compressed sparse
+        row form (see pyform.automaton.storage). Symbols must be integers,
+        booleans, strings or bytes.
+
+        Args:
+            path : Path of file.
+        """
+
+        from pyform.automaton import storage
+
+        storage.save(self, path)
+
+    @staticmethod
+    def load(path, mmap=True):
+
+        """Read an automaton written by save. The arrays of the file are used
+        in place (memory-mapped by default), so loading takes time
+        independent of the number of transitions and processes loading the
+        same file share its pages.
+
+        Args:
+            path : Path of file.
+            mmap : Boolean indicating whether to memory-map the file rather
+                than read it into memory.
+
+        Returns:
+            Read-only MappedDFA instance whose states are state ids in
+            range(n) (the original states are recorded in its names).
+        """
+
+        from pyform.automaton import storage
+
+        return storage.load(path, mmap)
+
+    @staticmethod
+    def from_words(words, compact=False):
+
+        """Construct the minimal acyclic automaton accepting exactly words
+        with the incremental algorithm of Daciuk et al. (see DaciukBuilder).
+        The automaton is kept minimal while the words are consumed, so its
+        peak memory is proportional to the size of the result rather than
+        to the size of the trie of the words.
+
+        Args:
+            words   : Iterable of sequences of hashable objects (such as
+                strings) in increasing lexicographic order.
+            compact : Boolean indicating whether to return an array-backed
+                automaton.
+
+        Returns:
+            DFA instance with states range(n), or CompactDFA instance.
+
+        Raises:
+            ValueError if words are not sorted.
+        """
+
+        from pyform.automaton.daciuk import DaciukBuilder
+
+        builder = DaciukBuilder()
+        builder.extend(words)
+        return builder.to_compact() if compact else builder.to_dfa()
+
+    def run(self, word):
+
+        """The state reached by transitioning from the start state on the
+        symbols of word in order, or None if some transition is undefined.
+
+        Args:
+            word : Iterable of symbols.
+
+        Returns:
+            State or None.
+        """
+
+        state = self.start
+        for symbol in word:
+            if state not in self.delta or symbol not in self.delta[state]:
+                return None
+            state = self.delta[state][symbol]
+
+        return state
+
+    def accepts(self, word):
+
+        """Determine whether the automaton accepts word.
+
+        Args:
+            word : Iterable of symbols.
+
+        Returns:
+            Boolean indicating whether word is accepted.
+        """
+
+        return self.run(word) in self.finals
+
+    def run_many(self, words):
+
+        """Run the automaton on many words at once (see run). The words are
+        encoded as a padded array of symbol ids and stepped in lockstep using
+        the array-backed form of the automaton (see CompactDFA.run_many).
+
+        Args:
+            words : Iterable of words (sequences of symbols).
+
+        Returns:
+            NumPy array whose i-th element is the state reached on the i-th
+            word, or CompactDFA.SENTINEL if some transition is undefined.
+        """
+
+        compact = self.compact()
+        states  = compact.run_many(words)
+
+        # the sentinel (-1) indexes the sentinel appended to names
+
+        names = np.append(np.asarray(compact.names), compact.SENTINEL)
+        return names[states]
+
+    def accepts_many(self, words):
+
+        """Determine which of many words the automaton accepts (see
+        run_many).
+
+        Args:
+            words : Iterable of words (sequences of symbols).
+
+        Returns:
+            Boolean NumPy array whose i-th element indicates whether the i-th
+            word is accepted.
+        """
+
+        return self.compact().accepts_many(words)
+
+    def run_parallel(self, word, workers=None, chunk_size=None):
+
+        """The state reached on word (see run), computed by splitting word
+        into chunks and computing, in a process pool, the map from every state
+        to the state reached on each chunk. The maps are composed in order to
+        obtain the exact final state. Each chunk costs time proportional to
+        the number of states, so this method suits minimized automata.
+
+        Args:
+            word       : Sequence of symbols, string or bytes-like object.
+            workers    : Number of worker processes (os.cpu_count() if None).
+            chunk_size : Number of symbols per chunk (an equal share of the
+                input per worker if None).
+
+        Returns:
+            State or None.
+        """
+
+        from pyform.automaton import parallel
+
+        compact  = self.compact()
+        codes, _ = compact.encode([word])
+        state    = parallel.run_parallel(compact, codes[0], workers,
+                                         chunk_size)
+
+        return None if state == len(compact.names) else compact.names[state]
+
+    def scan_parallel(self, path, workers=None, chunk_size=None):
+
+        """The state reached on the contents of a file (see run_parallel).
+        The symbols of the automaton must be integers in range(256). Workers
+        memory-map the file rather than receive its contents.
+
+        Args:
+            path       : Path of file.
+            workers    : Number of worker processes (os.cpu_count() if None).
+            chunk_size : Number of bytes per chunk (an equal share of the file
+                per worker if None).
+
+        Returns:
+            State or None.
+        """
+
+        from pyform.automaton import parallel
+
+        compact = self.compact()
+        state   = parallel.scan_parallel(compact, path, workers, chunk_size)
+
+        return None if state == len(compact.names) else compact.names[state]
+
     def transition(self, states, symbols):
 
         """The set of states obtained by transitioning from some state in
@@ -74,17 +326,21 @@ class DFA(FA):
             states on symbols in symbols.
         """
 
+        symbols = list(symbols)
         return set(
             self.delta[q][a]
-            for (q, a) in zip(states, symbols)
-            if q in self.delta and a in self.delta[a]
+            for q in states if q in self.delta
+            for a in symbols if a in self.delta[q]
         )
 
     def reachable(self, states, symbols):
 
         """The set of states reachable from some state in states via repeated
         transitions on symbols in symbols. This method does not assume the
-        validity of states and symbols passed as arguments.
+        validity of states and symbols passed as arguments (elements of states
+        that are not states are returned but have no transitions). The search
+        takes O(N + M) time over the cached forward adjacency index (see
+        adjacency).
 
         Args:
             states  : Iterable of states.
@@ -95,24 +351,16 @@ class DFA(FA):
             transitions on symbols in symbols. 
         """
 
-        reached  = set()
-        worklist = list(states)
-
-        while worklist:
-            state = worklist.pop()
-            if state not in reached:
-                targets = self.transition([state], symbols)
-                reached.add(state)
-                worklist.extend(targets - reached)
-
-        return reached
+        return self._closure(states, symbols, forwards=True)
 
     def productive(self, states, symbols):
 
         """The set of states that can reach some state in states via repeated
         transitions on symbols in symbols. This method does not assume the
-        validity of states and symbols passed as arguments. This method uses
-        additional space proportional to the number of transitions.
+        validity of states and symbols passed as arguments (see reachable).
+        The search takes O(N + M) time over the cached reverse adjacency
+        index, which records every predecessor of every state (see
+        adjacency).
 
         Args:
             states  : Iterable of states.
@@ -123,173 +371,904 @@ class DFA(FA):
             transitions on symbols in symbols.
         """
 
-        inverse  = {}
-        reached  = set()
-        worklist = list(states)
+        return self._closure(states, symbols, forwards=False)
 
-        for (q, a, r) in self.iterate():
-            if r not in inverse:
-                inverse[r] = {}
-            inverse[r][a] = q
+    def _closure(self, states, symbols, forwards):
 
-        while worklist:
-            state = worklist.pop()
-            if state not in reached:
-                targets = set(chain.from_iterable(
-                    inverse[state][a]
-                    for a in symbols
-                    if state in inverse and a in inverse[state]
-                ))
-                reached.add(state)
-                worklist.extend(targets - reached)
+        """Implementation of reachable and productive."""
+
+        states  = list(states)
+        reached = self.adjacency(forwards).closure(
+            [q for q in states if q in self.states], symbols)
+        reached.update(states)
 
         return reached
 
+    def trim(self):
+
+        """Construct equivalent automaton with the useful states of the current
+        automaton, that is, the states that are reachable from the start state
+        and can reach some final state, and the transitions between them. The
+        start state is always kept. States are not renamed and the alphabet
+        is unchanged. This method takes O(N + M) time on the first call and
+        time proportional to the size of the result afterwards, because the
+        sets of accessible and coaccessible states are maintained (see
+        accessible).
+
+        Returns:
+            DFA instance.
+        """
+
+        useful = self.accessible() & self.coaccessible()
+
+        delta = {}
+        for q in useful:
+            row = {a : r for a, r in self.delta.get(q, {}).items()
+                   if r in useful}
+            if row:
+                delta[q] = row
+
+        return DFA(
+            states = useful | set([self.start]),
+            finals = self.finals & useful,
+            start  = self.start,
+            sigma  = set(self.sigma),
+            delta  = delta
+        )
+
+    def accessible(self):
+
+        """The states reachable from the start state. The set is computed with
+        the cached adjacency indexes and maintained incrementally by the
+        mutation methods (see Distances).
+
+        Returns:
+            Set-like view of states, valid until the next mutation.
+        """
+
+        return self._distances(forwards=True).distance.keys()
+
+    def coaccessible(self):
+
+        """The states from which some final state is reachable (see
+        accessible).
+
+        Returns:
+            Set-like view of states, valid until the next mutation.
+        """
+
+        return self._distances(forwards=False).distance.keys()
+
+    def _distances(self, forwards):
+
+        """Distances from the start state (forwards) or to the final states
+        (backwards), computed on first use and cached."""
+
+        if forwards and self._accessible is not None:
+            return self._accessible
+        if not forwards and self._coaccessible is not None:
+            return self._coaccessible
+
+        adjacency = self.adjacency(forwards)
+        roots     = set([self.start]) if forwards else set(self.finals)
+        levels    = adjacency.levels(adjacency.ids(
+            np.fromiter(roots, dtype=np.int64, count=len(roots))))
+        reached   = levels >= 0
+        distance  = dict(zip(adjacency.states(reached).tolist(),
+                             levels[reached].tolist()))
+
+        following = lambda q: self.delta.get(q, {}).values()
+        preceding = lambda q: self.adjacency(forwards=False).neighbours(q)
+
+        if forwards:
+            self._accessible = Distances(roots, distance, following,
+                                         preceding)
+            return self._accessible
+
+        self._coaccessible = Distances(roots, distance, preceding, following)
+        return self._coaccessible
+
+    def add_state(self, state):
+
+        """Add state without transitions to the automaton. Does nothing if
+        state is a state of the automaton.
+
+        Args:
+            state : Integer.
+        """
+
+        if state in self.states:
+            return
+
+        self._prepare()
+        self.states.add(state)
+        for adjacency in (self._forward, self._reverse):
+            if adjacency is not None:
+                adjacency.add_state(state)
+        self._retain(False, set(), set())
+
+    def add_transition(self, state, symbol, other):
+
+        """Add transition from state to other on symbol, replacing the
+        transition from state on symbol if there is one. Symbol is added to
+        the alphabet. The cached adjacency indexes and sets of accessible and
+        coaccessible states are updated in time proportional to the degrees
+        of the changed states (see Adjacency and Distances), and the cached
+        canonical form and fingerprint are discarded only if the useful part
+        of the automaton changes.
+
+        Args:
+            state  : State.
+            symbol : Hashable object.
+            other  : State.
+        """
+
+        for q in (state, other):
+            if q not in self.states:
+                raise ValueError('unknown state: %r' % (q,))
+
+        if symbol in self.delta.get(state, {}):
+            if self.delta[state][symbol] == other:
+                return
+            self.remove_transition(state, symbol)
+
+        self._prepare()
+        if state not in self.delta:
+            self.delta[state] = {}
+        self.delta[state][symbol] = other
+        self.sigma.add(symbol)
+
+        self._patch(state, symbol, other, added=True)
+        reached = self._update(state, other, added=True)
+        self._retain(self._useful(state) and self._useful(other), *reached)
+
+    def remove_transition(self, state, symbol):
+
+        """Remove transition from state on symbol (see add_transition). The
+        alphabet is unchanged.
+
+        Args:
+            state  : State.
+            symbol : Hashable object.
+
+        Returns:
+            The state the removed transition led to.
+        """
+
+        if symbol not in self.delta.get(state, {}):
+            raise ValueError('unknown transition: %r' % ((state, symbol),))
+
+        self._prepare()
+        other  = self.delta[state][symbol]
+        useful = self._useful(state) and self._useful(other)
+
+        del self.delta[state][symbol]
+        if not self.delta[state]:
+            del self.delta[state]
+
+        self._patch(state, symbol, other, added=False)
+        lost = self._update(state, other, added=False)
+        self._retain(useful, *lost)
+
+        return other
+
+    def set_final(self, state, final=True):
+
+        """Add state to (or remove state from) the final states. The cached
+        sets of coaccessible states, canonical form and fingerprint are
+        maintained as in add_transition.
+
+        Args:
+            state : State.
+            final : Boolean indicating whether state becomes final.
+        """
+
+        if state not in self.states:
+            raise ValueError('unknown state: %r' % (state,))
+        if (state in self.finals) == bool(final):
+            return
+
+        self._prepare()
+        accessible = self._accessible is None or \
+                     state in self._accessible.distance
+
+        changed = set()
+        if final:
+            self.finals.add(state)
+            if self._coaccessible is not None:
+                changed = self._coaccessible.add_root(state)
+        else:
+            self.finals.discard(state)
+            if self._coaccessible is not None:
+                changed = self._coaccessible.remove_root(state)
+
+        self._retain(accessible, set(), changed)
+
+    def _prepare(self):
+
+        """Discard the array-backed form before a mutation and compute the
+        distances needed to decide whether the canonical form survives it."""
+
+        self._compact = None
+        if self._canonical is not None or self._fingerprint is not None:
+            self._distances(forwards=True)
+            self._distances(forwards=False)
+
+    def _patch(self, state, symbol, other, added):
+
+        """Update the cached adjacency indexes after a mutation of the
+        transition from state to other on symbol, discarding stale ones."""
+
+        if self._forward is not None:
+            update = self._forward.add if added else self._forward.remove
+            update(state, symbol, other)
+            if self._forward.stale():
+                self._forward = None
+
+        if self._reverse is not None:
+            update = self._reverse.add if added else self._reverse.remove
+            update(other, symbol, state)
+            if self._reverse.stale():
+                self._reverse = None
+
+    def _update(self, state, other, added):
+
+        """Update the cached distances after a mutation of a transition from
+        state to other. Returns the sets of states whose accessibility and
+        coaccessibility changed."""
+
+        accessible, coaccessible = set(), set()
+        if self._accessible is not None:
+            update = self._accessible.insert if added else \
+                     self._accessible.delete
+            accessible = update(state, other)
+        if self._coaccessible is not None:
+            update = self._coaccessible.insert if added else \
+                     self._coaccessible.delete
+            coaccessible = update(other, state)
+
+        return accessible, coaccessible
+
+    def _useful(self, state):
+
+        # whether state is accessible and coaccessible (true if unknown)
+
+        return (self._accessible is None or
+                state in self._accessible.distance) and \
+               (self._coaccessible is None or
+                state in self._coaccessible.distance)
+
+    def _retain(self, touched, accessible, coaccessible):
+
+        """Discard the cached canonical form and fingerprint unless the useful
+        part of the automaton is unchanged, that is, unless the mutation
+        touched a useful state or changed the accessibility (coaccessibility)
+        of a coaccessible (accessible) state."""
+
+        if self._canonical is None and self._fingerprint is None:
+            return
+
+        reached = self._accessible.distance
+        useful  = self._coaccessible.distance
+        changed = any(q in useful or q in coaccessible
+                      for q in accessible) or \
+                  any(q in reached or q in accessible
+                      for q in coaccessible)
+
+        if touched or changed or self._canonical is self:
+            self._canonical   = None
+            self._fingerprint = None
+
+    def compress_alphabet(self):
+
+        """Construct the automaton over the classes of symbols that act
+        identically in every state (see symbol_classes). The result has the
+        same states, finals and start state and one transition per class
+        where the current automaton has one per symbol, so algorithms that
+        loop over the alphabet (such as minimize, product and
+        equivalent_hopcroft_karp, see their compress arguments) do less work
+        by the compression factor. The result accepts the word [classes[a]
+        for a in w] iff the current automaton accepts w, and expand_alphabet
+        inverts the construction.
+
+        Returns:
+            (dfa, classes) where dfa is a DFA instance whose symbols are
+            class ids and classes is a dictionary mapping the symbols of
+            sigma to class ids.
+        """
+
+        _, classes = symbol_classes([self])
+        return self._relabel(classes), classes
+
+    def expand_alphabet(self, classes):
+
+        """Construct the automaton over symbols from an automaton over class
+        ids (see compress_alphabet) by replacing each transition on a class
+        with transitions on every symbol of the class.
+
+        Args:
+            classes : Dictionary mapping symbols to class ids.
+
+        Returns:
+            DFA instance.
+        """
+
+        members = {}
+        for a, c in classes.items():
+            if c not in members:
+                members[c] = []
+            members[c].append(a)
+
+        delta = {}
+        for q, m in self.delta.items():
+            delta[q] = {a : r for c, r in m.items() for a in members[c]}
+
+        return DFA(
+            states = set(self.states),
+            finals = set(self.finals),
+            start  = self.start,
+            sigma  = set(a for c in self.sigma for a in members.get(c, ())),
+            delta  = delta
+        )
+
+    def _relabel(self, classes):
+
+        """The automaton with every symbol replaced by its class id."""
+
+        delta = {}
+        for q, m in self.delta.items():
+            delta[q] = {classes[a] : r for a, r in m.items()}
+
+        return DFA(
+            states = set(self.states),
+            finals = set(self.finals),
+            start  = self.start,
+            sigma  = set(classes[a] for a in self.sigma),
+            delta  = delta
+        )
+
     def complete(self):
 
         return NotImplementedError
 
-    def minimize_valmari(self):
+    def minimize_valmari(self, engine='python', stats=None):
 
         """Construct equivalent (up to isomorphism) minimal partial DFA using
         Valmari's algorithm [1]. This algorithm runs in O(N + M log M) time
         where N is the number of states and M the number of transitions and
         consumes O(N + M) additional space.
 
-        In contrast with [1] this algorithm does not share memory for marked
-        and touched states between the blocks and cords partitions. Because
-        of the way transition functions are represented, the transition data
-        structure used in the algorithm requires O(M) addtional space.
+        As in [1] the blocks and cords partitions share their arrays of marked
+        and touched sets (see shared_buffers), and the partitions are stored
+        in typed arrays of 32-bit integers. Because of the way transition
+        functions are represented, the transition data structure used in the
+        algorithm requires O(M) addtional space.
+
+        The engine argument selects the implementation. The 'python' engine
+        stores its data structures in Python lists. The 'numpy' engine stores
+        them in typed arrays and vectorizes the counting sort, the removal of
+        unreachable and unproductive transitions and the initial partitions
+        of states and transitions using NumPy (see ArrayValmariState); the
+        refinement loop is shared. Both engines return isomorphic automata.
+
+        If stats is a Stats instance it receives the times of the phases
+        reachability, co-reachability, partitioning, refinement and
+        reconstruction, the numbers of marks and splits of the blocks and
+        cords partitions and their sizes (see CountingPartition). Without
+        stats the algorithm runs unchanged.
 
         [1] Valmari, Antti. 2012. Fast brief practical DFA minimization. Inf-
         ormation Processing Letters. 112(6): 213-217.
+
+        Args:
+            engine : String 'python' or 'numpy'.
+            stats  : Stats instance or None.
+
+        Returns:
+            Minimal partial DFA equivalent to the current automaton.
         """
 
+        if engine == 'numpy':
+            return self._minimize_valmari_numpy(stats)
+        if engine != 'python':
+            raise ValueError('unknown engine: %r' % (engine,))
+
+        phase     = phases(stats)
+        partition = Partition if stats is None else CountingPartition
+
         # initialize blocks partition and transition data structure
 
-        vstate = ValmariState(self)
-        blocks = Partition(vstate.num_states, key=None)
+        with phase('reachability'):
+            vstate  = ValmariState(self)
+            buffers = shared_buffers(max(vstate.num_states, vstate.num_trans))
+            blocks  = partition(vstate.num_states, None, buffers)
+            if stats is not None:
+                blocks.attach(stats, 'blocks')
 
-        # remove unreachable states from adjacent transitions
+            # remove unreachable states from adjacent transitions
 
-        vstate.reach(blocks, self.start)
-        vstate.remove_unreachable(blocks, forwards=True)
+            vstate.reach(blocks, self.start)
+            vstate.remove_unreachable(blocks, forwards=True)
 
         # remove unproductive states from adjacent transitions
 
-        for state in self.finals:
-            if blocks.location[state] < blocks.past[0]:
-                vstate.reach(blocks, state)
+        with phase('co-reachability'):
+            for state in self.finals:
+                if blocks.location[state] < blocks.past[0]:
+                    vstate.reach(blocks, state)
 
-        vstate.num_finals = vstate.num_reached
-        vstate.remove_unreachable(blocks, forwards=False)
+            vstate.num_finals = vstate.num_reached
+            vstate.remove_unreachable(blocks, forwards=False)
 
         # partition states into final and nonfinal states if the number of
-        # useful final states is nonzero.
-        
-        blocks.marked[0] = vstate.num_finals
-        if vstate.num_finals:
-            blocks.touched[blocks.num_touched] = 0
-            blocks.num_touched += 1
-            blocks.split()
+        # useful final states is nonzero and partition transitions by labels
 
-        # initialize cords partition and partition by transition labels
+        with phase('partitioning'):
+            blocks.marked[0] = vstate.num_finals
+            if vstate.num_finals:
+                blocks.touched[blocks.num_touched] = 0
+                blocks.num_touched += 1
+                blocks.split()
 
-        cords = Partition(vstate.num_trans, key=vstate.labels.__getitem__)
+            cords = partition(vstate.num_trans, vstate.labels.__getitem__,
+                              buffers)
+            if stats is not None:
+                cords.attach(stats, 'cords')
 
         # refine blocks and cords until all blocks and cords are compatible
 
-        block = 1
-        cord  = 0
-
-        vstate.make_adjacent(forwards=False)
-
-        while cord < cords.size:
-            for i in range(cords.first[cord], cords.past[cord]):
-                blocks.mark(vstate.tails[cords.elements[i]])
-            blocks.split()
-            cord += 1
-            while block < blocks.size:
-                for i in range(blocks.first[block], blocks.past[block]):
-                    for j in range(vstate.offset[blocks.elements[i]],
-                                   vstate.offset[blocks.elements[i] + 1]):
-                        cords.mark(vstate.adjacent[j])
-                cords.split()
-                block += 1
+        with phase('refinement'):
+            vstate.refine(blocks, cords)
 
         # construct minimized partial dfa (note that the alphabet of the
         # minimized dfa may be a proper subset of the original alphabet)
 
-        delta  = {}
-        sigma  = set()
+        with phase('reconstruction'):
+            delta  = {}
+            sigma  = set()
+
+            for i in range(vstate.num_trans):
+                source = blocks.setof[vstate.tails[i]]
+                if blocks.location[vstate.tails[i]] == blocks.first[source]:
+                    label = vstate.labels[i]
+                    if source not in delta:
+                        delta[source] = {}
+                    delta[source][label] = blocks.setof[vstate.heads[i]]
+                    sigma.add(label)
+
+            result = DFA(
+                states = set(range(blocks.size)),
+                finals = set(i for i in range(blocks.size)
+                             if blocks.first[i] < vstate.num_finals),
+                start  = blocks.setof[self.start],
+                sigma  = sigma,
+                delta  = delta
+            )
+
+        if stats is not None:
+            stats.peak('transitions', len(vstate.tails))
+            stats.finish()
+        return result
+
+    def minimize_hopcroft(self):
 
-        for i in range(vstate.num_trans):
-            source = blocks.setof[vstate.tails[i]]
-            if blocks.location[vstate.tails[i]] == blocks.first[source]:
-                label = vstate.labels[i]
-                if source not in delta:
-                    delta[source] = {}
-                delta[source][label] = blocks.setof[vstate.heads[i]]
-                sigma.add(label)
+        """Construct equivalent (up to isomorphism) minimal partial DFA using
+        Hopcroft's algorithm. The useful part of the automaton is completed
+        with a sink state (see RefinementState), so this algorithm runs in
+        O(K N log N) time and consumes O(K N) additional space where K is the
+        number of symbols. The result is isomorphic with the result of
+        minimize_valmari.
 
-        return DFA(
-            states = set(range(blocks.size)),
-            finals = set(i for i in range(blocks.size)
-                         if blocks.first[i] < vstate.num_finals),
-            start  = blocks.setof[self.start],
-            sigma  = sigma,
-            delta  = delta
-        )
+        Returns:
+            Minimal partial DFA equivalent to the current automaton.
+        """
+
+        rstate = RefinementState(self)
+        blocks = rstate.partition()
+        rstate.hopcroft(blocks)
+        return DFA(**rstate.construct(self, blocks))
+
+    def minimize_moore(self):
 
-    def equivalent_hopcroft_karp(self, dfa):
+        """Construct equivalent (up to isomorphism) minimal partial DFA using
+        rounds of refinement in the style of Moore's algorithm (see
+        minimize_hopcroft). Each round takes O(K N) time, and the number of
+        rounds is small for automata whose states are distinguished by short
+        words. The result is isomorphic with the result of minimize_valmari.
+
+        Returns:
+            Minimal partial DFA equivalent to the current automaton.
+        """
+
+        rstate = RefinementState(self)
+        blocks = rstate.partition()
+        rstate.moore(blocks)
+        return DFA(**rstate.construct(self, blocks))
+
+    def minimize(self, strategy='auto', compress=False):
+
+        """Construct equivalent (up to isomorphism) minimal partial DFA using
+        the given strategy. Every strategy returns isomorphic results. The
+        strategy 'auto' chooses a strategy from the number of states, the
+        number of symbols and the density (the number of transitions relative
+        to a complete automaton): Moore's algorithm for very small automata,
+        Hopcroft's algorithm for dense automata over small alphabets (which
+        need little completion) and Valmari's algorithm otherwise. The
+        thresholds are class attributes (see benchmarks/minimize.py). Unlike
+        minimize_valmari, this method does not require the states to be
+        range(len(states)).
+
+        If compress is true the automaton over the classes of symbols that
+        act identically is minimized (see compress_alphabet), so that every
+        strategy handles one transition per class, and the result is
+        expanded to the symbols.
+
+        Args:
+            strategy : String 'valmari', 'hopcroft', 'moore' or 'auto'.
+            compress : Boolean indicating whether to compress the alphabet.
+
+        Returns:
+            Minimal partial DFA equivalent to the current automaton.
+        """
+
+        if compress:
+            reduced, classes = self.compress_alphabet()
+            return reduced.minimize(strategy).expand_alphabet(classes)
+
+        if strategy == 'auto':
+            num_states = len(self.states)
+            num_trans  = sum(len(m) for m in self.delta.values())
+            density    = num_trans / max(1, num_states * len(self.sigma))
+            if num_states <= self.MOORE_STATES:
+                strategy = 'moore'
+            elif density >= self.HOPCROFT_DENSITY and \
+                 len(self.sigma) <= self.HOPCROFT_SYMBOLS:
+                strategy = 'hopcroft'
+            else:
+                strategy = 'valmari'
+
+        if strategy == 'valmari':
+            if self.states and (min(self.states) != 0 or
+                                max(self.states) != len(self.states) - 1):
+                return self.compact().minimize_valmari()
+            return self.minimize_valmari()
+        if strategy == 'hopcroft':
+            return self.minimize_hopcroft()
+        if strategy == 'moore':
+            return self.minimize_moore()
+
+        raise ValueError('unknown strategy: %r' % (strategy,))
+
+    def _minimize_valmari_numpy(self, stats=None):
+
+        """Implementation of minimize_valmari with engine='numpy'."""
+
+        phase     = phases(stats)
+        partition = Partition if stats is None else CountingPartition
+
+        # remove unreachable and unproductive states from adjacent transitions
+
+        with phase('reachability'):
+            vstate  = ArrayValmariState(self)
+            reached = vstate.search([self.start], forwards=True)
+            vstate.restrict(reached)
+
+        with phase('co-reachability'):
+            finals = np.fromiter(self.finals, dtype=np.int64,
+                                 count=len(self.finals))
+            finals = finals[reached[finals]]
+            useful = vstate.search(finals, forwards=False)
+            vstate.restrict(useful)
+
+        # partition useful states into final states (block 0) and nonfinal
+        # states (block 1) and transitions by labels
+
+        with phase('partitioning'):
+            keys = np.where(useful, 1, -1)
+            keys[finals] = 0
+
+            vstate.num_finals = len(finals)
+            buffers = shared_buffers(max(vstate.num_states, vstate.num_trans))
+            blocks  = partition.from_keys(keys, buffers)
+            blocks.size = max(blocks.size, 1)
+            cords   = partition.from_keys(
+                vstate.labels_view[:vstate.num_trans], buffers)
+            if stats is not None:
+                blocks.attach(stats, 'blocks')
+                cords.attach(stats, 'cords')
+
+        # refine blocks and cords until all blocks and cords are compatible
+
+        with phase('refinement'):
+            vstate.refine(blocks, cords)
+
+        # construct minimized partial dfa from the transitions of the first
+        # state of each block
+
+        with phase('reconstruction'):
+            setof    = view(blocks.setof)
+            location = view(blocks.location)
+            first    = view(blocks.first)[:blocks.size]
+
+            tails  = vstate.tails_view[:vstate.num_trans]
+            source = setof[tails]
+            chosen = location[tails] == first[source]
+            labels = vstate.labels_view[:vstate.num_trans][chosen]
+            heads  = vstate.heads_view[:vstate.num_trans][chosen]
+
+            delta = {}
+            for q, a, r in zip(source[chosen].tolist(), labels.tolist(),
+                               setof[heads].tolist()):
+                if q not in delta:
+                    delta[q] = {}
+                delta[q][vstate.symbols[a]] = r
+
+            result = DFA(
+                states = set(range(blocks.size)),
+                finals = set(np.flatnonzero(first < vstate.num_finals)
+                             .tolist()),
+                start  = int(setof[self.start]),
+                sigma  = set(vstate.symbols[a]
+                             for a in np.unique(labels).tolist()),
+                delta  = delta
+            )
+
+        if stats is not None:
+            stats.peak('transitions', len(vstate.tails))
+            stats.finish()
+        return result
+
+    def equivalent_hopcroft_karp(self, dfa, stats=None, compress=False):
 
         """Determine whether the current and argument automata are equivalent
         using Hopcroft and Karp's algorithm [1]. Returns a shortest witness
         accepted by precisely one automaton if they are not equivalent. This
         implementation uses a disjoint set data structure to achieve almost
-        linear time complexity.
+        linear time complexity. The search runs over the union of the
+        alphabets and stores one parent pointer per visited pair of states,
+        from which the witness is rebuilt only on failure (see
+        EquivalenceIndex).
 
         This method does not assume that the automata are complete or have
-        disjoint state sets. Instead, it standardizes the state sets apart and
+        disjoint state sets. Instead, it renumbers the state sets apart and
         employs virtual dummy states.
 
+        If stats is a Stats instance it receives the time of the search (the
+        phase search), the number of pairs of states taken from the queue
+        (pairs), the numbers of find and union operations (see
+        CountingIntDisjointSet) and the largest queue length and disjoint set
+        size.
+
+        If compress is true the search runs on the automata over the classes
+        of symbols that act identically in both automata (see
+        symbol_classes), so every pair of states has one successor per class
+        rather than per symbol, and the witness is expressed in the smallest
+        symbols of the classes.
+
         [1] Bonchi, Filippo & Pous, Damien. 2013. Checking NFA Equivalence with
         Bisimulations up to Congruence. Conference Record of the Annual ACM
         Symbposium on Principles of Programming Languages. 457-68.
         
         Args:
-            dfa : DFA instance.
+            dfa      : DFA instance.
+            stats    : Stats instance or None.
+            compress : Boolean indicating whether to compress the alphabets.
 
         Returns:
             (b, w) where b is a boolean indicating whether the automata are
             equivalent and w is either None or a shortest witness if they are
             not equivalent.
         """
-        
-        dummy1  = 1 + max(self.states)
-        dummy2  = 1 + max(dfa.states)
-        offset  = 1 + dummy1
 
-        equiv   = DisjointSet()
-        queue   = deque([([], self.start, dfa.start)])
+        if compress:
+            representatives, classes = symbol_classes([self, dfa])
+            equivalent, witness = self._relabel(classes) \
+                .equivalent_hopcroft_karp(dfa._relabel(classes), stats)
+            if witness is not None:
+                witness = [representatives[c] for c in witness]
+            return (equivalent, witness)
+
+        if stats is not None:
+            with stats.phase('search'):
+                result = self._hopcroft_karp(dfa, stats)
+            stats.finish()
+            return result
+
+        return self._hopcroft_karp(dfa)
+
+    def _hopcroft_karp(self, dfa, stats=None):
+
+        """Implementation of equivalent_hopcroft_karp."""
+
+        from pyform.automaton.equivalence import EquivalenceIndex
+
+        return EquivalenceIndex(self).equivalent(EquivalenceIndex(dfa), stats)
+
+    @staticmethod
+    def equivalent_many(reference, dfas):
+
+        """Determine whether each of many automata is equivalent to a
+        reference automaton (see equivalent_hopcroft_karp). The index of the
+        reference automaton (see EquivalenceIndex) is built once and reused
+        for every check.
+
+        Args:
+            reference : DFA instance.
+            dfas      : Iterable of DFA instances.
+
+        Returns:
+            List of pairs (b, w) as returned by equivalent_hopcroft_karp, one
+            per automaton of dfas.
+        """
+
+        from pyform.automaton.equivalence import EquivalenceIndex
+
+        index = EquivalenceIndex(reference)
+        return [index.equivalent(EquivalenceIndex(dfa)) for dfa in dfas]
+
+    def is_empty(self):
+
+        """Determine whether the language of the automaton is empty using
+        breadth-first search from the start state. The search stops at the
+        first final state reached.
+
+        Returns:
+            (b, w) where b is a boolean indicating whether the language is
+            empty and w is either None or a shortest accepted word if it is
+            not empty.
+        """
+
+        parents = {self.start : None}
+        queue   = deque([self.start])
 
         while queue:
-            witness, q1, r1 = queue.popleft()
-            if equiv.find(q1) == equiv.find(r1 + offset):
-                continue
-            if (q1 in self.finals) ^ (r1 in dfa.finals):
-                return (False, witness)
-            for symbol in self.sigma:
-                q2 = self.delta[q1].get(symbol, dummy1) \
-                     if q1 in self.delta else dummy1
-                r2 = dfa.delta[r1].get(symbol, dummy2) \
-                     if r1 in dfa.delta else dummy2
-                queue.append((witness + [symbol], q2, r2))
-            equiv.union(q1, r1 + offset)
+            q = queue.popleft()
+            if q in self.finals:
+                return (False, _witness(parents, q))
+            for a, r in self.delta.get(q, {}).items():
+                if r not in parents:
+                    parents[r] = (q, a)
+                    queue.append(r)
 
         return (True, None)
 
-    def product(self, dfa, f):
+    def count(self, n, upto=False):
+
+        """Number of accepted words of length n, or of length at most n if
+        upto is true, by dynamic programming over the transitions of the
+        useful states (see WordCounter). Each length costs one vectorized
+        step over the transitions, in int64 arithmetic while counts are small
+        and with exact Python integers once they could overflow.
+
+        Args:
+            n    : Nonnegative integer.
+            upto : Boolean indicating whether to count the words of every
+                length up to n.
+
+        Returns:
+            Integer.
+        """
+
+        from pyform.automaton.counting import WordCounter
+
+        if n < 0:
+            raise ValueError('negative length: %r' % (n,))
+
+        return WordCounter(self).count(n, upto)
+
+    def enumerate(self, max_length=None):
+
+        """Generator yielding the accepted words in shortlex order, that is,
+        by length and then lexicographically in the order of sort_symbols.
+        Only useful states (see accessible and coaccessible) are explored,
+        and a state is entered only if it reaches a final state in exactly
+        the remaining number of steps, so generation never explores dead
+        branches (see enumerate_words). The generator is infinite if the
+        language is and max_length is None.
+
+        Args:
+            max_length : Largest length of the generated words, or None.
+
+        Returns:
+            Generator yielding lists of symbols.
+        """
+
+        from pyform.automaton.counting import enumerate_words
+
+        return enumerate_words(self, max_length)
+
+    def product_check(self, dfa, f):
+
+        """Search the product of the current and argument automata for a word
+        w such that f(w in L(self), w in L(dfa)) is true, without constructing
+        the product (see product). Pairs of states are explored on demand in
+        breadth-first order and the search stops at the first witness, so
+        only the explored pairs and their parent pointers are stored. A
+        missing transition is represented by the state None on that side.
+
+        Args:
+            dfa : DFA instance.
+            f   : Boolean function of two variables.
+
+        Returns:
+            (b, w) where b is a boolean indicating whether such a word exists
+            and w is either None or a shortest such word.
+        """
+
+        symbols = sort_symbols(self.sigma.union(dfa.sigma))
+        order   = {a : i for i, a in enumerate(symbols)}
+        dead    = (None, None)
+        sink    = f(False, False)
+
+        start   = (self.start, dfa.start)
+        parents = {start : None}
+        queue   = deque([start])
+
+        if f(self.start in self.finals, dfa.start in dfa.finals):
+            return (True, [])
+
+        while queue:
+            q1, r1 = pair = queue.popleft()
+            row1 = self.delta.get(q1, {}) if q1 is not None else {}
+            row2 = dfa.delta.get(r1, {}) if r1 is not None else {}
+
+            labels = set(row1.keys())
+            labels.update(row2.keys())
+            for a in sorted(labels, key=order.__getitem__):
+                child = (row1.get(a), row2.get(a))
+                if child in parents:
+                    continue
+                parents[child] = (pair, a)
+                if f(child[0] in self.finals, child[1] in dfa.finals):
+                    return (True, _witness(parents, child))
+                if child != dead:
+                    queue.append(child)
+
+            # symbols undefined on both sides lead to the dead pair, which
+            # is only a witness (and otherwise never explored) if f(False,
+            # False) is true
+
+            if sink and len(labels) < len(symbols) and dead not in parents:
+                a = next(a for a in symbols if a not in labels)
+                parents[dead] = (pair, a)
+                return (True, _witness(parents, dead))
+
+        return (False, None)
+
+    def intersects(self, dfa):
+
+        """Determine whether the languages of the current and argument
+        automata intersect (see product_check).
+
+        Args:
+            dfa : DFA instance.
+
+        Returns:
+            (b, w) where b is a boolean indicating whether the languages
+            intersect and w is either None or a shortest word accepted by
+            both automata.
+        """
+
+        return self.product_check(dfa, lambda a, b: a and b)
+
+    def includes(self, dfa):
+
+        """Determine whether the language of the current automaton includes
+        the language of the argument automaton (see product_check).
+
+        Args:
+            dfa : DFA instance.
+
+        Returns:
+            (b, w) where b is a boolean indicating whether L(dfa) is a subset
+            of L(self) and w is either None or a shortest word accepted by
+            dfa but not by the current automaton.
+        """
+
+        found, witness = self.product_check(dfa, lambda a, b: b and not a)
+        return (not found, witness)
+
+    def product(self, dfa, f, compress=False):
 
         """Generalized product of current and argument automata with respect
         to boolean function f. The states of the resulting automata represent
@@ -300,15 +1279,27 @@ class DFA(FA):
         alphabets, this method inserts a sink state (and derived products)
         into the resulting automaton.        
 
+        If compress is true the product of the automata over the classes of
+        symbols that act identically in both automata (see symbol_classes)
+        is constructed, so every pair of states is expanded once per class,
+        and the result is expanded to the symbols.
+
         Args:
-            dfa : DFA instance.
-            f   : Boolean function of two variables.
+            dfa      : DFA instance.
+            f        : Boolean function of two variables.
+            compress : Boolean indicating whether to compress the alphabets.
 
         Returns:
             Generalized product of current and argument automata with respect
             to boolean function f.
         """
 
+        if compress:
+            _, classes = symbol_classes([self, dfa])
+            reduced    = self._relabel(classes)
+            return reduced.product(dfa._relabel(classes), f) \
+                          .expand_alphabet(classes)
+
         delta    = {}
         states   = {(self.start, dfa.start) : 0}
         sigma    = self.sigma.union(dfa.sigma)
@@ -325,7 +1316,7 @@ class DFA(FA):
                 if (q2, r2) not in states:
                     states[(q2, r2)] = index
                     index += 1
-                    worklist.add((q2, r2))
+                    worklist.append((q2, r2))
 
                 source = states[(q1, r1)]
                 target = states[(q2, r2)]
@@ -344,7 +1335,119 @@ class DFA(FA):
             sigma  = sigma,
             delta  = delta
         )
-    
+
+    @staticmethod
+    def product_many(dfas, f, workers=None, steps=None, monotone=False):
+
+        """Generalized product of many automata with respect to an n-ary
+        boolean function f. Unlike chained calls of product, the automata are
+        combined pairwise in order of increasing size and every intermediate
+        product is minimized with respect to the acceptance bits of all its
+        components (using minimize_valmari), which keeps the intermediate
+        state counts small (see pyform.automaton.product).
+
+        Args:
+            dfas     : List of DFA instances.
+            f        : Boolean function of len(dfas) variables.
+            workers  : Number of worker processes computing independent
+                pairwise products, or None (products are computed in this
+                process).
+            steps    : List to which a ProductStep (with the sizes and timing
+                of a pairwise product) is appended for each pairwise product,
+                or None.
+            monotone : Boolean indicating whether f is monotone (such as all,
+                any or threshold functions), in which case states from which
+                no word can be accepted are removed from intermediate
+                products.
+
+        Returns:
+            Minimal partial DFA accepting w iff f(w in L(dfas[0]), ..., w in
+            L(dfas[n - 1])) is true.
+        """
+
+        from pyform.automaton import product
+
+        return product.product_many(dfas, f, workers, steps, monotone)
+
+    def canonical(self):
+
+        """Construct the canonical form of the automaton: the minimal partial
+        DFA (see minimize) whose states are numbered in breadth-first order
+        from the start state, visiting the outgoing transitions of each state
+        in sorted order of their symbols (see sort_symbols). Automata accept
+        the same language iff their canonical forms have the same states,
+        finals, start, sigma and delta. The result is cached.
+
+        Returns:
+            DFA instance.
+        """
+
+        if self._canonical is not None:
+            return self._canonical
+
+        minimal = self.minimize()
+        symbols = sort_symbols(minimal.sigma)
+        ids     = {minimal.start : 0}
+        queue   = deque([minimal.start])
+        delta   = {}
+
+        while queue:
+            q = queue.popleft()
+            if q not in minimal.delta:
+                continue
+            row = minimal.delta[q]
+            delta[ids[q]] = {}
+            for a in symbols:
+                if a in row:
+                    if row[a] not in ids:
+                        ids[row[a]] = len(ids)
+                        queue.append(row[a])
+                    delta[ids[q]][a] = ids[row[a]]
+
+        canonical = DFA(
+            states = set(range(len(ids))),
+            finals = set(ids[q] for q in minimal.finals if q in ids),
+            start  = 0,
+            sigma  = set(minimal.sigma),
+            delta  = delta
+        )
+
+        canonical._canonical = canonical
+        self._canonical = canonical
+        return canonical
+
+    def fingerprint(self):
+
+        """Stable hash of the canonical form of the automaton (see canonical).
+        Automata accepting the same language have equal fingerprints, so
+        equivalent automata can be deduplicated with a dictionary keyed by
+        fingerprint. Symbols are serialized by their type names and
+        representations, so fingerprints are stable across processes when
+        symbol representations are (as for strings and integers). The result
+        is cached.
+
+        Returns:
+            Hexadecimal string (SHA-256 digest).
+        """
+
+        if self._fingerprint is not None:
+            return self._fingerprint
+
+        canonical = self.canonical()
+        digest    = hashlib.sha256()
+
+        def update(*items):
+            digest.update(repr(items).encode('utf-8'))
+            digest.update(b'\n')
+
+        update(len(canonical.states), sorted(canonical.finals))
+        for q in range(len(canonical.states)):
+            for a, r in canonical.delta.get(q, {}).items():
+                update(q, type(a).__name__, repr(a), r)
+
+        self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
     def isomorphic(self, dfa):
 
         """Let M and N be the subautomata induced by discarding any states
@@ -395,4 +1498,15 @@ class DFA(FA):
 
         return isomorphism
 
-    
+def _witness(parents, node):
+
+    """Word labelling the path from the root of a breadth-first search tree
+    to node, where parents maps each node to a pair (parent, symbol) and the
+    root to None."""
+
+    word = []
+    while parents[node] is not None:
+        node, symbol = parents[node]
+        word.append(symbol)
+    word.reverse()
+    return word
@@ -0,0 +1,156 @@
+import numpy as np
+from collections import deque
+from pyform.automaton.compact import CompactDFA
+from pyform.common.alphabet import sort_symbols
+from pyform.common.disjoint import IntDisjointSet
+from pyform.common.stats import CountingIntDisjointSet
+from pyform.common.stats import CountingQueue
+
+class EquivalenceIndex(object):
+
+    """Stores a DFA as lists of successor ids for implementation of Hopcroft
+    and Karp's algorithm (DFA.equivalent_hopcroft_karp and
+    DFA.equivalent_many). An index depends only on its automaton, so it can
+    be built once and checked against many other indexes.
+
+    The states of the DFA are renumbered in range(num_states). The state
+    num_states is a nonfinal dummy state. Symbols are interned to columns in
+    sorted order (see sort_symbols), and every row has one more column, the
+    column num_symbols, which leads to the dummy state (as do undefined
+    transitions and every transition of the dummy state). A symbol that is
+    not in the alphabet is therefore looked up in column num_symbols.
+
+    Attributes:
+        num_states : Number of states (and the dummy state).
+        start      : Start state id.
+        finals     : List of booleans indicating whether states are final.
+        symbols    : List mapping columns to symbols.
+        columns    : Dictionary mapping symbols to columns.
+        rows       : List of lists mapping columns to successor ids.
+    """
+
+    def __init__(self, dfa):
+
+        if isinstance(dfa, CompactDFA):
+            self._from_table(dfa)
+            return
+
+        self.symbols    = sort_symbols(dfa.sigma)
+        self.columns    = {a : i for i, a in enumerate(self.symbols)}
+        self.num_states = len(dfa.states)
+
+        ids   = {q : i for i, q in enumerate(dfa.states)}
+        dummy = self.num_states
+        width = len(self.symbols) + 1
+
+        self.start  = ids[dfa.start]
+        self.finals = [False] * (dummy + 1)
+        for q in dfa.finals:
+            self.finals[ids[q]] = True
+
+        self.rows = [None] * (dummy + 1)
+        for q, i in ids.items():
+            row = [dummy] * width
+            for a, r in dfa.delta.get(q, {}).items():
+                row[self.columns[a]] = ids[r]
+            self.rows[i] = row
+        self.rows[dummy] = [dummy] * width
+
+    def _from_table(self, dfa):
+
+        """Build the index from the dense table of a CompactDFA, whose states
+        are state ids already."""
+
+        self.symbols    = list(dfa.symbols)
+        self.columns    = dict(dfa.index)
+        self.num_states = dummy = dfa.table.shape[0]
+        self.start      = dfa.start
+
+        self.finals = [False] * (dummy + 1)
+        for q in dfa.finals:
+            self.finals[q] = True
+
+        table = np.full((dummy + 1, len(self.symbols) + 1), dummy,
+                        dtype=np.int64)
+        table[:dummy, :-1] = np.where(dfa.table == dfa.SENTINEL, dummy,
+                                      dfa.table)
+        self.rows = table.tolist()
+
+    def equivalent(self, other, stats=None):
+
+        """Determine whether the automata of the current and argument indexes
+        are equivalent using Hopcroft and Karp's algorithm over the union of
+        their alphabets (see DFA.equivalent_hopcroft_karp). Pairs of states
+        are encoded as integers and explored in breadth-first order, each at
+        most once, and the search stores one parent pointer per pair, from
+        which the shortest witness is rebuilt only if the automata are not
+        equivalent.
+
+        Args:
+            other : EquivalenceIndex instance.
+            stats : Stats instance or None.
+
+        Returns:
+            (b, w) where b is a boolean indicating whether the automata are
+            equivalent and w is either None or a shortest witness if they are
+            not equivalent.
+        """
+
+        symbols = sort_symbols(set(self.columns).union(other.columns))
+        missing = (len(self.symbols), len(other.symbols))
+        columns = [(self.columns.get(a, missing[0]),
+                    other.columns.get(a, missing[1])) for a in symbols]
+
+        rows1   = self.rows
+        rows2   = other.rows
+        finals1 = self.finals
+        finals2 = other.finals
+
+        # the pair (q, r) is encoded as q * width + r, and the states of the
+        # argument automaton are offset in the disjoint set
+
+        width   = other.num_states + 1
+        offset  = self.num_states + 1
+        start   = self.start * width + other.start
+        parents = {start : None}
+
+        if stats is None:
+            equiv = IntDisjointSet(offset + width)
+            queue = deque([start])
+        else:
+            equiv = CountingIntDisjointSet(stats, offset + width)
+            queue = CountingQueue(stats, [start])
+
+        try:
+            while queue:
+                pair = queue.popleft()
+                q1, r1 = divmod(pair, width)
+                if equiv.find(q1) == equiv.find(r1 + offset):
+                    continue
+                if finals1[q1] != finals2[r1]:
+                    return (False, _witness(parents, pair, symbols))
+                row1 = rows1[q1]
+                row2 = rows2[r1]
+                for k, (i, j) in enumerate(columns):
+                    child = row1[i] * width + row2[j]
+                    if child not in parents:
+                        parents[child] = (pair, k)
+                        queue.append(child)
+                equiv.union(q1, r1 + offset)
+        finally:
+            if stats is not None:
+                equiv.finish()
+
+        return (True, None)
+
+def _witness(parents, pair, symbols):
+
+    """Word labelling the path from the start pair to pair, where parents
+    maps each pair to a pair (parent, column) and the start pair to None."""
+
+    word = []
+    while parents[pair] is not None:
+        pair, k = parents[pair]
+        word.append(symbols[k])
+    word.reverse()
+    return word
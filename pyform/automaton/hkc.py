@@ -0,0 +1,217 @@
+from collections import deque
+from pyform.common.alphabet import sort_symbols
+
+class PairIndex(object):
+
+    """Stores the disjoint union of two NFAs with their epsilon closures
+    folded into the transitions, for implementation of the up-to-congruence
+    equivalence check of Bonchi and Pous [1] (NFA.equivalent_hkc) and the
+    antichain inclusion check of De Wulf et al. [2] (NFA.includes_antichain).
+    This class is tightly coupled with the NFA class.
+
+    Sets of states are bitsets over the states of both automata: bit i
+    stands for the i-th state of the first automaton in sorted order and bit
+    offset + i for the i-th state of the second automaton. The successor of
+    a set on a symbol is the union of the successors of its members, which
+    are looked up in one list per symbol. Symbols are the union of the
+    alphabets in sorted order (see sort_symbols).
+
+    [1] Bonchi, Filippo & Pous, Damien. 2013. Checking NFA Equivalence with
+    Bisimulations up to Congruence. Conference Record of the Annual ACM
+    Symbposium on Principles of Programming Languages. 457-68.
+
+    [2] De Wulf, Martin, Doyen, Laurent, Henzinger, Thomas & Raskin,
+    Jean-Francois. 2006. Antichains: A New Algorithm for Checking
+    Universality of Finite Automata. Computer Aided Verification. 17-30.
+
+    Attributes:
+        offset  : Number of states of the first automaton.
+        symbols : List of symbols.
+        succ    : Dictionary mapping symbols to lists mapping bits to bitsets
+            of successors (closed under epsilon transitions).
+        finals  : Bitset of final states.
+        starts  : Pair of bitsets (the closed start sets of the automata).
+    """
+
+    def __init__(self, nfa1, nfa2):
+
+        self.offset  = len(nfa1.states)
+        self.symbols = sort_symbols(nfa1.sigma.union(nfa2.sigma))
+        self.succ    = {a : [] for a in self.symbols}
+        self.finals  = 0
+
+        starts = []
+        for nfa, shift in ((nfa1, 0), (nfa2, self.offset)):
+            names, closures = nfa.closures()
+            rows = nfa._closed_rows(names, closures)
+            for i, q in enumerate(names):
+                if q in nfa.finals:
+                    self.finals |= 1 << (i + shift)
+                row = dict(rows[i])
+                for a in self.symbols:
+                    self.succ[a].append(row.get(a, 0) << shift)
+            starts.append(closures[names.index(nfa.start)] << shift)
+
+        self.starts = tuple(starts)
+
+    def post(self, subset, symbol):
+
+        """Successor of a set of states on symbol.
+
+        Args:
+            subset : Bitset.
+            symbol : Symbol.
+
+        Returns:
+            Bitset.
+        """
+
+        succ   = self.succ[symbol]
+        target = 0
+        while subset:
+            low     = subset & -subset
+            subset ^= low
+            target |= succ[low.bit_length() - 1]
+        return target
+
+    def equivalent(self):
+
+        """Determine whether the automata are equivalent using HKC [1]. Pairs
+        of sets are explored in breadth-first order from the pair of start
+        sets. A pair is skipped if it belongs to the congruence closure of
+        the pairs explored so far (see congruent) and fails if exactly one of
+        its sets contains a final state. Every pair in the closure agrees on
+        all words that the explored pairs agree on, so the first failure
+        yields a shortest witness, which is rebuilt from parent pointers.
+
+        Returns:
+            (b, w) where b is a boolean indicating whether the automata are
+            equivalent and w is either None or a shortest witness if they are
+            not equivalent.
+        """
+
+        start   = self.starts
+        parents = {start : None}
+        queue   = deque([start])
+        rules   = ([], [])
+
+        while queue:
+            pair = queue.popleft()
+            x, y = pair
+            if congruent(rules, x, y):
+                continue
+            if bool(x & self.finals) != bool(y & self.finals):
+                return (False, _witness(parents, pair))
+            for a in self.symbols:
+                child = (self.post(x, a), self.post(y, a))
+                if child not in parents:
+                    parents[child] = (pair, a)
+                    queue.append(child)
+            rules[0].extend(pair)
+            rules[1].extend((x | y, x | y))
+
+        return (True, None)
+
+    def includes(self):
+
+        """Determine whether the language of the first automaton includes
+        the language of the second using antichains [2]. The search explores
+        pairs (p, Y) of a state p of the second automaton and the set Y of
+        states of the first automaton reached on the same word, in breadth-
+        first order, and fails at a final p with nonfinal Y. A pair (p, Y) is
+        skipped if some explored pair (p, Z) has Z a subset of Y, since every
+        witness from (p, Y) is a witness from (p, Z). Such pairs were found
+        no later, so the first failure yields a shortest witness.
+
+        Returns:
+            (b, w) where b is a boolean indicating whether the language of the
+            second automaton is a subset of the language of the first and w
+            is either None or a shortest word accepted by the second
+            automaton but not the first.
+        """
+
+        x, y     = self.starts
+        parents  = {}
+        queue    = deque()
+        minimal  = {}
+
+        for p in _bits(y):
+            pair = (p, x)
+            parents[pair] = None
+            queue.append(pair)
+            minimal[p] = [x]
+
+        while queue:
+            pair = queue.popleft()
+            p, subset = pair
+            if (self.finals >> p) & 1 and not subset & self.finals:
+                return (False, _witness(parents, pair))
+            for a in self.symbols:
+                target = self.post(subset, a)
+                for r in _bits(self.succ[a][p]):
+                    antichain = minimal.setdefault(r, [])
+                    if any(z & target == z for z in antichain):
+                        continue
+                    antichain[:] = [z for z in antichain
+                                    if z & target != target]
+                    antichain.append(target)
+                    child = (r, target)
+                    parents[child] = (pair, a)
+                    queue.append(child)
+
+        return (True, None)
+
+def congruent(rules, x, y):
+
+    """Determine whether sets x and y are related by the congruence closure
+    of a set of pairs (the smallest equivalence relation containing the
+    pairs that is closed under union). Each pair (u, v) gives the rules u ->
+    u | v and v -> u | v, which extend a set z containing their left side
+    to z | u | v. Sets x and y are related iff their normal forms under the
+    rules are equal, that is, iff the normal form of x contains y and the
+    normal form of y contains x, so rewriting stops as soon as it covers the
+    other set.
+
+    Args:
+        rules : Pair of lists (sides, unions) with the left and right sides
+            of the rules of the pairs.
+        x     : Bitset.
+        y     : Bitset.
+
+    Returns:
+        Boolean.
+    """
+
+    return x == y or _covers(rules, x, y) and _covers(rules, y, x)
+
+def _covers(rules, z, target):
+
+    # whether the normal form of z contains target
+
+    sides, unions = rules
+    changed = True
+    while changed and target & ~z:
+        changed = False
+        for u, w in zip(sides, unions):
+            if u & z == u and w & ~z:
+                z |= w
+                changed = True
+    return not target & ~z
+
+def _bits(subset):
+
+    # indices of the bits of subset in increasing order
+
+    while subset:
+        low     = subset & -subset
+        subset ^= low
+        yield low.bit_length() - 1
+
+def _witness(parents, pair):
+
+    word = []
+    while parents[pair] is not None:
+        pair, symbol = parents[pair]
+        word.append(symbol)
+    word.reverse()
+    return word
@@ -0,0 +1,210 @@
+from collections import deque
+from pyform.common.alphabet import sort_symbols
+from pyform.common.partition import Partition
+
+class RefinementState(object):
+
+    """Stores the completed useful part of a DFA and its inverse transition
+    function for implementation of Hopcroft's and Moore's minimization
+    algorithms (DFA.minimize_hopcroft and DFA.minimize_moore). This class is
+    tightly coupled with the DFA and Partition classes.
+
+    The states of the DFA that are reachable from the start state and can
+    reach some final state (the useful states) are renumbered in range(
+    num_useful). The state num_useful is a nonfinal sink state. Undefined
+    transitions of useful states and transitions to useless states lead to
+    the sink, so the automaton is complete. The sink accepts no word, unlike
+    every useful state, so the initial blocks partition places it in a block
+    of its own (see partition).
+
+    There is a transition from state q to state r on symbol id a iff q is in
+    inverse[r][a]. Symbols are interned to symbol ids in sorted order (see
+    sort_symbols).
+
+    Attributes:
+        names      : List mapping useful states to states of the DFA.
+        ids        : Dictionary mapping useful states of the DFA to states.
+        symbols    : List mapping symbol ids to symbols.
+        finals     : Set of useful final states.
+        inverse    : List of dictionaries mapping symbol ids to lists of
+            predecessors.
+        num_useful : Number of useful states (and the sink state).
+    """
+
+    def __init__(self, dfa):
+
+        self.symbols = sort_symbols(dfa.sigma)
+
+        # reachable states (forwards) and useful states (backwards)
+
+        reached  = set([dfa.start])
+        worklist = [dfa.start]
+        backward = {}
+
+        while worklist:
+            q = worklist.pop()
+            for r in dfa.delta.get(q, {}).values():
+                if r not in backward:
+                    backward[r] = []
+                backward[r].append(q)
+                if r not in reached:
+                    reached.add(r)
+                    worklist.append(r)
+
+        useful   = set(q for q in dfa.finals if q in reached)
+        worklist = list(useful)
+
+        while worklist:
+            r = worklist.pop()
+            for q in backward.get(r, ()):
+                if q not in useful:
+                    useful.add(q)
+                    worklist.append(q)
+
+        self.names      = sorted(useful)
+        self.ids        = {q : i for i, q in enumerate(self.names)}
+        self.num_useful = len(self.names)
+        self.finals     = set(self.ids[q] for q in dfa.finals if q in useful)
+
+        # inverse transition function of the completed automaton
+
+        sink         = self.num_useful
+        self.inverse = [{} for _ in range(sink + 1)]
+
+        for q in range(sink + 1):
+            row = dfa.delta.get(self.names[q], {}) if q < sink else {}
+            for a in range(len(self.symbols)):
+                r = self.ids.get(row.get(self.symbols[a]), sink)
+                if a not in self.inverse[r]:
+                    self.inverse[r][a] = []
+                self.inverse[r][a].append(q)
+
+    def partition(self):
+
+        """Initial blocks partition with useful final states, useful nonfinal
+        states and the sink state in separate blocks.
+
+        Returns:
+            Partition instance.
+        """
+
+        sink = self.num_useful
+        return Partition(
+            sink + 1,
+            key=lambda q: 2 if q == sink else int(q not in self.finals)
+        )
+
+    def mark_predecessors(self, blocks, block, symbol):
+
+        """Mark predecessors of the states in block on symbol in blocks. The
+        states of block are copied before marking, because marking may move
+        them within block.
+
+        Args:
+            blocks : Partition instance.
+            block  : Integer (equivalence class of blocks).
+            symbol : Symbol id.
+        """
+
+        for r in blocks.partition(block):
+            for q in self.inverse[r].get(symbol, ()):
+                blocks.mark(q)
+
+    def hopcroft(self, blocks):
+
+        """Refine blocks using Hopcroft's algorithm [1]. The worklist holds
+        pairs (block, symbol) and initially contains every block except the
+        largest for every symbol. Partition.split assigns the new class to
+        the smaller half of each split block, so only the new classes are
+        added to the worklist.
+
+        [1] Hopcroft, John. 1971. An n log n algorithm for minimizing states
+        in a finite automaton. Theory of Machines and Computations. 189-96.
+
+        Args:
+            blocks : Partition instance.
+        """
+
+        symbols  = range(len(self.symbols))
+        largest  = max(range(blocks.size),
+                       key=lambda b: blocks.past[b] - blocks.first[b])
+        worklist = deque(
+            (b, a) for b in range(blocks.size) if b != largest
+            for a in symbols
+        )
+        waiting  = set(worklist)
+
+        while worklist:
+            block, symbol = worklist.popleft()
+            waiting.discard((block, symbol))
+            self.mark_predecessors(blocks, block, symbol)
+            size = blocks.size
+            blocks.split()
+            for b in range(size, blocks.size):
+                for a in symbols:
+                    if (b, a) not in waiting:
+                        waiting.add((b, a))
+                        worklist.append((b, a))
+
+    def moore(self, blocks):
+
+        """Refine blocks using rounds in the style of Moore's algorithm [1].
+        Each round splits every block with respect to the predecessors of
+        every block on every symbol. Refinement stops after a round that
+        splits no block, so the number of rounds is bounded by the depth of
+        the distinguishing words plus one.
+
+        [1] Moore, Edward. 1956. Gedanken-experiments on sequential machines.
+        Automata Studies. 129-53.
+
+        Args:
+            blocks : Partition instance.
+        """
+
+        size = 0
+        while size != blocks.size:
+            size = blocks.size
+            for a in range(len(self.symbols)):
+                for block in range(blocks.size):
+                    self.mark_predecessors(blocks, block, a)
+                    blocks.split()
+
+    def construct(self, dfa, blocks):
+
+        """Components of the minimized partial DFA for refined blocks. The
+        block of the sink state and transitions to it are removed. If no
+        state is useful, the result has a single nonfinal state.
+
+        Args:
+            dfa    : DFA instance (the automaton being minimized).
+            blocks : Partition instance.
+
+        Returns:
+            Dictionary of keyword arguments to DFA.
+        """
+
+        sink  = blocks.setof[self.num_useful]
+        ids   = {}
+        for b in range(blocks.size):
+            if b != sink:
+                ids[b] = len(ids)
+
+        delta = {}
+        sigma = set()
+        for b, i in ids.items():
+            q = self.names[blocks.elements[blocks.first[b]]]
+            for a, r in dfa.delta.get(q, {}).items():
+                if r in self.ids:
+                    if i not in delta:
+                        delta[i] = {}
+                    delta[i][a] = ids[blocks.setof[self.ids[r]]]
+                    sigma.add(a)
+
+        start = self.ids.get(dfa.start)
+        return dict(
+            states = set(range(max(len(ids), 1))),
+            finals = set(ids[blocks.setof[q]] for q in self.finals),
+            start  = 0 if start is None else ids[blocks.setof[start]],
+            sigma  = sigma,
+            delta  = delta
+        )
@@ -0,0 +1,429 @@
+import numpy as np
+from collections import OrderedDict
+from pyform.automaton.stream import DEAD
+from pyform.automaton.stream import StreamMatcher
+
+class LazyState(object):
+
+    """State of a LazyDFA: a key identifying a set of states (or a tuple of
+    states) of the underlying automata, whether it is accepting, and the
+    transitions computed so far.
+
+    Attributes:
+        key       : Hashable key (see NFASource and ProductSource).
+        accepting : Boolean indicating whether the state is accepting.
+        next      : Dictionary mapping symbols to keys of successors (None if
+            the successor is dead).
+    """
+
+    __slots__ = ('key', 'accepting', 'next')
+
+    def __init__(self, key, accepting):
+
+        self.key       = key
+        self.accepting = accepting
+        self.next      = {}
+
+class NFASource(object):
+
+    """Successor function of the subset construction of an NFA over bitsets
+    (see NFA.determinize). Keys are nonempty bitsets of states.
+
+    Attributes:
+        start  : Bitset of the epsilon closure of the start state.
+        finals : Bitset of final states.
+        rows   : List of dictionaries mapping symbols to bitsets (rows[i][a]
+            is the union of the closures of the successors of state i on a).
+    """
+
+    def __init__(self, nfa):
+
+        names, closures = nfa.closures()
+
+        self.start  = closures[names.index(nfa.start)]
+        self.finals = sum(1 << i for i, q in enumerate(names)
+                          if q in nfa.finals)
+        self.rows   = [dict(row) for row in nfa._closed_rows(names, closures)]
+
+    def successor(self, key, symbol):
+
+        target = 0
+        rows   = self.rows
+        while key:
+            low  = key & -key
+            key ^= low
+            target |= rows[low.bit_length() - 1].get(symbol, 0)
+        return target or None
+
+    def accepting(self, key):
+
+        return bool(key & self.finals)
+
+class ProductSource(object):
+
+    """Successor function of the generalized product of DFAs with respect
+    to an n-ary boolean function (see DFA.product_many). Keys are tuples of
+    states, where None stands for an undefined transition. The tuple of
+    Nones is dead unless f accepts when no automaton accepts.
+
+    Attributes:
+        dfas  : List of DFA instances.
+        f     : Boolean function of len(dfas) variables.
+        start : Tuple of start states.
+        sigma : Union of the alphabets of dfas.
+        blank : Boolean indicating whether f is true when all arguments are
+            false.
+    """
+
+    def __init__(self, dfas, f):
+
+        self.dfas  = dfas
+        self.f     = f
+        self.start = tuple(dfa.start for dfa in dfas)
+        self.sigma = set().union(*(dfa.sigma for dfa in dfas))
+        self.blank = bool(f(*(False for _ in dfas)))
+
+    def successor(self, key, symbol):
+
+        if symbol not in self.sigma:
+            return None
+
+        target = tuple(
+            dfa.delta.get(q, {}).get(symbol) if q is not None else None
+            for dfa, q in zip(self.dfas, key)
+        )
+        if not self.blank and all(q is None for q in target):
+            return None
+        return target
+
+    def accepting(self, key):
+
+        return bool(self.f(*(
+            q in dfa.finals for dfa, q in zip(self.dfas, key)
+        )))
+
+class LazyDFA(object):
+
+    """Deterministic automaton constructed on demand, in the style of the
+    lazy DFA of RE2 [1]. The states of the subset construction of an NFA
+    (or of a product of DFAs) are created only when input reaches them, and
+    transitions are computed once and cached on their source state.
+
+    The number of cached states is bounded by capacity. With eviction
+    'flush', the whole cache is discarded when it is full (as in RE2); with
+    eviction 'lru', the least recently used state is discarded. A discarded
+    state is recreated (without its transitions) when it is reached again,
+    so matching is correct for any capacity, but slower when the working
+    set of states does not fit. Cache behaviour is observable through the
+    counters below.
+
+    [1] Cox, Russ. 2010. Regular expression matching in the wild.
+    https://swtch.com/~rsc/regexp/regexp3.html
+
+    Attributes:
+        source    : NFASource or ProductSource instance.
+        capacity  : Maximum number of cached states.
+        eviction  : 'flush' or 'lru'.
+        cache     : Ordered dictionary mapping keys to LazyState instances.
+        hits      : Number of transitions found in the cache.
+        misses    : Number of transitions computed.
+        evictions : Number of states discarded from the cache.
+        flushes   : Number of times the cache was flushed.
+    """
+
+    def __init__(self, source, capacity=1 << 12, eviction='flush'):
+
+        if eviction not in ('flush', 'lru'):
+            raise ValueError('unknown eviction: %r' % (eviction,))
+        if capacity < 1:
+            raise ValueError('capacity must be positive: %r' % (capacity,))
+
+        self.source   = source
+        self.capacity = capacity
+        self.eviction = eviction
+        self.cache    = OrderedDict()
+
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self.flushes   = 0
+
+    @classmethod
+    def from_nfa(cls, nfa, capacity=1 << 12, eviction='flush'):
+
+        """Construct lazy determinization of nfa (see NFA.determinize).
+
+        Args:
+            nfa      : NFA instance.
+            capacity : Maximum number of cached states.
+            eviction : 'flush' or 'lru'.
+
+        Returns:
+            LazyDFA instance whose states are keyed by bitsets.
+        """
+
+        return cls(NFASource(nfa), capacity, eviction)
+
+    @classmethod
+    def from_product(cls, dfas, f, capacity=1 << 12, eviction='flush'):
+
+        """Construct lazy generalized product of dfas with respect to an
+        n-ary boolean function f (see DFA.product_many).
+
+        Args:
+            dfas     : List of DFA instances.
+            f        : Boolean function of len(dfas) variables.
+            capacity : Maximum number of cached states.
+            eviction : 'flush' or 'lru'.
+
+        Returns:
+            LazyDFA instance whose states are keyed by tuples of states.
+        """
+
+        return cls(ProductSource(dfas, f), capacity, eviction)
+
+    def state(self, key):
+
+        """The cached state with key, created (and the cache evicted if it is
+        full) if it is not cached.
+
+        Args:
+            key : Key of state.
+
+        Returns:
+            LazyState instance.
+        """
+
+        cache = self.cache
+        state = cache.get(key)
+
+        if state is None:
+            if len(cache) >= self.capacity:
+                if self.eviction == 'lru':
+                    cache.popitem(last=False)
+                    self.evictions += 1
+                else:
+                    self.evictions += len(cache)
+                    self.flushes   += 1
+                    cache.clear()
+            state = LazyState(key, self.source.accepting(key))
+            cache[key] = state
+        elif self.eviction == 'lru':
+            cache.move_to_end(key)
+
+        return state
+
+    def start(self):
+
+        """The start state.
+
+        Returns:
+            LazyState instance.
+        """
+
+        return self.state(self.source.start)
+
+    def step(self, state, symbol):
+
+        """The state reached from state on symbol.
+
+        Args:
+            state  : LazyState instance.
+            symbol : Symbol.
+
+        Returns:
+            LazyState instance, or None if the successor is dead.
+        """
+
+        try:
+            key = state.next[symbol]
+            self.hits += 1
+        except KeyError:
+            key = state.next[symbol] = self.source.successor(state.key, symbol)
+            self.misses += 1
+
+        return None if key is None else self.state(key)
+
+    def run(self, word):
+
+        """The key of the state reached by transitioning from the start state
+        on the symbols of word in order, or None if the input reaches a dead
+        state.
+
+        Args:
+            word : Iterable of symbols.
+
+        Returns:
+            Key or None.
+        """
+
+        state = self._run(word)
+        return None if state is None else state.key
+
+    def accepts(self, word):
+
+        """Determine whether the automaton accepts word.
+
+        Args:
+            word : Iterable of symbols.
+
+        Returns:
+            Boolean indicating whether word is accepted.
+        """
+
+        state = self._run(word)
+        return state is not None and state.accepting
+
+    def run_many(self, words):
+
+        """Run the automaton on many words (see run). Determinized states are
+        shared between the words.
+
+        Args:
+            words : Iterable of words (sequences of symbols).
+
+        Returns:
+            List whose i-th element is the key of the state reached on the
+            i-th word, or None.
+        """
+
+        return [self.run(word) for word in words]
+
+    def accepts_many(self, words):
+
+        """Determine which of many words the automaton accepts (see
+        DFA.accepts_many).
+
+        Args:
+            words : Iterable of words (sequences of symbols).
+
+        Returns:
+            Boolean NumPy array whose i-th element indicates whether the i-th
+            word is accepted.
+        """
+
+        return np.array([self.accepts(word) for word in words], dtype=bool)
+
+    def matcher(self, state=None, offset=0):
+
+        """Construct a resumable matcher over this automaton with the
+        interface of StreamMatcher.
+
+        Args:
+            state  : Key of state or None (the start state).
+            offset : Number of symbols consumed.
+
+        Returns:
+            LazyMatcher instance.
+        """
+
+        return LazyMatcher(self, state, offset)
+
+    def _run(self, word):
+
+        state = self.start()
+        for symbol in word:
+            state = self.step(state, symbol)
+            if state is None:
+                break
+        return state
+
+class LazyMatcher(StreamMatcher):
+
+    """Resumable matcher running a LazyDFA over a stream of symbols (see
+    StreamMatcher). States are keys of the LazyDFA, so the matcher can be
+    resumed from a snapshot by any matcher over the same automaton.
+
+    Attributes:
+        dfa    : LazyDFA instance.
+        offset : Number of symbols consumed.
+    """
+
+    def __init__(self, dfa, state=None, offset=0):
+
+        self.dfa  = dfa
+        self.dead = None
+        self.reset(state, offset)
+
+    @property
+    def state(self):
+
+        """Key of the current state, or None if the input has reached a dead
+        state."""
+
+        return None if self.current is None else self.current.key
+
+    @property
+    def accepting(self):
+
+        """Boolean indicating whether the input consumed so far is
+        accepted."""
+
+        return self.current is not None and self.current.accepting
+
+    def reset(self, state=None, offset=0):
+
+        """Restore the matcher to state after consuming offset symbols. If
+        state is None, restores the start state, and if state is DEAD,
+        restores the dead state (see StreamMatcher.snapshot).
+
+        Args:
+            state  : Key of state, DEAD or None.
+            offset : Number of symbols consumed.
+        """
+
+        if state is DEAD:
+            self.current = None
+        elif state is None:
+            self.current = self.dfa.start()
+        else:
+            self.current = self.dfa.state(state)
+        self.offset = offset
+
+    def feed(self, data):
+
+        """Consume a chunk of input.
+
+        Args:
+            data : Bytes-like object or iterable of symbols.
+
+        Returns:
+            Key of the current state after consuming data (see state).
+        """
+
+        step  = self.dfa.step
+        state = self.current
+        for symbol in data:
+            if state is None:
+                break
+            state = step(state, symbol)
+
+        self.current = state
+        self.offset += len(data)
+        return self.state
+
+    def matches(self, data):
+
+        """Consume a chunk of input and report match positions (see
+        StreamMatcher.matches).
+
+        Args:
+            data : Bytes-like object or iterable of symbols.
+
+        Returns:
+            List of match positions in increasing order.
+        """
+
+        positions = []
+        step      = self.dfa.step
+        state     = self.current
+        for i, symbol in enumerate(data, self.offset + 1):
+            if state is None:
+                break
+            state = step(state, symbol)
+            if state is not None and state.accepting:
+                positions.append(i)
+
+        self.current = state
+        self.offset += len(data)
+        return positions
@@ -0,0 +1,263 @@
+from pyform.automaton.dfa import DFA
+from pyform.automaton.fa import FA
+from pyform.common.alphabet import sort_symbols
+
+class NFA(FA):
+
+    """Nondeterministic finite automaton with epsilon transitions.
+
+    States are represented as integers and symbols must be hashable objects
+    other than None, which labels epsilon transitions. No method of this
+    class modifies any data structure passed to init.
+
+    The transition function is represented using nested dictionaries mapping
+    states and symbols to sets of states. There is a transition from state q
+    to state r on symbol a whenever r in delta[q][a], and an epsilon
+    transition whenever r in delta[q][None]. Missing entries denote empty
+    sets of successors.
+
+    Sets of states are encoded as integer bitsets over state ids (states in
+    sorted order), so unions are single integer operations and sets are
+    hashable without conversion.
+
+    Attributes:
+        states : Set of integers.
+        finals : Set of integers (subset of states).
+        start  : Integer (member of states).
+        sigma  : Set of hashable objects (not containing EPSILON).
+        delta  : Transition function represented as nested dictionary data
+            structure (r in delta[q][a] iff there is a transition from state
+            q to state r on symbol a).
+    """
+
+    EPSILON = None
+
+    def __init__(self, states, finals, sigma, start, delta):
+
+        self.states = states
+        self.finals = finals
+        self.start  = start
+        self.sigma  = sigma
+        self.delta  = delta
+
+    def validate(self):
+
+        raise NotImplementedError
+
+    def iterate(self):
+
+        """Generator yielding transitions as triples (r in delta[q][a] iff
+        (q, a, r) is yielded by the generator). Epsilon transitions are
+        yielded with symbol EPSILON.
+
+        Returns:
+            Generator yielding transitions as triples.
+        """
+
+        return (
+            (q, a, r)
+            for q, m in self.delta.items()
+            for a, targets in m.items()
+            for r in targets
+        )
+
+    def closures(self):
+
+        """Epsilon closures of all states as bitsets. The closure of a state
+        is the set of states reachable from it on epsilon transitions
+        (including the state itself).
+
+        Returns:
+            (names, closures) where names is the sorted list of states
+            (bit i of a bitset stands for names[i]) and closures is a list
+            of bitsets such that closures[i] is the closure of names[i].
+        """
+
+        names = sorted(self.states)
+        ids   = {q : i for i, q in enumerate(names)}
+
+        closures = []
+        for q in names:
+            closure  = 1 << ids[q]
+            worklist = [q]
+            while worklist:
+                r = worklist.pop()
+                for s in self.delta.get(r, {}).get(self.EPSILON, ()):
+                    bit = 1 << ids[s]
+                    if not closure & bit:
+                        closure |= bit
+                        worklist.append(s)
+            closures.append(closure)
+
+        return names, closures
+
+    def accepts(self, word):
+
+        """Determine whether the automaton accepts word by simulating it on
+        sets of states.
+
+        Args:
+            word : Iterable of symbols.
+
+        Returns:
+            Boolean indicating whether word is accepted.
+        """
+
+        names, closures = self.closures()
+        rows   = self._closed_rows(names, closures)
+        finals = _bitset(names, self.finals)
+
+        current = closures[names.index(self.start)]
+        for symbol in word:
+            current = _step(rows, current, symbol)
+            if not current:
+                return False
+
+        return bool(current & finals)
+
+    def determinize(self, minimize=False):
+
+        """Construct an equivalent DFA using the subset construction over
+        reachable sets of states. Epsilon closures are computed once per
+        state and folded into the transitions, so the successor of a set on
+        a symbol is the union of precomputed bitsets of its members. Sets
+        are hash-consed: each distinct bitset is mapped to a DFA state once.
+        The empty set is omitted, so the result is partial.
+
+        Args:
+            minimize : Boolean indicating whether to minimize the result
+                (using DFA.minimize_valmari).
+
+        Returns:
+            DFA instance with states range(n), where state 0 is the start
+            state and states are numbered in order of discovery.
+        """
+
+        names, closures = self.closures()
+        rows   = self._closed_rows(names, closures)
+        finals = _bitset(names, self.finals)
+
+        start    = closures[names.index(self.start)]
+        ids      = {start : 0}
+        worklist = [start]
+        delta    = {}
+        accept   = set()
+
+        while worklist:
+            subset = worklist.pop()
+            source = ids[subset]
+            if subset & finals:
+                accept.add(source)
+
+            # union of the rows of the members of subset, per symbol
+
+            targets = {}
+            while subset:
+                low     = subset & -subset
+                subset ^= low
+                for a, bits in rows[low.bit_length() - 1]:
+                    targets[a] = targets.get(a, 0) | bits
+
+            if targets:
+                delta[source] = {}
+            for a, target in targets.items():
+                if target not in ids:
+                    ids[target] = len(ids)
+                    worklist.append(target)
+                delta[source][a] = ids[target]
+
+        dfa = DFA(
+            states = set(range(len(ids))),
+            finals = accept,
+            start  = 0,
+            sigma  = set(self.sigma),
+            delta  = delta
+        )
+
+        return dfa.minimize_valmari() if minimize else dfa
+
+    def equivalent_hkc(self, nfa):
+
+        """Determine whether the current and argument automata are equivalent
+        without determinizing them, using Hopcroft and Karp's algorithm up to
+        congruence (HKC) on sets of states encoded as bitsets (see
+        PairIndex.equivalent). Pairs of sets that follow from the pairs
+        already explored by unions and transitivity are skipped, which can
+        be exponentially faster than determinizing both automata.
+
+        Args:
+            nfa : NFA instance.
+
+        Returns:
+            (b, w) where b is a boolean indicating whether the automata are
+            equivalent and w is either None or a shortest witness accepted by
+            precisely one automaton if they are not equivalent.
+        """
+
+        from pyform.automaton.hkc import PairIndex
+
+        return PairIndex(self, nfa).equivalent()
+
+    def includes_antichain(self, nfa):
+
+        """Determine whether the language of the current automaton includes
+        the language of the argument automaton without determinizing them,
+        using antichains of sets of states encoded as bitsets (see
+        PairIndex.includes).
+
+        Args:
+            nfa : NFA instance.
+
+        Returns:
+            (b, w) where b is a boolean indicating whether L(nfa) is a subset
+            of L(self) and w is either None or a shortest word accepted by
+            nfa but not by the current automaton.
+        """
+
+        from pyform.automaton.hkc import PairIndex
+
+        return PairIndex(self, nfa).includes()
+
+    def _closed_rows(self, names, closures):
+
+        """Rows of the transition function with epsilon closures folded in:
+        rows[i] is a list of pairs (a, bits) where bits is the union of the
+        closures of the successors of names[i] on symbol a. Symbols are
+        listed in sorted order (see sort_symbols)."""
+
+        ids   = {q : i for i, q in enumerate(names)}
+        order = {a : i for i, a in enumerate(sort_symbols(self.sigma))}
+
+        rows = []
+        for q in names:
+            row = {}
+            for a, targets in self.delta.get(q, {}).items():
+                if a is self.EPSILON:
+                    continue
+                bits = 0
+                for r in targets:
+                    bits |= closures[ids[r]]
+                if bits:
+                    row[a] = bits
+            rows.append(sorted(row.items(), key=lambda item: order[item[0]]))
+
+        return rows
+
+def _bitset(names, states):
+
+    bits = 0
+    for i, q in enumerate(names):
+        if q in states:
+            bits |= 1 << i
+    return bits
+
+def _step(rows, subset, symbol):
+
+    target = 0
+    while subset:
+        low     = subset & -subset
+        subset ^= low
+        for a, bits in rows[low.bit_length() - 1]:
+            if a == symbol:
+                target |= bits
+    return target
@@ -0,0 +1,205 @@
+import mmap
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# number of entries in the state matrix advanced by each gather in
+# transition_map (lanes times states)
+
+LANE_ENTRIES = 1 << 16
+
+# number of bytes of a file mapped to symbol ids at once by each worker
+
+BLOCK_SIZE = 1 << 24
+
+def mapping_table(compact):
+
+    """Transition table of an array-backed automaton extended for state
+    mappings. Rows are indexed by state ids followed by a dead state, and
+    columns by symbol ids followed by a column for symbols outside the
+    alphabet (leading to the dead state) and an identity column (used as
+    padding by transition_map).
+
+    Args:
+        compact : CompactDFA instance.
+
+    Returns:
+        Array of shape (num_states + 1, num_symbols + 2).
+    """
+
+    table    = compact._extended_table()
+    identity = np.arange(table.shape[0], dtype=table.dtype)[:, None]
+    return np.hstack([table, identity])
+
+def transition_map(table, codes):
+
+    """The map from every state to the state reached from it on codes. The
+    codes are split into lanes that are advanced in lockstep from every state
+    at once, so each step is a single gather over a matrix of lanes times
+    states. The maps of the lanes are then composed in order.
+
+    Args:
+        table : Array returned by mapping_table.
+        codes : Array of symbol ids.
+
+    Returns:
+        Array m such that m[q] is the state id reached from state id q.
+    """
+
+    count    = table.shape[0]
+    identity = table.shape[1] - 1
+    lanes    = max(1, min(LANE_ENTRIES // count, len(codes)))
+    length   = -(-len(codes) // lanes)
+
+    padded = np.full(lanes * length, identity, dtype=table.dtype)
+    padded[:len(codes)] = codes
+    padded = padded.reshape(lanes, length)
+
+    states = np.tile(np.arange(count, dtype=table.dtype), (lanes, 1))
+    for i in range(length):
+        states = table[states, padded[:, i:i + 1]]
+
+    result = states[0]
+    for lane in states[1:]:
+        result = lane[result]
+
+    return result
+
+def compose(maps, state):
+
+    """The state reached from state by applying maps in order.
+
+    Args:
+        maps  : Iterable of arrays returned by transition_map.
+        state : State id.
+
+    Returns:
+        State id.
+    """
+
+    for m in maps:
+        state = int(m[state])
+    return state
+
+def run_parallel(compact, codes, workers=None, chunk_size=None):
+
+    """Run an array-backed automaton on encoded input by computing the
+    transition maps of chunks of the input in a process pool and composing
+    them in order (see transition_map).
+
+    Args:
+        compact    : CompactDFA instance.
+        codes      : Array of symbol ids (see CompactDFA.encode).
+        workers    : Number of worker processes (os.cpu_count() if None).
+        chunk_size : Number of symbols per chunk (an equal share of the input
+            per worker if None).
+
+    Returns:
+        State id reached from the start state, or the id of the dead state
+        (compact.table.shape[0]) if some transition is undefined.
+    """
+
+    table  = mapping_table(compact)
+    bounds = _chunk_bounds(len(codes), workers, chunk_size)
+
+    if len(bounds) <= 1 or workers == 1:
+        maps = [transition_map(table, codes[i:j]) for i, j in bounds]
+    else:
+        with _pool(workers, table, None) as pool:
+            maps = pool.map(_codes_map, [codes[i:j] for i, j in bounds])
+
+    return compose(maps, compact.start)
+
+def scan_parallel(compact, path, workers=None, chunk_size=None):
+
+    """Run an array-backed automaton over bytes on the contents of a file
+    (see run_parallel). Each worker memory-maps the file and maps its chunk
+    to symbol ids without copying, so no file content is transferred between
+    processes.
+
+    Args:
+        compact    : CompactDFA instance whose symbols are integers in
+            range(256).
+        path       : Path of file.
+        workers    : Number of worker processes (os.cpu_count() if None).
+        chunk_size : Number of bytes per chunk (an equal share of the input
+            per worker if None).
+
+    Returns:
+        State id reached from the start state, or the id of the dead state
+        (compact.table.shape[0]) if some transition is undefined.
+    """
+
+    if not all(type(a) is int and 0 <= a < 256 for a in compact.symbols):
+        raise ValueError('alphabet must consist of integers in range(256)')
+
+    unknown = len(compact.symbols)
+    lookup  = np.full(256, unknown, dtype=compact.table.dtype)
+    lookup[compact.symbols] = np.arange(unknown)
+
+    table  = mapping_table(compact)
+    bounds = _chunk_bounds(os.path.getsize(path), workers, chunk_size)
+    tasks  = [(path, i, j) for i, j in bounds]
+
+    if len(bounds) <= 1 or workers == 1:
+        _initialize(table, lookup)
+        maps = [_file_map(task) for task in tasks]
+    else:
+        with _pool(workers, table, lookup) as pool:
+            maps = pool.map(_file_map, tasks)
+
+    return compose(maps, compact.start)
+
+def _chunk_bounds(length, workers, chunk_size):
+
+    """Pairs (i, j) splitting range(length) into consecutive chunks."""
+
+    if chunk_size is None:
+        chunk_size = -(-length // (workers or os.cpu_count() or 1))
+    chunk_size = max(1, chunk_size)
+
+    return [
+        (i, min(i + chunk_size, length))
+        for i in range(0, length, chunk_size)
+    ]
+
+def _pool(workers, table, lookup):
+
+    return ProcessPoolExecutor(
+        max_workers = workers,
+        initializer = _initialize,
+        initargs    = (table, lookup)
+    )
+
+# per-process state of workers (set by _initialize so that the tables are
+# transferred once per worker rather than once per chunk)
+
+_table  = None
+_lookup = None
+
+def _initialize(table, lookup):
+
+    global _table, _lookup
+    _table  = table
+    _lookup = lookup
+
+def _codes_map(codes):
+
+    return transition_map(_table, codes)
+
+def _file_map(task):
+
+    # symbol ids are computed per block to bound the memory of each worker
+
+    path, start, stop = task
+    result = np.arange(_table.shape[0], dtype=_table.dtype)
+
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for i in range(start, stop, BLOCK_SIZE):
+                data = np.frombuffer(mapped, dtype=np.uint8, offset=i,
+                                     count=min(BLOCK_SIZE, stop - i))
+                result = transition_map(_table, _lookup[data])[result]
+                del data
+
+    return result
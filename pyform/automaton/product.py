@@ -0,0 +1,383 @@
+import heapq
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pyform.automaton.dfa import DFA
+
+class ProductStep(object):
+
+    """Record of one pairwise product computed by product_many.
+
+    Attributes:
+        left      : Tuple of indices of the automata combined on the left.
+        right     : Tuple of indices of the automata combined on the right.
+        states    : Number of states of the product before minimization.
+        minimized : Number of states of the product after minimization.
+        seconds   : Wall-clock time of the product and minimization.
+    """
+
+    def __init__(self, left, right, states, minimized, seconds):
+
+        self.left      = left
+        self.right     = right
+        self.states    = states
+        self.minimized = minimized
+        self.seconds   = seconds
+
+    def __repr__(self):
+
+        return 'ProductStep(left=%r, right=%r, states=%d, minimized=%d, ' \
+               'seconds=%.6f)' % (self.left, self.right, self.states,
+                                  self.minimized, self.seconds)
+
+class Marker(object):
+
+    """Symbol labelling the transition from a state with the given colour to
+    the final sink state added by minimize_colored. Markers are only equal to
+    markers with equal colours, so they never collide with other symbols."""
+
+    def __init__(self, color):
+
+        self.color = color
+
+    def __eq__(self, other):
+
+        return isinstance(other, Marker) and self.color == other.color
+
+    def __hash__(self):
+
+        return hash((Marker, self.color))
+
+    def __repr__(self):
+
+        return 'Marker(%r)' % (self.color,)
+
+def product_many(dfas, f, workers=None, steps=None, monotone=False):
+
+    """Generalized product of many automata with respect to an n-ary boolean
+    function f (see DFA.product_many).
+
+    Intermediate products are coloured automata: each state carries the
+    tuple of acceptance bits of the automata combined so far (its colour).
+    They are minimized with respect to colours (see minimize_colored), which
+    is exact for every f because the final states are only determined from
+    the colours once all automata have been combined. States from which no
+    state with a true bit is reachable behave like missing transitions and
+    are removed, so the pairwise products never need sink states.
+
+    If f is monotone, states of intermediate products from which no word
+    can be accepted are removed as well (see prune). Without this, the
+    intermediate products of an intersection keep every pair of states in
+    which some automata have already rejected.
+
+    Without workers, the two smallest automata are combined first (as in
+    Huffman coding), so the estimated size of each product (the product of
+    the sizes) is kept small. With workers, automata are sorted by size and
+    combined in rounds of disjoint pairs, which are computed in a process
+    pool.
+
+    Args:
+        dfas     : List of DFA instances.
+        f        : Boolean function of len(dfas) variables.
+        workers  : Number of worker processes or None.
+        steps    : List to which a ProductStep is appended for each pairwise
+            product, or None.
+        monotone : Boolean indicating whether f is monotone (f remains true
+            if any argument changes from false to true). With workers, f
+            must then be picklable.
+
+    Returns:
+        Minimal partial DFA accepting w iff f(w in L(dfas[0]), ..., w in
+        L(dfas[n - 1])) is true.
+    """
+
+    if not dfas:
+        raise ValueError('product of zero automata')
+
+    items = []
+    for i, dfa in enumerate(dfas):
+        minimal = dfa.minimize()
+        colors  = {q : (q in minimal.finals,) for q in minimal.states}
+        items.append((minimal, (i,), colors))
+
+    # f is only sent to workers if it is used for pruning
+
+    context = (f, len(dfas)) if monotone else None
+
+    if workers is None or workers == 1:
+        heap = [(len(item[0].states), i, item) for i, item in enumerate(items)]
+        heapq.heapify(heap)
+        count = len(heap)
+        while len(heap) > 1:
+            _, _, left  = heapq.heappop(heap)
+            _, _, right = heapq.heappop(heap)
+            item, step  = combine((left, right, context))
+            heapq.heappush(heap, (len(item[0].states), count, item))
+            count += 1
+            if steps is not None:
+                steps.append(step)
+        item = heap[0][2]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while len(items) > 1:
+                items.sort(key=lambda item: len(item[0].states))
+                pairs   = list(zip(items[0::2], items[1::2]))
+                carried = items[2 * len(pairs):]
+                results = list(pool.map(
+                    combine, [pair + (context,) for pair in pairs]))
+                items   = [item for item, _ in results] + carried
+                if steps is not None:
+                    steps.extend(step for _, step in results)
+        item = items[0]
+
+    # determine final states from colours in the order of dfas, completing
+    # the automaton with a sink if words leaving it are accepted
+
+    dfa, components, colors = item
+    order  = [components.index(i) for i in range(len(dfas))]
+    blank  = (False,) * len(dfas)
+    sigma  = set().union(*(dfa.sigma for dfa in dfas))
+    states = set(dfa.states)
+    delta  = {q : dict(row) for q, row in dfa.delta.items()}
+
+    if f(*blank):
+        sink = len(states)
+        states.add(sink)
+        for q in states:
+            row = delta.setdefault(q, {})
+            for a in sigma:
+                if a not in row:
+                    row[a] = sink
+
+    finals = set(
+        q for q in states
+        if f(*(colors.get(q, blank)[j] for j in order))
+    )
+
+    return DFA(
+        states = states,
+        finals = finals,
+        start  = dfa.start,
+        sigma  = sigma,
+        delta  = delta
+    ).minimize()
+
+def combine(task):
+
+    """Product of two coloured automata minimized with respect to colours.
+
+    Args:
+        task : Triple (left, right, context). Left and right are triples
+            (dfa, components, colors) where components is a tuple of indices
+            of the combined automata and colors maps states to tuples of
+            acceptance bits (one per component). Context is a pair (f, size)
+            of a monotone function of size variables used to prune the
+            product (see prune), or None.
+
+    Returns:
+        (item, step) where item is the coloured product and step is a
+        ProductStep instance.
+    """
+
+    begin = time.perf_counter()
+    left, right, context = task
+    dfa1, components1, colors1 = left
+    dfa2, components2, colors2 = right
+
+    components      = components1 + components2
+    product, colors = colored_product(dfa1, colors1, len(components1),
+                                      dfa2, colors2, len(components2))
+    if context is not None:
+        prune(product, colors, components, *context)
+    minimal, colors = minimize_colored(product, colors)
+
+    step = ProductStep(
+        left      = components1,
+        right     = components2,
+        states    = len(product.states),
+        minimized = len(minimal.states),
+        seconds   = time.perf_counter() - begin
+    )
+
+    return (minimal, components, colors), step
+
+def colored_product(dfa1, colors1, width1, dfa2, colors2, width2):
+
+    """Reachable product of two coloured automata. The colour of a pair of
+    states is the concatenation of their colours, where a missing state (a
+    missing transition on one side) has a colour of false bits. The pair of
+    missing states is omitted, so the product has no sink state.
+
+    Args:
+        dfa1    : DFA instance.
+        colors1 : Dictionary mapping states of dfa1 to tuples of width1 bits.
+        width1  : Number of bits of colours of dfa1.
+        dfa2    : DFA instance.
+        colors2 : Dictionary mapping states of dfa2 to tuples of width2 bits.
+        width2  : Number of bits of colours of dfa2.
+
+    Returns:
+        (dfa, colors) where dfa is the product with states range(n) and
+        colors maps its states to tuples of width1 + width2 bits.
+    """
+
+    blank1   = (False,) * width1
+    blank2   = (False,) * width2
+    sigma    = dfa1.sigma.union(dfa2.sigma)
+
+    start    = (dfa1.start, dfa2.start)
+    states   = {start : 0}
+    delta    = {}
+    worklist = deque([start])
+
+    while worklist:
+        q1, r1 = worklist.popleft()
+        row1 = dfa1.delta.get(q1, {}) if q1 is not None else {}
+        row2 = dfa2.delta.get(r1, {}) if r1 is not None else {}
+        source = states[(q1, r1)]
+        for a in set(row1).union(row2):
+            target = (row1.get(a), row2.get(a))
+            if target not in states:
+                states[target] = len(states)
+                worklist.append(target)
+            if source not in delta:
+                delta[source] = {}
+            delta[source][a] = states[target]
+
+    colors = {
+        i : (colors1.get(q1, blank1) if q1 is not None else blank1) +
+            (colors2.get(r1, blank2) if r1 is not None else blank2)
+        for (q1, r1), i in states.items()
+    }
+
+    return DFA(
+        states = set(states.values()),
+        finals = set(),
+        start  = 0,
+        sigma  = sigma,
+        delta  = delta
+    ), colors
+
+def prune(dfa, colors, components, f, size):
+
+    """Remove the states of a coloured automaton from which no word is
+    accepted by the final product, for a monotone function f. The live
+    components of a state (those with a true bit reachable from it) are
+    computed as bitmasks by backward propagation. A state is removed if f is
+    false when exactly its live components and all automata outside
+    components are true. As f is monotone, f is then false for every word
+    through the state, whatever the other automata accept. States are
+    removed in place by deleting their transitions, their colours and the
+    transitions to them.
+
+    Args:
+        dfa        : DFA instance.
+        colors     : Dictionary mapping states to tuples of bits.
+        components : Tuple of indices of the automata combined in dfa.
+        f          : Monotone boolean function of size variables.
+        size       : Number of automata of the final product.
+    """
+
+    masks = {
+        q : sum(1 << i for i, bit in enumerate(colors.get(q, ())) if bit)
+        for q in dfa.states
+    }
+
+    inverse = {}
+    for q, a, r in dfa.iterate():
+        if r not in inverse:
+            inverse[r] = []
+        inverse[r].append(q)
+
+    worklist = [q for q in dfa.states if masks[q]]
+    while worklist:
+        r = worklist.pop()
+        for q in inverse.get(r, ()):
+            if masks[r] & ~masks[q]:
+                masks[q] |= masks[r]
+                worklist.append(q)
+
+    # f is evaluated once per distinct mask
+
+    useful = {}
+    for mask in set(masks.values()):
+        bits = [True] * size
+        for i, c in enumerate(components):
+            bits[c] = bool(mask >> i & 1)
+        useful[mask] = bool(f(*bits))
+
+    for q in dfa.states:
+        if not useful[masks[q]]:
+            dfa.delta.pop(q, None)
+            colors.pop(q, None)
+        elif q in dfa.delta:
+            row = dfa.delta[q]
+            for a in [a for a, r in row.items() if not useful[masks[r]]]:
+                del row[a]
+
+def minimize_colored(dfa, colors):
+
+    """Minimize an automaton whose states carry colours (tuples of bits)
+    rather than a final bit, using minimize_valmari. Each state with a true
+    bit gets a transition on the Marker of its colour to a new final sink
+    state, so minimization distinguishes states by colour and removes the
+    states from which no true bit is reachable. The markers and the sink are
+    removed from the result.
+
+    Args:
+        dfa    : DFA instance with states range(n).
+        colors : Dictionary mapping states to tuples of bits.
+
+    Returns:
+        (dfa, colors) where dfa is the minimized automaton with states
+        range(n) and colors maps its states to colours (states without a true
+        bit are omitted).
+    """
+
+    sink    = len(dfa.states)
+    delta   = {q : dict(row) for q, row in dfa.delta.items()}
+    markers = set()
+
+    for q, color in colors.items():
+        if any(color):
+            marker = Marker(color)
+            markers.add(marker)
+            delta.setdefault(q, {})[marker] = sink
+
+    # symbols of different types are not comparable, so the numpy engine
+    # (which interns symbols) is used
+
+    minimal = DFA(
+        states = set(range(sink + 1)),
+        finals = set([sink]),
+        start  = dfa.start,
+        sigma  = dfa.sigma.union(markers),
+        delta  = delta
+    ).minimize_valmari(engine='numpy')
+
+    final = next(iter(minimal.finals), None)
+    ids   = {}
+    for q in sorted(minimal.states):
+        if q != final:
+            ids[q] = len(ids)
+
+    delta  = {}
+    sigma  = set()
+    colors = {}
+    for q, row in minimal.delta.items():
+        for a, r in row.items():
+            if isinstance(a, Marker):
+                colors[ids[q]] = a.color
+            else:
+                if ids[q] not in delta:
+                    delta[ids[q]] = {}
+                delta[ids[q]][a] = ids[r]
+                sigma.add(a)
+
+    return DFA(
+        states = set(range(max(len(ids), 1))),
+        finals = set(),
+        start  = ids.get(minimal.start, 0),
+        sigma  = sigma,
+        delta  = delta
+    ), colors
@@ -0,0 +1,471 @@
+import mmap
+import struct
+import numpy as np
+from collections.abc import Mapping
+from collections.abc import Set
+from pyform.automaton.compact import CompactDFA
+from pyform.automaton.dfa import DFA
+from pyform.common.alphabet import sort_symbols
+
+# file layout (all integers little-endian):
+#
+#   header   : magic, version, state width (bytes per state id), number of
+#              states, symbols and transitions, start state id, and the
+#              offsets of the sections below
+#   symbols  : tagged symbol table (see _encode_symbol)
+#   names    : int64 array mapping state ids to original states
+#   offsets  : int64 array of num_states + 1 row offsets (CSR)
+#   labels   : int32 array of symbol ids per transition, sorted per row
+#   targets  : array of state ids per transition (int32 or int64)
+#   finals   : bitmap of final states (bit q % 8 of byte q // 8)
+#
+# sections start at multiples of ALIGNMENT so that arrays are aligned when
+# the file is memory-mapped
+
+MAGIC     = b'PYFORMDF'
+VERSION   = 1
+ALIGNMENT = 64
+
+HEADER = struct.Struct('<8sIIQQQQ6Q')
+
+SYMBOL = struct.Struct('<BI')
+
+INT, STR, BYTES, BOOL = range(4)
+
+class MappedDFA(DFA):
+
+    """Read-only deterministic automaton backed by the arrays of a file
+    written by save (see DFA.save and DFA.load).
+
+    The transition function is stored in compressed sparse row (CSR) form:
+    the transitions of state q are at positions offsets[q] to offsets[q + 1]
+    of labels (symbol ids, sorted) and targets (state ids). The arrays are
+    views of the file, memory-mapped or read into memory, so loading does not
+    depend on the number of transitions and processes mapping the same file
+    share its pages.
+
+    Like CompactDFA, instances expose the attributes of DFA in terms of state
+    ids (states, finals, sigma and delta are read-only views) and record the
+    original states in names. Derived array-backed forms (see compact) are
+    built on first use.
+
+    Attributes:
+        offsets : Array of row offsets.
+        labels  : Array of symbol ids.
+        targets : Array of state ids.
+        bitmap  : Array of bytes encoding final states.
+        symbols : List mapping symbol ids to symbols.
+        index   : Dictionary mapping symbols to symbol ids.
+        names   : Array mapping state ids to original states.
+        buffer  : Memory map or bytes object holding the arrays.
+    """
+
+    def __init__(self, buffer):
+
+        header = HEADER.unpack_from(buffer, 0)
+        magic, version, width, num_states, num_symbols, num_transitions, \
+            start, symbols, names, offsets, labels, targets, finals = header
+
+        if magic != MAGIC:
+            raise ValueError('not an automaton file')
+        if version != VERSION:
+            raise ValueError('unsupported version: %r' % (version,))
+
+        dtype = np.dtype('<i4') if width == 4 else np.dtype('<i8')
+
+        self.buffer  = buffer
+        self.symbols = _decode_symbols(buffer, symbols, num_symbols)
+        self.index   = {a : i for i, a in enumerate(self.symbols)}
+        self.names   = _array(buffer, names, '<i8', num_states)
+        self.offsets = _array(buffer, offsets, '<i8', num_states + 1)
+        self.labels  = _array(buffer, labels, '<i4', num_transitions)
+        self.targets = _array(buffer, targets, dtype, num_transitions)
+        self.bitmap  = _array(buffer, finals, np.uint8, (num_states + 7) // 8)
+
+        super().__init__(
+            states = range(num_states),
+            finals = FinalSet(self),
+            sigma  = frozenset(self.symbols),
+            start  = start,
+            delta  = CSRDelta(self)
+        )
+
+    def iterate(self):
+
+        """Generator yielding transitions as triples (q, a, r) in order of
+        state ids and symbol ids (see DFA.iterate).
+
+        Returns:
+            Generator yielding transitions as triples.
+        """
+
+        tails = np.repeat(np.arange(len(self.states)), np.diff(self.offsets))
+        return (
+            (q, self.symbols[i], r)
+            for q, i, r in zip(tails.tolist(), self.labels.tolist(),
+                               self.targets.tolist())
+        )
+
+    def step(self, state, symbol):
+
+        """The state obtained by transitioning from state on symbol, or None
+        if there is no such transition (see CompactDFA.step).
+
+        Args:
+            state  : State id.
+            symbol : Hashable object.
+
+        Returns:
+            State id or None.
+        """
+
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+
+        begin = self.offsets.item(state)
+        end   = self.offsets.item(state + 1)
+        j     = begin + int(np.searchsorted(self.labels[begin:end], i))
+        if j < end and self.labels.item(j) == i:
+            return self.targets.item(j)
+        return None
+
+    def run(self, word):
+
+        state = self.start
+        for symbol in word:
+            state = self.step(state, symbol)
+            if state is None:
+                return None
+
+        return state
+
+    def compact(self):
+
+        """Construct equivalent array-backed automaton with a dense table (see
+        DFA.compact). States are not renumbered. The result is cached.
+
+        Returns:
+            CompactDFA instance isomorphic with the current automaton.
+        """
+
+        if self._compact is None:
+            count = len(self.states)
+            table = np.full((count, len(self.symbols)), CompactDFA.SENTINEL,
+                            dtype=np.int32 if count < 2 ** 31 else np.int64)
+            tails = np.repeat(np.arange(count), np.diff(self.offsets))
+            table[tails, self.labels] = self.targets
+
+            self._compact = CompactDFA(
+                table   = table,
+                finals  = self.accepting().nonzero()[0].tolist(),
+                start   = self.start,
+                symbols = self.symbols
+            )
+
+        return self._compact
+
+    def accepting(self):
+
+        """Boolean array indicating final states.
+
+        Returns:
+            NumPy array of booleans.
+        """
+
+        bits = np.unpackbits(self.bitmap, bitorder='little')
+        return bits[:len(self.states)].astype(bool)
+
+    def to_dfa(self):
+
+        """Construct dictionary-backed DFA with the original state numbers
+        (see CompactDFA.to_dfa).
+
+        Returns:
+            DFA instance.
+        """
+
+        names = self.names.tolist()
+        delta = {}
+        for q, a, r in self.iterate():
+            if names[q] not in delta:
+                delta[names[q]] = {}
+            delta[names[q]][a] = names[r]
+
+        return DFA(
+            states = set(names),
+            finals = set(names[q] for q in self.finals),
+            start  = names[self.start],
+            sigma  = set(self.symbols),
+            delta  = delta
+        )
+
+    def nbytes(self):
+
+        """Number of bytes of the file backing the automaton.
+
+        Returns:
+            Integer.
+        """
+
+        return len(self.buffer)
+
+class CSRDelta(Mapping):
+
+    """Read-only view of the transitions of a MappedDFA as a partial
+    transition function (see TableDelta).
+
+    Attributes:
+        dfa : MappedDFA instance.
+    """
+
+    def __init__(self, dfa):
+
+        self.dfa = dfa
+
+    def __getitem__(self, state):
+
+        if state not in self:
+            raise KeyError(state)
+        return CSRRow(self.dfa, state)
+
+    def __contains__(self, state):
+
+        offsets = self.dfa.offsets
+        return isinstance(state, (int, np.integer)) and \
+               0 <= state < len(offsets) - 1 and \
+               offsets.item(state + 1) > offsets.item(state)
+
+    def __iter__(self):
+
+        return iter(np.flatnonzero(np.diff(self.dfa.offsets)).tolist())
+
+    def __len__(self):
+
+        return int(np.count_nonzero(np.diff(self.dfa.offsets)))
+
+class CSRRow(Mapping):
+
+    """Read-only view of the outgoing transitions of a single state of a
+    MappedDFA as a dictionary mapping symbols to state ids.
+
+    Attributes:
+        dfa   : MappedDFA instance.
+        state : State id.
+    """
+
+    def __init__(self, dfa, state):
+
+        self.dfa   = dfa
+        self.state = state
+
+    def __getitem__(self, symbol):
+
+        target = self.dfa.step(self.state, symbol)
+        if target is None:
+            raise KeyError(symbol)
+        return target
+
+    def __contains__(self, symbol):
+
+        return self.dfa.step(self.state, symbol) is not None
+
+    def __iter__(self):
+
+        begin = self.dfa.offsets.item(self.state)
+        end   = self.dfa.offsets.item(self.state + 1)
+        return (
+            self.dfa.symbols[i] for i in self.dfa.labels[begin:end].tolist()
+        )
+
+    def __len__(self):
+
+        return self.dfa.offsets.item(self.state + 1) - \
+               self.dfa.offsets.item(self.state)
+
+    def items(self):
+
+        begin = self.dfa.offsets.item(self.state)
+        end   = self.dfa.offsets.item(self.state + 1)
+        return [
+            (self.dfa.symbols[i], r) for i, r in zip(
+                self.dfa.labels[begin:end].tolist(),
+                self.dfa.targets[begin:end].tolist())
+        ]
+
+class FinalSet(Set):
+
+    """Read-only view of the final states of a MappedDFA as a set of state
+    ids, backed by its bitmap.
+
+    Attributes:
+        dfa : MappedDFA instance.
+    """
+
+    def __init__(self, dfa):
+
+        self.dfa = dfa
+
+    def __contains__(self, state):
+
+        return isinstance(state, (int, np.integer)) and \
+               0 <= state < len(self.dfa.states) and \
+               bool(self.dfa.bitmap.item(state >> 3) >> (state & 7) & 1)
+
+    def __iter__(self):
+
+        return iter(np.flatnonzero(self.dfa.accepting()).tolist())
+
+    def __len__(self):
+
+        return int(np.count_nonzero(self.dfa.accepting()))
+
+def save(dfa, path):
+
+    """Write an automaton to a file in the binary format read by load. States
+    are numbered in sorted order and symbols in sorted order (see
+    sort_symbols). Symbols must be integers, booleans, strings or bytes
+    and states must be integers representable in 64 bits.
+
+    Args:
+        dfa  : DFA instance.
+        path : Path of file.
+    """
+
+    if isinstance(dfa, MappedDFA):
+        dfa = dfa.to_dfa()
+
+    names   = sorted(dfa.states)
+    ids     = {q : i for i, q in enumerate(names)}
+    symbols = sort_symbols(dfa.sigma)
+    index   = {a : i for i, a in enumerate(symbols)}
+    count   = len(names)
+    width   = 4 if count < 2 ** 31 else 8
+
+    # one pass over the rows, then symbol ids are sorted within rows (states
+    # in range(count) are their own ids)
+
+    identity = names[0] == 0 and names[-1] == count - 1
+    counts   = np.zeros(count, dtype=np.int64)
+    labels   = []
+    targets  = []
+    for i, q in enumerate(names):
+        row = dfa.delta.get(q)
+        if row:
+            counts[i] = len(row)
+            labels.extend(map(index.__getitem__, row))
+            targets.extend(row.values() if identity
+                           else map(ids.__getitem__, row.values()))
+
+    labels  = np.array(labels, dtype='<i4')
+    targets = np.array(targets, dtype='<i%d' % width)
+    offsets = np.zeros(count + 1, dtype='<i8')
+    np.cumsum(counts, out=offsets[1:])
+
+    order   = np.lexsort((labels, np.repeat(np.arange(count), counts)))
+    labels  = labels[order]
+    targets = targets[order]
+
+    accepting = np.zeros(count, dtype=bool)
+    accepting[[ids[q] for q in dfa.finals]] = True
+
+    sections = [
+        b''.join(_encode_symbol(a) for a in symbols),
+        np.asarray(names, dtype='<i8'),
+        offsets,
+        labels,
+        targets,
+        np.packbits(accepting, bitorder='little'),
+    ]
+
+    positions = []
+    position  = HEADER.size
+    for section in sections:
+        position = _align(position)
+        positions.append(position)
+        position += len(section) if isinstance(section, bytes) \
+                    else section.nbytes
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, width, count, len(symbols),
+                            len(targets), ids[dfa.start], *positions))
+        for position, section in zip(positions, sections):
+            f.write(b'\0' * (position - f.tell()))
+            if isinstance(section, bytes):
+                f.write(section)
+            else:
+                section.tofile(f)
+
+def load(path, mmap=True):
+
+    """Read an automaton written by save.
+
+    Args:
+        path : Path of file.
+        mmap : Boolean indicating whether to memory-map the file (read-only)
+            rather than read it into memory.
+
+    Returns:
+        MappedDFA instance.
+    """
+
+    with open(path, 'rb') as f:
+        if mmap:
+            buffer = _mmap(f)
+        else:
+            buffer = f.read()
+
+    return MappedDFA(buffer)
+
+def _mmap(f):
+
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _align(position):
+
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+def _array(buffer, offset, dtype, count):
+
+    return np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+
+def _encode_symbol(symbol):
+
+    """Tagged encoding of a symbol: tag and payload length followed by the
+    payload (two's complement for integers, UTF-8 for strings)."""
+
+    if type(symbol) is bool:
+        tag, payload = BOOL, bytes([symbol])
+    elif type(symbol) is int:
+        length  = symbol.bit_length() // 8 + 1
+        tag     = INT
+        payload = symbol.to_bytes(length, 'little', signed=True)
+    elif type(symbol) is str:
+        tag, payload = STR, symbol.encode('utf-8', 'surrogatepass')
+    elif type(symbol) is bytes:
+        tag, payload = BYTES, symbol
+    else:
+        raise ValueError('unsupported symbol: %r' % (symbol,))
+
+    return SYMBOL.pack(tag, len(payload)) + payload
+
+def _decode_symbols(buffer, offset, count):
+
+    symbols = []
+    for _ in range(count):
+        tag, length = SYMBOL.unpack_from(buffer, offset)
+        offset  += SYMBOL.size
+        payload  = bytes(buffer[offset:offset + length])
+        offset  += length
+        if tag == INT:
+            symbols.append(int.from_bytes(payload, 'little', signed=True))
+        elif tag == STR:
+            symbols.append(payload.decode('utf-8', 'surrogatepass'))
+        elif tag == BYTES:
+            symbols.append(payload)
+        elif tag == BOOL:
+            symbols.append(bool(payload[0]))
+        else:
+            raise ValueError('unknown symbol tag: %r' % (tag,))
+
+    return symbols
@@ -0,0 +1,334 @@
+import io
+import mmap
+import os
+import stat
+
+class _Dead(object):
+
+    """Type of DEAD, the state recorded by snapshot once the input has left
+    the automaton. It pickles by reference, so DEAD is preserved when a
+    snapshot is resumed in another process."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+
+        return 'DEAD'
+
+    def __reduce__(self):
+
+        return 'DEAD'
+
+DEAD = _Dead()
+
+class StreamMatcher(object):
+
+    """Resumable matcher running a DFA over a stream of symbols.
+
+    The matcher consumes its input in chunks (feed and matches) or directly
+    from files (scan and finditer) and records the current state and the
+    number of symbols consumed so far. A scan can therefore be paused after
+    any chunk and resumed later, possibly in another process, by passing the
+    recorded state and offset to a new matcher (see snapshot).
+
+    Files given by path are memory-mapped and scanned through memoryviews,
+    so no part of the file is copied into Python strings. Other binary file
+    objects are read into a fixed-size buffer. Text file objects yield
+    characters, which suits DFAs whose symbols are single characters.
+
+    If every symbol of the DFA is an integer in range(256), bytes are looked
+    up in a precomputed table with 256 entries per state and no symbol
+    lookup. Otherwise each symbol is first mapped to its symbol id. Both
+    tables are derived from the array-backed form of the DFA (DFA.compact),
+    extended with a dead state reached on undefined transitions and symbols
+    outside the alphabet. Once the dead state is reached no further input is
+    examined.
+
+    Attributes:
+        dfa    : DFA instance.
+        offset : Number of symbols consumed.
+    """
+
+    def __init__(self, dfa, state=None, offset=0):
+
+        compact = dfa.compact()
+        table   = compact._extended_table()
+
+        self.dfa     = dfa
+        self.offset  = offset
+        self.names   = compact.names
+        self.ids     = {q : i for i, q in enumerate(compact.names)}
+        self.index   = compact.index
+        self.unknown = len(compact.symbols)
+        self.dead    = len(compact.names)
+        self.finals  = set(compact.finals)
+
+        # byte table stores multiples of 256 so that the successor of state
+        # q on byte b is found at bytes[256 * q + b]
+
+        if compact.symbols and all(type(a) is int and 0 <= a < 256
+                                   for a in compact.symbols):
+            columns = [self.index.get(b, self.unknown) for b in range(256)]
+            self.bytes = (table[:, columns] * 256).ravel().tolist()
+            self.rows  = None
+        else:
+            self.bytes = None
+            self.rows  = table.tolist()
+
+        self.reset(state, offset)
+
+    @property
+    def state(self):
+
+        """Current state, or None if the input has left the automaton."""
+
+        return None if self.current == self.dead else self.names[self.current]
+
+    @property
+    def accepting(self):
+
+        """Boolean indicating whether the input consumed so far is
+        accepted."""
+
+        return self.current in self.finals
+
+    def reset(self, state=None, offset=0):
+
+        """Restore the matcher to state after consuming offset symbols. If
+        state is None, restores the start state, and if state is DEAD,
+        restores the dead state (see snapshot).
+
+        Args:
+            state  : State of dfa, DEAD or None.
+            offset : Number of symbols consumed.
+        """
+
+        if state is DEAD:
+            self.current = self.dead
+        else:
+            if state is None:
+                state = self.dfa.start
+            self.current = self.ids[state]
+        self.offset = offset
+
+    def snapshot(self):
+
+        """The current state and offset, suitable as arguments to reset or
+        the constructor of another matcher.
+
+        Returns:
+            (state, offset) where state is the current state (DEAD if the
+            input has left the automaton) and offset is the number of
+            symbols consumed.
+        """
+
+        state = DEAD if self.current == self.dead else self.state
+        return (state, self.offset)
+
+    def feed(self, data):
+
+        """Consume a chunk of input.
+
+        Args:
+            data : Bytes-like object or iterable of symbols.
+
+        Returns:
+            Current state after consuming data (see state).
+        """
+
+        if self.current != self.dead:
+            if self.bytes is not None and _is_binary(data):
+                table = self.bytes
+                state = self.current * 256
+                for b in data:
+                    state = table[state + b]
+                self.current = state // 256
+            else:
+                rows  = self.rows or self._symbol_rows()
+                index = self.index
+                state = self.current
+                for a in data:
+                    state = rows[state][index.get(a, self.unknown)]
+                self.current = state
+
+        self.offset += len(data)
+        return self.state
+
+    def matches(self, data):
+
+        """Consume a chunk of input and report match positions. A position p
+        is reported if the first p symbols of the entire input consumed so
+        far are accepted and offset < p <= offset + len(data), where offset is
+        the number of symbols consumed before the call.
+
+        Args:
+            data : Bytes-like object or iterable of symbols.
+
+        Returns:
+            List of match positions in increasing order.
+        """
+
+        positions = []
+        if self.current != self.dead:
+            finals = self.finals
+            if self.bytes is not None and _is_binary(data):
+                table  = self.bytes
+                finals = set(q * 256 for q in finals)
+                state  = self.current * 256
+                for i, b in enumerate(data, self.offset + 1):
+                    state = table[state + b]
+                    if state in finals:
+                        positions.append(i)
+                self.current = state // 256
+            else:
+                rows  = self.rows or self._symbol_rows()
+                index = self.index
+                state = self.current
+                for i, a in enumerate(data, self.offset + 1):
+                    state = rows[state][index.get(a, self.unknown)]
+                    if state in finals:
+                        positions.append(i)
+                self.current = state
+
+        self.offset += len(data)
+        return positions
+
+    def scan(self, source, chunk_size=1 << 20, limit=None):
+
+        """Consume input from a file (see chunks).
+
+        Args:
+            source     : Path or file object.
+            chunk_size : Maximum number of symbols consumed per chunk.
+            limit      : Maximum number of symbols consumed, or None.
+
+        Returns:
+            Boolean indicating whether the input consumed so far is accepted.
+        """
+
+        for chunk in self.chunks(source, chunk_size, limit):
+            self.feed(chunk)
+            if self.current == self.dead:
+                break
+
+        return self.accepting
+
+    def finditer(self, source, chunk_size=1 << 20, limit=None):
+
+        """Generator consuming input from a file (see chunks) and yielding
+        match positions (see matches). The matcher is up to date with the
+        input whenever a chunk has been exhausted.
+
+        Args:
+            source     : Path or file object.
+            chunk_size : Maximum number of symbols consumed per chunk.
+            limit      : Maximum number of symbols consumed, or None.
+
+        Returns:
+            Generator yielding match positions in increasing order.
+        """
+
+        for chunk in self.chunks(source, chunk_size, limit):
+            yield from self.matches(chunk)
+            if self.current == self.dead:
+                break
+
+    def chunks(self, source, chunk_size=1 << 20, limit=None):
+
+        """Generator yielding chunks of input from a file. If source is a
+        path, the file is memory-mapped and read from byte offset (so a scan
+        of the same file resumes where the matcher left off). If source is a
+        file object, it is read from its current position. The chunks are
+        only valid until the next chunk is requested.
+
+        Args:
+            source     : Path or file object.
+            chunk_size : Maximum number of symbols per chunk.
+            limit      : Maximum number of symbols yielded, or None.
+
+        Returns:
+            Generator yielding bytes-like objects or strings.
+        """
+
+        if isinstance(source, (str, bytes, os.PathLike)):
+            with open(source, 'rb') as f:
+                yield from _mapped_chunks(f, self.offset, chunk_size, limit)
+            return
+
+        if _is_mappable(source):
+            yield from _mapped_chunks(source, source.tell(), chunk_size, limit)
+        else:
+            yield from _read_chunks(source, chunk_size, limit)
+
+    def _symbol_rows(self):
+
+        """Rows of the extended transition table indexed by symbol ids, built
+        on demand if the byte table is used but the input is not binary."""
+
+        self.rows = self.dfa.compact()._extended_table().tolist()
+        return self.rows
+
+def _is_binary(data):
+
+    return isinstance(data, (bytes, bytearray, memoryview, mmap.mmap))
+
+def _is_mappable(f):
+
+    """Determine whether f is a binary file object backed by a regular
+    file."""
+
+    if isinstance(f, io.TextIOBase):
+        return False
+    try:
+        return stat.S_ISREG(os.fstat(f.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        return False
+
+def _mapped_chunks(f, start, chunk_size, limit):
+
+    """Generator yielding memoryviews of a memory-mapped file."""
+
+    size = os.fstat(f.fileno()).st_size
+    stop = size if limit is None else min(size, start + limit)
+    if start >= stop:
+        return
+
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            for i in range(start, stop, chunk_size):
+                with view[i:min(i + chunk_size, stop)] as chunk:
+                    yield chunk
+
+    if hasattr(f, 'seek'):
+        f.seek(stop)
+
+def _read_chunks(f, chunk_size, limit):
+
+    """Generator yielding chunks read from a file object into a reused
+    buffer (binary files) or as strings (text files)."""
+
+    remaining = limit
+
+    if isinstance(f, io.TextIOBase) or not hasattr(f, 'readinto'):
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size if remaining is None
+                           else min(chunk_size, remaining))
+            if not chunk:
+                return
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+        return
+
+    buffer = bytearray(chunk_size)
+    with memoryview(buffer) as view:
+        while remaining is None or remaining > 0:
+            count = f.readinto(view if remaining is None or
+                               remaining >= chunk_size
+                               else view[:remaining])
+            if not count:
+                return
+            if remaining is not None:
+                remaining -= count
+            with view[:count] as chunk:
+                yield chunk
@@ -0,0 +1,396 @@
+from bisect import bisect_left
+from bisect import bisect_right
+from pyform.automaton.dfa import DFA
+from pyform.automaton.fa import FA
+
+class RangeDFA(FA):
+
+    """Deterministic finite automaton with transitions labelled by ranges of
+    integer symbols.
+
+    Symbolic variant of DFA for large alphabets such as the Unicode code
+    points, where one transition per symbol is infeasible. The transitions
+    of a state are sorted disjoint inclusive ranges (lo, hi) of integers,
+    each with a target state. Words are sequences of integers or strings,
+    whose characters are read as their code points (see run). The alphabet
+    is range(SYMBOLS) (every code point), which matters for products whose
+    function f is true if neither automaton accepts.
+
+    At run time symbols below TABLE are looked up in a table per state and
+    larger symbols by binary search in the sorted range starts of the state.
+    Both are built on first use and cached, so the automaton must not be
+    modified afterwards.
+
+    Minimization, products and equivalence checks work over the boundaries
+    of the ranges of the automata involved (see boundaries): the intervals
+    between consecutive boundaries are elementary, in that every symbol of
+    an interval behaves identically in every state, so the automata are
+    mapped to DFAs over interval ids, handled by the corresponding methods
+    of DFA, and mapped back with adjacent intervals on the same target
+    merged into one range. The work is therefore proportional to the number
+    of elementary intervals rather than the number of symbols.
+
+    Attributes:
+        states : Set of integers.
+        finals : Set of integers (subset of states).
+        start  : Integer (member of states).
+        delta  : Dictionary mapping states to lists of triples (lo, hi, r),
+            sorted by lo, of disjoint ranges (there is a transition from
+            state q to state r on symbol c iff lo <= c <= hi for some (lo,
+            hi, r) in delta[q]). States without transitions may be omitted.
+    """
+
+    # symbols in range(TABLE) are looked up without binary search
+
+    TABLE   = 128
+    SYMBOLS = 0x110000
+
+    def __init__(self, states, finals, start, delta):
+
+        self.states = states
+        self.finals = finals
+        self.start  = start
+        self.delta  = delta
+
+        self._rows  = None
+        self._table = None
+
+    def validate(self):
+
+        """Check that the ranges of every state are sorted and disjoint and
+        lead to states of the automaton.
+
+        Raises:
+            ValueError if some ranges are invalid.
+        """
+
+        for q, row in self.delta.items():
+            previous = None
+            for lo, hi, r in row:
+                if lo > hi or (previous is not None and lo <= previous):
+                    raise ValueError('invalid range: %r' % ((q, lo, hi),))
+                if r not in self.states:
+                    raise ValueError('unknown state: %r' % (r,))
+                previous = hi
+
+    def iterate(self):
+
+        """Generator yielding transitions as quadruples (q, lo, hi, r).
+
+        Returns:
+            Generator yielding transitions as quadruples.
+        """
+
+        return (
+            (q, lo, hi, r)
+            for q, row in self.delta.items()
+            for lo, hi, r in row
+        )
+
+    def step(self, state, symbol):
+
+        """The successor of state on symbol, or None if there is none.
+
+        Args:
+            state  : State of the automaton.
+            symbol : Integer.
+
+        Returns:
+            State or None.
+        """
+
+        if self._rows is None:
+            self._index()
+
+        if 0 <= symbol < self.TABLE:
+            return self._table[state][symbol] if state in self._table \
+                   else None
+
+        if state not in self._rows:
+            return None
+        starts, ends, targets = self._rows[state]
+        i = bisect_right(starts, symbol) - 1
+        if i >= 0 and symbol <= ends[i]:
+            return targets[i]
+        return None
+
+    def run(self, word):
+
+        """The state reached by transitioning from the start state on the
+        symbols of word in order, or None if some transition is undefined.
+
+        Args:
+            word : Iterable of integers or string (read as code points).
+
+        Returns:
+            State or None.
+        """
+
+        if self._rows is None:
+            self._index()
+
+        if isinstance(word, str):
+            word = map(ord, word)
+
+        size  = self.TABLE
+        rows  = self._rows
+        table = self._table
+        state = self.start
+        for symbol in word:
+            if 0 <= symbol < size:
+                state = table[state][symbol] if state in table else None
+            elif state in rows:
+                starts, ends, targets = rows[state]
+                i = bisect_right(starts, symbol) - 1
+                state = targets[i] if i >= 0 and symbol <= ends[i] else None
+            else:
+                state = None
+            if state is None:
+                return None
+
+        return state
+
+    def accepts(self, word):
+
+        """Determine whether the automaton accepts word (see run).
+
+        Args:
+            word : Iterable of integers or string.
+
+        Returns:
+            Boolean indicating whether word is accepted.
+        """
+
+        return self.run(word) in self.finals
+
+    def _index(self):
+
+        """Build the lookup tables of step and run."""
+
+        self._rows  = {}
+        self._table = {}
+        for q, row in self.delta.items():
+            self._rows[q] = ([lo for lo, hi, r in row],
+                             [hi for lo, hi, r in row],
+                             [r for lo, hi, r in row])
+            table = [None] * self.TABLE
+            for lo, hi, r in row:
+                if lo >= self.TABLE:
+                    break
+                for c in range(max(lo, 0), min(hi + 1, self.TABLE)):
+                    table[c] = r
+            self._table[q] = table
+
+    @classmethod
+    def from_dfa(cls, dfa, encode=None):
+
+        """Construct range-labelled automaton from DFA by merging the
+        transitions of each state on consecutive symbols with the same
+        target into ranges.
+
+        Args:
+            dfa    : DFA instance.
+            encode : Function mapping the symbols of dfa to integers (such as
+                ord), or None if the symbols are integers.
+
+        Returns:
+            RangeDFA instance with the states of dfa.
+        """
+
+        delta = {}
+        for q, m in dfa.delta.items():
+            labels = sorted((a if encode is None else encode(a), r)
+                            for a, r in m.items())
+            delta[q] = _merge(labels)
+
+        return cls(
+            states = set(dfa.states),
+            finals = set(dfa.finals),
+            start  = dfa.start,
+            delta  = delta
+        )
+
+    def to_dfa(self, decode=None):
+
+        """Construct DFA with one transition per symbol of every range, so
+        the ranges must be small. The alphabet of the result is the set of
+        symbols of the ranges.
+
+        Args:
+            decode : Function mapping integers to the symbols of the result
+                (such as chr), or None for integer symbols.
+
+        Returns:
+            DFA instance with the states of the current automaton.
+        """
+
+        delta, sigma = {}, set()
+        for q, lo, hi, r in self.iterate():
+            if q not in delta:
+                delta[q] = {}
+            for c in range(lo, hi + 1):
+                a = c if decode is None else decode(c)
+                delta[q][a] = r
+                sigma.add(a)
+
+        return DFA(
+            states = set(self.states),
+            finals = set(self.finals),
+            start  = self.start,
+            sigma  = sigma,
+            delta  = delta
+        )
+
+    def to_intervals(self, bounds):
+
+        """Construct DFA over interval ids, where interval i is the range of
+        symbols from bounds[i] to bounds[i + 1] - 1 and bounds contains the
+        boundaries of the ranges of the automaton (see boundaries).
+
+        Args:
+            bounds : Sorted list of integers.
+
+        Returns:
+            DFA instance whose alphabet is range(len(bounds) - 1).
+        """
+
+        delta = {}
+        for q, lo, hi, r in self.iterate():
+            if q not in delta:
+                delta[q] = {}
+            begin = bisect_left(bounds, lo)
+            end   = bisect_left(bounds, hi + 1)
+            for i in range(begin, end):
+                delta[q][i] = r
+
+        return DFA(
+            states = set(self.states),
+            finals = set(self.finals),
+            start  = self.start,
+            sigma  = set(range(max(len(bounds) - 1, 0))),
+            delta  = delta
+        )
+
+    @classmethod
+    def from_intervals(cls, dfa, bounds):
+
+        """Construct range-labelled automaton from DFA over interval ids (see
+        to_intervals), merging adjacent intervals with the same target.
+
+        Args:
+            dfa    : DFA instance whose alphabet is range(len(bounds) - 1).
+            bounds : Sorted list of integers.
+
+        Returns:
+            RangeDFA instance with the states of dfa.
+        """
+
+        delta = {}
+        for q, m in dfa.delta.items():
+            ranges = []
+            for i, r in sorted(m.items()):
+                lo, hi = bounds[i], bounds[i + 1] - 1
+                if ranges and ranges[-1][1] == lo - 1 and ranges[-1][2] == r:
+                    ranges[-1] = (ranges[-1][0], hi, r)
+                else:
+                    ranges.append((lo, hi, r))
+            delta[q] = ranges
+
+        return cls(
+            states = set(dfa.states),
+            finals = set(dfa.finals),
+            start  = dfa.start,
+            delta  = delta
+        )
+
+    def minimize(self, strategy='auto'):
+
+        """Construct equivalent (up to isomorphism) minimal automaton over the
+        elementary intervals of the automaton (see DFA.minimize).
+
+        Args:
+            strategy : String 'valmari', 'hopcroft', 'moore' or 'auto'.
+
+        Returns:
+            Minimal RangeDFA equivalent to the current automaton.
+        """
+
+        bounds = boundaries([self])
+        return RangeDFA.from_intervals(
+            self.to_intervals(bounds).minimize(strategy), bounds)
+
+    def product(self, dfa, f):
+
+        """Generalized product of current and argument automata with respect
+        to boolean function f over their common elementary intervals (see
+        DFA.product).
+
+        Args:
+            dfa : RangeDFA instance.
+            f   : Boolean function of two variables.
+
+        Returns:
+            RangeDFA instance whose states represent pairs of states.
+        """
+
+        bounds  = boundaries([self, dfa])
+        product = self.to_intervals(bounds).product(
+            dfa.to_intervals(bounds), f)
+        return RangeDFA.from_intervals(product, bounds)
+
+    def equivalent(self, dfa):
+
+        """Determine whether the current and argument automata are equivalent
+        over their common elementary intervals (see
+        DFA.equivalent_hopcroft_karp).
+
+        Args:
+            dfa : RangeDFA instance.
+
+        Returns:
+            (b, w) where b is a boolean indicating whether the automata are
+            equivalent and w is either None or a shortest witness (a list of
+            integers) if they are not equivalent.
+        """
+
+        bounds = boundaries([self, dfa])
+        equivalent, witness = self.to_intervals(bounds) \
+            .equivalent_hopcroft_karp(dfa.to_intervals(bounds))
+        if witness is not None:
+            witness = [bounds[i] for i in witness]
+        return (equivalent, witness)
+
+def boundaries(dfas):
+
+    """Sorted boundaries of the ranges of range-labelled automata: the
+    integers lo and hi + 1 of every range (lo, hi) and the ends 0 and
+    RangeDFA.SYMBOLS of the alphabet. Consecutive boundaries delimit the
+    elementary intervals of the automata.
+
+    Args:
+        dfas : Iterable of RangeDFA instances.
+
+    Returns:
+        Sorted list of integers.
+    """
+
+    bounds = set([0, RangeDFA.SYMBOLS])
+    for dfa in dfas:
+        for q, lo, hi, r in dfa.iterate():
+            bounds.add(lo)
+            bounds.add(hi + 1)
+
+    return sorted(bounds)
+
+def _merge(labels):
+
+    """Ranges of sorted pairs (c, r) with consecutive c and equal r."""
+
+    ranges = []
+    for c, r in labels:
+        if ranges and ranges[-1][1] == c - 1 and ranges[-1][2] == r:
+            ranges[-1] = (ranges[-1][0], c, r)
+        else:
+            ranges.append((c, c, r))
+
+    return ranges
@@ -1,3 +1,11 @@
+import numpy as np
+from array import array
+from itertools import repeat
+from pyform.common.alphabet import sort_symbols
+from pyform.common.partition import ranges
+from pyform.common.partition import typed_array
+from pyform.common.partition import view
+
 class ValmariState(object):
 
     """Stores adjacent transitions and miscellaneous data for implementation
@@ -30,8 +38,10 @@ class ValmariState(object):
 
     def __init__(self, dfa):
 
+        transitions      = list(dfa.iterate())
+
         self.num_states  = len(dfa.states)
-        self.num_trans   = len(list(dfa.iterate()))
+        self.num_trans   = len(transitions)
         self.num_finals  = len(dfa.finals)
         self.num_reached = 0
 
@@ -43,8 +53,8 @@ class ValmariState(object):
         # transition function data structure
 
         self.tails, self.labels, self.heads = (
-            map(list, zip(*dfa.iterate()))
-            if dfa.delta
+            map(list, zip(*transitions))
+            if transitions
             else ([], [], [])
         )
 
@@ -148,6 +158,35 @@ class ValmariState(object):
         blocks.past[0]   = self.num_reached
         self.num_reached = 0
 
+    def refine(self, blocks, cords):
+
+        """Refine blocks and cords partitions until all blocks and cords are
+        compatible. Blocks are processed from index 1, so every block except
+        the first block of the initial partition splits the cords.
+
+        Args:
+            blocks : Partition instance (states).
+            cords  : Partition instance (transitions).
+        """
+
+        block = 1
+        cord  = 0
+
+        self.make_adjacent(forwards=False)
+
+        while cord < cords.size:
+            for i in range(cords.first[cord], cords.past[cord]):
+                blocks.mark(self.tails[cords.elements[i]])
+            blocks.split()
+            cord += 1
+            while block < blocks.size:
+                for i in range(blocks.first[block], blocks.past[block]):
+                    for j in range(self.offset[blocks.elements[i]],
+                                   self.offset[blocks.elements[i] + 1]):
+                        cords.mark(self.adjacent[j])
+                cords.split()
+                block += 1
+
     def iterate_offset(self, state):
 
         return range(self.offset[state], self.offset[state + 1])
@@ -156,5 +195,189 @@ class ValmariState(object):
 
         return map(self.adjacent.__getitem__, self.iterate_offset(state))
 
+class ArrayValmariState(ValmariState):
+
+    """Variant of ValmariState for the NumPy engine of Valmari's algorithm
+    (DFA.minimize_valmari with engine='numpy'). The adjacent transitions,
+    offsets, tails, heads and labels are stored in typed arrays of 64-bit
+    integers, and the counting sort, reachability analysis and removal of
+    unreachable transitions operate on NumPy views of these arrays. Labels
+    are symbol ids; the symbols are stored in symbols.
+
+    Unlike ValmariState, this class does not move reached states to the front
+    of the blocks partition. Instead, search returns the reached states and
+    restrict removes transitions, and the blocks partition is constructed
+    afterwards (see Partition.from_keys).
+
+    Attributes:
+        symbols : List mapping labels to symbols.
+    """
+
+    # frontiers (in search) and blocks and cords (in refine) smaller than
+    # these are processed without NumPy
+
+    FRONTIER = 64
+    BATCH    = 256
+
+    def __init__(self, dfa):
+
+        from pyform.automaton.compact import CompactDFA
+
+        self.num_states  = len(dfa.states)
+        self.num_finals  = len(dfa.finals)
+        self.num_reached = 0
+
+        if isinstance(dfa, CompactDFA):
+            self.symbols  = dfa.symbols
+            tails, labels = np.nonzero(dfa.table != dfa.SENTINEL)
+            heads         = dfa.table[tails, labels]
+        else:
+            self.symbols = sort_symbols(dfa.sigma)
+            index        = {a : i for i, a in enumerate(self.symbols)}
+            tails, labels, heads = array('q'), array('q'), array('q')
+            for q, m in dfa.delta.items():
+                tails.extend(repeat(q, len(m)))
+                labels.extend(map(index.__getitem__, m.keys()))
+                heads.extend(m.values())
+            tails, labels, heads = (
+                np.frombuffer(a, dtype=np.int64)
+                for a in (tails, labels, heads)
+            )
+
+        self.num_trans = len(tails)
+
+        self.tails,    self.tails_view    = typed_array(self.num_trans)
+        self.heads,    self.heads_view    = typed_array(self.num_trans)
+        self.labels,   self.labels_view   = typed_array(self.num_trans)
+        self.adjacent, self.adjacent_view = typed_array(self.num_trans)
+        self.offset,   self.offset_view   = typed_array(self.num_states + 1)
+
+        self.tails_view[:]  = tails
+        self.heads_view[:]  = heads
+        self.labels_view[:] = labels
+
+    def make_adjacent(self, forwards=True):
+
+        """Initialize adjacent transitions and sort with respect to their
+        tails or heads (see ValmariState.make_adjacent) using a stable
+        NumPy sort and cumulative counts.
+
+        Args:
+            forwards : Boolean indicating whether transitions are sorted
+                according to their tails (True) or heads (False).
+        """
+
+        trans = (self.tails_view if forwards else self.heads_view) \
+                [:self.num_trans]
+
+        self.adjacent_view[:self.num_trans] = np.argsort(trans, kind='stable')
+        self.offset_view[0]  = 0
+        self.offset_view[1:] = np.cumsum(
+            np.bincount(trans, minlength=self.num_states))
+
+    def search(self, roots, forwards=True):
+
+        """The states reachable from roots via transitions traversed forwards
+        or backwards, computed by breadth-first search. Each level of the
+        search is expanded with NumPy unless the frontier is small.
+
+        Args:
+            roots    : Array of states.
+            forwards : Boolean indicating whether the transition graph is
+                traversed forwards (True) or backwards (False).
+
+        Returns:
+            Boolean NumPy array indicating reached states.
+        """
+
+        self.make_adjacent(forwards)
+
+        heads   = self.heads if forwards else self.tails
+        view    = self.heads_view if forwards else self.tails_view
+        reached = np.zeros(self.num_states, dtype=bool)
+
+        frontier = np.unique(np.asarray(roots, dtype=np.int64))
+        reached[frontier] = True
+
+        while len(frontier):
+            if len(frontier) < self.FRONTIER:
+                adjacent, offset = self.adjacent, self.offset
+                targets = set(
+                    heads[adjacent[j]]
+                    for q in frontier.tolist()
+                    for j in range(offset[q], offset[q + 1])
+                )
+                targets = np.fromiter(targets, dtype=np.int64,
+                                      count=len(targets))
+            else:
+                indices = ranges(self.offset_view[frontier],
+                                 self.offset_view[frontier + 1])
+                targets = np.unique(view[self.adjacent_view[indices]])
+            frontier = targets[~reached[targets]]
+            reached[frontier] = True
+
+        return reached
+
+    def restrict(self, states):
+
+        """Remove transitions whose tail or head is not in states. This
+        method updates num_trans but does not change num_states.
+
+        Args:
+            states : Boolean NumPy array indicating states.
+        """
+
+        count = self.num_trans
+        keep  = states[self.tails_view[:count]] & \
+                states[self.heads_view[:count]]
+
+        self.num_trans = int(np.count_nonzero(keep))
+        for view in (self.tails_view, self.heads_view, self.labels_view):
+            view[:self.num_trans] = view[:count][keep]
+
+    def refine(self, blocks, cords):
+
+        """Refine blocks and cords partitions until all blocks and cords are
+        compatible (see ValmariState.refine). Blocks and cords with at least
+        BATCH elements are marked and split with vectorized operations
+        (Partition.mark_many and Partition.split_many). Both partitions must
+        have been constructed by Partition.from_keys.
+
+        Args:
+            blocks : Partition instance (states).
+            cords  : Partition instance (transitions).
+        """
+
+        block = 1
+        cord  = 0
+
+        self.make_adjacent(forwards=False)
+
+        states = view(blocks.elements)
+        trans  = view(cords.elements)
+
+        while cord < cords.size:
+            begin, end = cords.first[cord], cords.past[cord]
+            if end - begin < self.BATCH:
+                for i in range(begin, end):
+                    blocks.mark(self.tails[cords.elements[i]])
+                blocks.split()
+            else:
+                blocks.mark_many(self.tails_view[trans[begin:end]])
+                blocks.split_many()
+            cord += 1
+            while block < blocks.size:
+                begin, end = blocks.first[block], blocks.past[block]
+                if end - begin < self.BATCH:
+                    for i in range(begin, end):
+                        for j in range(self.offset[blocks.elements[i]],
+                                       self.offset[blocks.elements[i] + 1]):
+                            cords.mark(self.adjacent[j])
+                    cords.split()
+                else:
+                    heads = states[begin:end]
+                    cords.mark_many(self.adjacent_view[ranges(
+                        self.offset_view[heads], self.offset_view[heads + 1])])
+                    cords.split_many()
+                block += 1
 
-        
@@ -0,0 +1,241 @@
+import numpy as np
+from pyform.automaton.dfa import DFA
+from pyform.automaton.nfa import NFA
+
+def random_dfa(num_states, symbols, density=1.0, final_ratio=0.5, seed=0):
+
+    """Uniform random DFA with states range(num_states) and start state 0.
+    Each transition is defined with probability density and leads to a
+    uniformly random state, and each state is final with probability
+    final_ratio. States without outgoing transitions are undefined in delta.
+
+    Args:
+        num_states  : Number of states.
+        symbols     : Number of symbols (the alphabet is range(symbols)) or
+            iterable of symbols.
+        density     : Probability that a transition is defined.
+        final_ratio : Probability that a state is final.
+        seed        : Seed of the random number generator.
+
+    Returns:
+        DFA instance.
+    """
+
+    rng     = np.random.default_rng(seed)
+    symbols = _symbols(symbols)
+    shape   = (num_states, len(symbols))
+    targets = rng.integers(num_states, size=shape).tolist()
+    finals  = np.flatnonzero(rng.random(num_states) < final_ratio).tolist()
+
+    if density >= 1.0:
+        delta = {q : dict(zip(symbols, row)) for q, row in enumerate(targets)}
+    else:
+        present = (rng.random(shape) < density).tolist()
+        delta   = {}
+        for q, (row, mask) in enumerate(zip(targets, present)):
+            row = {a : r for a, r, p in zip(symbols, row, mask) if p}
+            if row:
+                delta[q] = row
+
+    return DFA(
+        states = set(range(num_states)),
+        finals = set(finals),
+        start  = 0,
+        sigma  = set(symbols),
+        delta  = delta
+    )
+
+def random_nfa(num_states, symbols, density=0.1, final_ratio=0.5, seed=0):
+
+    """Uniform random NFA with states range(num_states), start state 0 and
+    no epsilon transitions. Each transition (q, a, r) exists with probability
+    density, and each state is final with probability final_ratio.
+
+    Args:
+        num_states  : Number of states.
+        symbols     : Number of symbols or iterable of symbols.
+        density     : Probability that a transition exists.
+        final_ratio : Probability that a state is final.
+        seed        : Seed of the random number generator.
+
+    Returns:
+        NFA instance.
+    """
+
+    rng     = np.random.default_rng(seed)
+    symbols = _symbols(symbols)
+    present = rng.random((num_states, len(symbols), num_states)) < density
+    finals  = np.flatnonzero(rng.random(num_states) < final_ratio).tolist()
+
+    delta = {}
+    for q, a, r in zip(*np.nonzero(present)):
+        row = delta.setdefault(int(q), {})
+        row.setdefault(symbols[a], set()).add(int(r))
+
+    return NFA(
+        states = set(range(num_states)),
+        finals = set(finals),
+        start  = 0,
+        sigma  = set(symbols),
+        delta  = delta
+    )
+
+def nth_from_end(n, sigma='ab'):
+
+    """NFA accepting the words over sigma whose n-th symbol from the end is
+    sigma[0]. It has n + 1 states, but its minimal DFA has 2 ** n states, so
+    it is the standard worst case of the subset construction.
+
+    Args:
+        n     : Positive integer.
+        sigma : Sequence of at least two symbols.
+
+    Returns:
+        NFA instance with states range(n + 1).
+    """
+
+    delta = {0 : {a : set([0]) for a in sigma}}
+    delta[0][sigma[0]].add(1)
+    for q in range(1, n):
+        delta[q] = {a : set([q + 1]) for a in sigma}
+
+    return NFA(
+        states = set(range(n + 1)),
+        finals = set([n]),
+        start  = 0,
+        sigma  = set(sigma),
+        delta  = delta
+    )
+
+def random_complete(num_states, symbols, seed=0):
+
+    """Uniform random complete DFA (see random_dfa)."""
+
+    return random_dfa(num_states, symbols, seed=seed)
+
+def random_partial(num_states, symbols, density=0.5, seed=0):
+
+    """Uniform random partial DFA (see random_dfa)."""
+
+    return random_dfa(num_states, symbols, density=density, seed=seed)
+
+def random_minimal(num_states, symbols, seed=0):
+
+    """Minimal DFA of a uniform random complete DFA. Almost all states of
+    random complete DFAs are reachable and pairwise distinguishable, so the
+    result has close to (but at most) num_states states.
+
+    Args:
+        num_states : Number of states of the random DFA.
+        symbols    : Number of symbols or iterable of symbols.
+        seed       : Seed of the random number generator.
+
+    Returns:
+        Minimal DFA instance with states range(n).
+    """
+
+    return random_complete(num_states, symbols, seed).minimize_valmari()
+
+def chain(num_states, symbols=1):
+
+    """DFA accepting the single word of length num_states - 1 over symbol 0
+    (a path of num_states states). Refinement needs num_states - 1 rounds of
+    Moore's algorithm to separate its states, and every other symbol of the
+    alphabet is undefined everywhere.
+
+    Args:
+        num_states : Number of states.
+        symbols    : Number of symbols or iterable of symbols.
+
+    Returns:
+        DFA instance with states range(num_states).
+    """
+
+    symbols = _symbols(symbols)
+    return DFA(
+        states = set(range(num_states)),
+        finals = set([num_states - 1]),
+        start  = 0,
+        sigma  = set(symbols),
+        delta  = {q : {symbols[0] : q + 1} for q in range(num_states - 1)}
+    )
+
+def de_bruijn(num_states):
+
+    """Unary cycle whose final states are given by a binary de Bruijn
+    sequence of order k, where 2 ** k is the largest power of two not
+    exceeding num_states. These automata are minimal and are worst cases of
+    Hopcroft's algorithm, which needs Theta(n log n) time on them whatever
+    order it processes its worklist in [1]. They are also hard cases for
+    Valmari's algorithm, which splits blocks on every round.
+
+    [1] Berstel, Jean and Carton, Olivier. 2004. On the complexity of
+    Hopcroft's state minimization algorithm. CIAA 2004. 35-44.
+
+    Args:
+        num_states : Upper bound on the number of states.
+
+    Returns:
+        DFA instance with states range(2 ** k) over the alphabet {0}.
+    """
+
+    order = max(1, num_states.bit_length() - 1)
+    size  = 1 << order
+
+    # de Bruijn sequence by the prefer-one greedy construction
+
+    seen = set([0])
+    bits = [0] * order
+    node = 0
+    mask = size - 1
+    while len(bits) < size + order - 1:
+        for bit in (1, 0):
+            child = ((node << 1) | bit) & mask
+            if child not in seen:
+                seen.add(child)
+                bits.append(bit)
+                node = child
+                break
+        else:
+            break
+
+    return DFA(
+        states = set(range(size)),
+        finals = set(q for q in range(size) if bits[q]),
+        start  = 0,
+        sigma  = set([0]),
+        delta  = {q : {0 : (q + 1) % size} for q in range(size)}
+    )
+
+def permuted(dfa, seed=0):
+
+    """Isomorphic copy of a DFA with states range(n) under a random
+    permutation of its states.
+
+    Args:
+        dfa  : DFA instance with states range(n).
+        seed : Seed of the random number generator.
+
+    Returns:
+        DFA instance.
+    """
+
+    rng = np.random.default_rng(seed)
+    ids = rng.permutation(len(dfa.states)).tolist()
+
+    return DFA(
+        states = set(ids),
+        finals = set(ids[q] for q in dfa.finals),
+        start  = ids[dfa.start],
+        sigma  = set(dfa.sigma),
+        delta  = {
+            ids[q] : {a : ids[r] for a, r in row.items()}
+            for q, row in dfa.delta.items()
+        }
+    )
+
+def _symbols(symbols):
+
+    if isinstance(symbols, int):
+        return list(range(symbols))
+    return list(symbols)
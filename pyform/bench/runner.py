@@ -0,0 +1,249 @@
+"""Benchmark runner for the core algorithms of pyform.
+
+Runs every operation on automata from every generator at every size and
+writes the timings as JSON, so that results can be compared between
+commits:
+
+    python -m pyform.bench.runner --output before.json
+    python -m pyform.bench.runner --output after.json --compare before.json
+
+Operations that raise are recorded with their error rather than aborting
+the run.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+from pyform.bench import generators
+
+SIZES   = (10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+SYMBOLS = 2
+
+# generators of the benchmarked automata, called with (num_states, symbols)
+
+GENERATORS = {
+    'complete'  : generators.random_complete,
+    'partial'   : generators.random_partial,
+    'minimal'   : generators.random_minimal,
+    'chain'     : generators.chain,
+    'de_bruijn' : lambda num_states, symbols: generators.de_bruijn(num_states),
+}
+
+# operations as pairs (setup, operation): setup(dfa) returns the arguments
+# of operation, so only operation is timed
+
+OPERATIONS = {
+    'minimize_valmari' : (
+        lambda dfa: (dfa,),
+        lambda dfa: dfa.minimize_valmari()
+    ),
+    'equivalent_hopcroft_karp' : (
+        lambda dfa: (dfa, dfa.minimize_valmari()),
+        lambda dfa, minimal: dfa.equivalent_hopcroft_karp(minimal)
+    ),
+    'product' : (
+        lambda dfa: (dfa, dfa.minimize_valmari()),
+        lambda dfa, minimal: dfa.product(minimal, lambda a, b: a and not b)
+    ),
+    'isomorphic' : (
+        lambda dfa: (dfa, generators.permuted(dfa, seed=1)),
+        lambda dfa, copy: dfa.isomorphic(copy)
+    ),
+    'reachable' : (
+        lambda dfa: (dfa,),
+        lambda dfa: dfa.reachable([dfa.start], dfa.sigma)
+    ),
+    'productive' : (
+        lambda dfa: (dfa,),
+        lambda dfa: dfa.productive(dfa.finals, dfa.sigma)
+    ),
+}
+
+def timed(f):
+
+    """Call f once and measure its running time.
+
+    Args:
+        f : Function without arguments.
+
+    Returns:
+        (result, seconds) where result is the value returned by f.
+    """
+
+    begin  = time.perf_counter()
+    result = f()
+    return result, time.perf_counter() - begin
+
+def measure(operation, args, repeat):
+
+    """Best time of repeat calls of operation on args.
+
+    Args:
+        operation : Function.
+        args      : Tuple of arguments.
+        repeat    : Number of calls.
+
+    Returns:
+        (seconds, error) where error is None or the message of the exception
+        raised by operation.
+    """
+
+    best = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        try:
+            operation(*args)
+        except Exception as e:
+            return None, '%s: %s' % (type(e).__name__, e)
+        elapsed = time.perf_counter() - begin
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, None
+
+def run(sizes=SIZES, symbols=SYMBOLS, generators=None, operations=None,
+        repeat=3, log=None):
+
+    """Run benchmarks.
+
+    Args:
+        sizes      : Iterable of numbers of states.
+        symbols    : Number of symbols.
+        generators : Iterable of names of GENERATORS or None (all).
+        operations : Iterable of names of OPERATIONS or None (all).
+        repeat     : Number of timed calls per benchmark (the best counts).
+        log        : Function called with each result, or None.
+
+    Returns:
+        List of results as dictionaries with the keys generator, states (as
+        requested), actual (states of the generated automaton), symbols,
+        operation, seconds and error.
+    """
+
+    results = []
+    for size in sizes:
+        for name in generators or GENERATORS:
+            dfa = GENERATORS[name](size, symbols)
+            for operation in operations or OPERATIONS:
+                setup, f = OPERATIONS[operation]
+                seconds, error = measure(f, setup(dfa), repeat)
+                result = {
+                    'generator' : name,
+                    'states'    : size,
+                    'actual'    : len(dfa.states),
+                    'symbols'   : symbols,
+                    'operation' : operation,
+                    'seconds'   : seconds,
+                    'error'     : error,
+                }
+                results.append(result)
+                if log is not None:
+                    log(result)
+
+    return results
+
+def environment():
+
+    """Description of the environment of a run (versions, machine and the
+    current git commit if available).
+
+    Returns:
+        Dictionary.
+    """
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit'  : commit,
+        'python'  : platform.python_version(),
+        'numpy'   : np.__version__,
+        'machine' : platform.machine(),
+        'time'    : time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+def compare(baseline, results):
+
+    """Ratios of the times of results to the times of matching baseline
+    results (greater than one means slower).
+
+    Args:
+        baseline : List of results (see run).
+        results  : List of results (see run).
+
+    Returns:
+        List of pairs (result, ratio) where ratio is None if either time is
+        missing.
+    """
+
+    def key(result):
+
+        return (result['generator'], result['states'], result['symbols'],
+                result['operation'])
+
+    times = {key(result) : result['seconds'] for result in baseline}
+    pairs = []
+    for result in results:
+        before = times.get(key(result))
+        after  = result['seconds']
+        ratio  = after / before if before and after is not None else None
+        pairs.append((result, ratio))
+
+    return pairs
+
+def describe(result, outcome=None):
+
+    if outcome is None and result['error'] is not None:
+        outcome = 'error: ' + result['error']
+    elif outcome is None:
+        outcome = '%11.6fs' % result['seconds']
+    return '%-10s %8d %8d %-26s %s' % (
+        result['generator'], result['actual'], result['symbols'],
+        result['operation'], outcome)
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=lambda s: [int(float(x)) for x in
+                        s.split(',')], default=list(SIZES))
+    parser.add_argument('--symbols', type=int, default=SYMBOLS)
+    parser.add_argument('--generators', type=lambda s: s.split(','))
+    parser.add_argument('--operations', type=lambda s: s.split(','))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='path of JSON results')
+    parser.add_argument('--compare', help='path of JSON baseline results')
+    args = parser.parse_args(argv)
+
+    for names, known in ((args.generators, GENERATORS),
+                         (args.operations, OPERATIONS)):
+        for name in names or ():
+            if name not in known:
+                parser.error('unknown name: %r' % (name,))
+
+    results = run(args.sizes, args.symbols, args.generators, args.operations,
+                  args.repeat, log=lambda result: print(describe(result)))
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({'environment' : environment(), 'results' : results},
+                      f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        print()
+        for result, ratio in compare(baseline, results):
+            print(describe(result, '%11.2fx' % ratio if ratio is not None
+                                   else '%12s' % '-'))
+
+if __name__ == '__main__':
+
+    main(sys.argv[1:])
@@ -0,0 +1,70 @@
+from pyform.common.partition import Partition
+
+def sort_symbols(sigma):
+
+    """Sort symbols in a deterministic order. Symbols are sorted by their
+    natural order if they are mutually comparable and by their type names and
+    representations otherwise.
+
+    Args:
+        sigma : Iterable of hashable objects.
+
+    Returns:
+        List of symbols in sigma in deterministic order.
+    """
+
+    symbols = list(sigma)
+
+    try:
+        return sorted(symbols)
+    except TypeError:
+        return sorted(symbols, key=lambda a: (type(a).__name__, repr(a)))
+
+def symbol_classes(dfas):
+
+    """Coarsest partition of the union of the alphabets of dfas into classes
+    of symbols that act identically in every state: symbols a and b belong
+    to the same class iff delta[q].get(a) == delta[q].get(b) for every state
+    q of every automaton. A Partition of the symbols is split once per group
+    of transitions of a state with the same target, so the classes are
+    computed in O(S + M log S) time for S symbols and M transitions. Classes
+    are numbered in order of their smallest symbols (see sort_symbols).
+
+    Args:
+        dfas : Iterable of DFA instances.
+
+    Returns:
+        (r, c) where r is a list mapping class ids to their smallest symbols
+        (the representatives of the classes) and c is a dictionary mapping
+        symbols to class ids.
+    """
+
+    dfas    = list(dfas)
+    symbols = sort_symbols(set().union(*(dfa.sigma for dfa in dfas)))
+    index   = {a : i for i, a in enumerate(symbols)}
+    blocks  = Partition(len(symbols))
+
+    for dfa in dfas:
+        for row in dfa.delta.values():
+            groups = {}
+            for a, r in row.items():
+                if r not in groups:
+                    groups[r] = []
+                groups[r].append(index[a])
+
+            # a row with a single target on every symbol splits nothing
+
+            if len(groups) == 1 and len(row) == len(symbols):
+                continue
+            for group in groups.values():
+                for i in group:
+                    blocks.mark(i)
+                blocks.split()
+
+    smallest = sorted(min(blocks.partition(i)) for i in range(blocks.size))
+    ids      = {blocks.setof[i] : c for c, i in enumerate(smallest)}
+
+    return (
+        [symbols[i] for i in smallest],
+        {a : ids[blocks.setof[i]] for i, a in enumerate(symbols)}
+    )
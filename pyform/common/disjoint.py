@@ -1,3 +1,6 @@
+import numpy as np
+from pyform.common.partition import typed_array
+
 class DisjointSet(object):
 
     """Disjoint-set data structure.
@@ -122,3 +125,189 @@ class DisjointSet(object):
             partition[equiv].add(element)
 
         return partition
+
+class IntDisjointSet(object):
+
+    """Disjoint-set data structure over the integers range(n).
+
+    Variant of DisjointSet whose elements are the integers range(n), all of
+    which are created by init. Parents and ranks are stored in typed arrays
+    of 64-bit integers (see typed_array) rather than dictionaries, find uses
+    path halving and union uses union-by-rank. The bulk operations find_many
+    and union_many operate on NumPy views of the same arrays.
+
+    Attributes:
+        rank      : Array mapping elements to ranks.
+        parent    : Array mapping elements to parents.
+        num_elems : Number of elements in partition.
+        num_equiv : Number of equivalence classes in partition.
+    """
+
+    def __init__(self, n):
+
+        self.rank,   self.rank_view   = typed_array(n)
+        self.parent, self.parent_view = typed_array(n)
+
+        self.parent_view[:] = np.arange(n)
+
+        self.num_elems = n
+        self.num_equiv = n
+
+    def find(self, i):
+
+        """Return representative of equivalence class to which i belongs.
+        Implemented using the path halving algorithm.
+
+        Args:
+            i : Integer in range(n).
+
+        Returns:
+            Representative of equivalence class to which i belongs.
+        """
+
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = i = parent[parent[i]]
+
+        return i
+
+    def union(self, i, j):
+
+        """Merge equivalence classes to which i and j belong (see
+        DisjointSet.union).
+
+        Args:
+            i : Integer in range(n).
+            j : Integer in range(n).
+
+        Returns:
+            Representative of merged equivalence class.
+        """
+
+        iroot = self.find(i)
+        jroot = self.find(j)
+
+        if iroot == jroot:
+            return iroot
+
+        rank = self.rank
+        if rank[iroot] < rank[jroot]:
+            iroot, jroot = jroot, iroot
+
+        self.parent[jroot] = iroot
+        self.num_equiv -= 1
+
+        if rank[iroot] == rank[jroot]:
+            rank[iroot] += 1
+
+        return iroot
+
+    def find_many(self, items):
+
+        """Return representatives of the equivalence classes to which items
+        belong, computed by vectorized pointer jumping. The parents of items
+        are set to their representatives.
+
+        Args:
+            items : Iterable or NumPy array of integers in range(n).
+
+        Returns:
+            NumPy array of representatives.
+        """
+
+        items  = np.asarray(items, dtype=np.int64)
+        parent = self.parent_view
+        roots  = parent[items]
+
+        while True:
+            grand = parent[roots]
+            if np.array_equal(grand, roots):
+                break
+            roots = grand
+
+        parent[items] = roots
+        return roots
+
+    def union_many(self, pairs):
+
+        """Merge the equivalence classes of the elements of each pair. The
+        pairs are processed in rounds: each round finds the representatives
+        of the remaining pairs (see find_many) and links every representative
+        to the smallest representative it is paired with, until every pair
+        belongs to one class. Since representatives are only linked to
+        smaller ones no cycles arise; ranks are updated to remain upper
+        bounds of the heights of the trees.
+
+        Linking ignores ranks, so a round can build long paths (pairs (i, i
+        + 1) link i + 1 to i for every i), which find_many walks one step per
+        pass. After a round that links at least sqrt(n) representatives the
+        whole parent array is therefore compressed by pointer jumping (see
+        compress), which takes O(n log h) time for trees of height h and is
+        within the cost of walking paths of that many links.
+
+        Args:
+            pairs : Iterable of pairs or NumPy array of shape (k, 2) of
+                integers in range(n).
+
+        Returns:
+            The number of merged equivalence classes.
+        """
+
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        left  = pairs[:, 0]
+        right = pairs[:, 1]
+        count = self.num_equiv
+
+        while len(left):
+            iroots = self.find_many(left)
+            jroots = self.find_many(right)
+            apart  = iroots != jroots
+            if not apart.any():
+                break
+
+            left, right = left[apart], right[apart]
+            lower = np.minimum(iroots[apart], jroots[apart])
+            upper = np.maximum(iroots[apart], jroots[apart])
+
+            np.minimum.at(self.parent_view, upper, lower)
+            np.maximum.at(self.rank_view, lower, self.rank_view[upper] + 1)
+            linked = len(np.unique(upper))
+            self.num_equiv -= linked
+
+            if linked * linked >= self.num_elems:
+                self.compress()
+
+        return count - self.num_equiv
+
+    def compress(self):
+
+        """Set the parent of every element to its representative by
+        vectorized pointer jumping over the whole parent array, which halves
+        the height of every tree per pass.
+        """
+
+        parent = self.parent_view
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent[:] = grand
+
+    def partition(self):
+
+        """Return dictionary mapping representatives of equivalence classes to
+        equivalence classes (see DisjointSet.partition).
+
+        Returns:
+            Dictionary mapping representatives of equivalence classes to
+            equivalence classes.
+        """
+
+        partition = {}
+        roots     = self.find_many(np.arange(self.num_elems)).tolist()
+        for element, equiv in enumerate(roots):
+            if equiv not in partition:
+                partition[equiv] = set()
+            partition[equiv].add(element)
+
+        return partition
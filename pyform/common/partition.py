@@ -1,3 +1,6 @@
+import numpy as np
+from array import array
+
 class Partition(object):
 
     """Partition refinement data structure.
@@ -20,6 +23,15 @@ class Partition(object):
     of elements and the initial partitions are determined by f. For example,
     the function lambda e: e % 2 == 0 partitions the elements by their parity.
 
+    The arrays are typed arrays of 32-bit integers (64-bit integers if count
+    exceeds their range, see typecode), so that a partition of count
+    elements takes about 28 * count bytes, and instances have no attribute
+    dictionaries. The marked and touched arrays are only used between calls
+    of mark and split and are empty afterwards. They may therefore be shared
+    by partitions that are never marked at the same time, such as the blocks
+    and cords partitions of Valmari's algorithm, by passing the same buffers
+    (see shared_buffers) to their constructors.
+
     Attributes:
         size        : Number of equivalence classes in partition.
         elements    : Array of elements in partition.
@@ -31,18 +43,24 @@ class Partition(object):
         touched     : Equivalence classese with marked elements.
         num_touched : Number of equivalence classes with marked elements.
     """
-    
-    def __init__(self, count, key=None):
-
-        self.elements    = list(range(count))
-        self.location    = list(range(count))
-        self.first       = [0] * count
-        self.past        = [0] * count
-        self.setof       = [0] * count        
-        self.marked      = [0] * count + [0]
-        self.touched     = [0] * count + [0]
+
+    __slots__ = ('size', 'elements', 'location', 'setof', 'first', 'past',
+                 'marked', 'touched', 'num_touched')
+
+    def __init__(self, count, key=None, buffers=None):
+
+        code = typecode(count)
+
+        self.elements    = array(code, range(count))
+        self.location    = array(code, range(count))
+        self.first       = typed_array(count, code)[0]
+        self.past        = typed_array(count, code)[0]
+        self.setof       = typed_array(count, code)[0]
         self.num_touched = 0
 
+        self.marked, self.touched = \
+            shared_buffers(count) if buffers is None else buffers
+
         # return singleton partition if count == 0 or key == None
 
         if not (count and key):
@@ -53,8 +71,8 @@ class Partition(object):
 
         # otherwise partition elements by key
         
-        self.size = 0
-        self.elements.sort(key=key)
+        self.size     = 0
+        self.elements = array(code, sorted(self.elements, key=key))
 
         partition = key(self.elements[0])
         for i in range(count):
@@ -71,6 +89,60 @@ class Partition(object):
         self.past[self.size] = count
         self.size += 1
 
+    @classmethod
+    def from_keys(cls, keys, buffers=None):
+
+        """Construct partition of range(len(keys)) by integer keys using
+        vectorized sorting. Elements with equal nonnegative keys belong to the
+        same equivalence class and classes are numbered in increasing order of
+        their keys. Elements with negative keys are stored after every class
+        and belong to none (their setof entries are 0). The typed arrays of
+        the result support zero-copy NumPy views (see view).
+
+        Args:
+            keys    : NumPy array of integers.
+            buffers : Pair of marked and touched arrays or None (see
+                shared_buffers).
+
+        Returns:
+            Partition instance.
+        """
+
+        keys  = np.asarray(keys, dtype=np.int64)
+        count = len(keys)
+        valid = int(np.count_nonzero(keys >= 0))
+        order = np.argsort(np.where(keys < 0, np.iinfo(np.int64).max, keys),
+                           kind='stable')
+
+        bounds = np.flatnonzero(np.diff(keys[order[:valid]])) + 1
+        size   = len(bounds) + 1 if valid else 0
+
+        code      = typecode(count)
+        partition = cls.__new__(cls)
+        partition.size        = size
+        partition.num_touched = 0
+
+        partition.elements, elements = typed_array(count, code)
+        partition.location, location = typed_array(count, code)
+        partition.setof,    setof    = typed_array(count, code)
+        partition.first,    first    = typed_array(count, code)
+        partition.past,     past     = typed_array(count, code)
+
+        partition.marked, partition.touched = \
+            shared_buffers(count) if buffers is None else buffers
+
+        elements[:]     = order
+        location[order] = np.arange(count)
+
+        if size:
+            first[1:size]        = bounds
+            past[:size - 1]      = bounds
+            past[size - 1]       = valid
+            setof[order[:valid]] = np.repeat(np.arange(size),
+                                             past[:size] - first[:size])
+
+        return partition
+
     def mark(self, element):
 
         """Mark element for splitting in partition.
@@ -145,6 +217,118 @@ class Partition(object):
             self.marked[self.size] = 0
             self.size += 1
 
+    def mark_many(self, elements):
+
+        """Mark elements for splitting in partition (see mark) using
+        vectorized swaps. The partition must have been constructed by
+        from_keys. Each marked element is moved to the first unmarked location
+        of its class, so the running time is proportional to the number of
+        elements and independent of the sizes of their classes.
+
+        Args:
+            elements : NumPy array of integers in partition.
+        """
+
+        location = view(self.location)
+        items    = view(self.elements)
+        setof    = view(self.setof)
+        first    = view(self.first)
+        marked   = view(self.marked)
+        touched  = view(self.touched)
+
+        # discard marked elements and group remaining elements by class
+
+        elements = np.unique(elements)
+        unmarked = first[setof[elements]] + marked[setof[elements]]
+        elements = elements[location[elements] >= unmarked]
+        elements = elements[np.argsort(setof[elements], kind='stable')]
+        if not len(elements):
+            return
+
+        equivs   = setof[elements]
+        index    = location[elements]
+        classes, starts, counts = np.unique(
+            equivs, return_index=True, return_counts=True)
+        unmarked = first[equivs] + marked[equivs]
+
+        # elements already within the locations to be marked stay in place;
+        # the others are swapped with the unmarked elements occupying the
+        # remaining locations, matched by class
+
+        slots    = unmarked + np.arange(len(elements)) - \
+                   np.repeat(starts, counts)
+        inplace  = index < unmarked + np.repeat(counts, counts)
+        occupied = np.zeros(len(elements), dtype=bool)
+        occupied[(np.repeat(starts, counts) + index - unmarked)[inplace]] = \
+            True
+
+        source   = index[~inplace]
+        target   = slots[~occupied]
+        moving   = items[source]
+        staying  = items[target]
+
+        items[target]     = moving
+        items[source]     = staying
+        location[moving]  = target
+        location[staying] = source
+
+        # update marked counts and touched classes
+
+        fresh = classes[marked[classes] == 0]
+        touched[self.num_touched:self.num_touched + len(fresh)] = fresh
+        self.num_touched += len(fresh)
+        marked[classes] += counts
+
+    def split_many(self):
+
+        """Split equivalence classes containing marked elements (see split)
+        using vectorized updates. The partition must have been constructed by
+        from_keys. New classes are numbered in the order in which the touched
+        classes were marked.
+
+        Returns:
+            The number of new equivalence classes.
+        """
+
+        items    = view(self.elements)
+        setof    = view(self.setof)
+        first    = view(self.first)
+        past     = view(self.past)
+        marked   = view(self.marked)
+        touched  = view(self.touched)
+
+        equivs   = touched[:self.num_touched].copy()
+        self.num_touched = 0
+
+        unmarked = first[equivs] + marked[equivs]
+        marked[equivs] = 0
+
+        # continue with classes in which some element is unmarked
+
+        partial  = unmarked < past[equivs]
+        equivs   = equivs[partial]
+        unmarked = unmarked[partial]
+        if not len(equivs):
+            return 0
+
+        # assign smaller half new class
+
+        lower = unmarked - first[equivs] <= past[equivs] - unmarked
+        fresh = self.size + np.arange(len(equivs))
+
+        first[fresh] = np.where(lower, first[equivs], unmarked)
+        past[fresh]  = np.where(lower, unmarked, past[equivs])
+        first[equivs[lower]] = unmarked[lower]
+        past[equivs[~lower]] = unmarked[~lower]
+        marked[fresh] = 0
+
+        lengths = past[fresh] - first[fresh]
+        setof[items[ranges(first[fresh], past[fresh])]] = \
+            np.repeat(fresh, lengths)
+
+        self.size += len(equivs)
+        return len(equivs)
+
     def partition(self, equiv):
 
         return self.elements[self.first[equiv]:self.past[equiv]]
@@ -154,3 +338,81 @@ class Partition(object):
         return (self.partition(i) for i in range(self.size))
 
 
+
+def typed_array(count, code='q'):
+
+    """Typed array of count integers initialized to zero and a writable
+    NumPy view of the same memory.
+
+    Args:
+        count : Number of elements.
+        code  : Typecode of the array ('i' or 'q', see typecode).
+
+    Returns:
+        (a, v) where a is an array.array and v a NumPy array.
+    """
+
+    data = array(code, bytes(array(code).itemsize * count))
+    return data, view(data)
+
+def typecode(count):
+
+    """Typecode of the typed arrays of a partition of count elements: 'i'
+    (32-bit integers) if the integers up to count fit and 'q' (64-bit
+    integers) otherwise.
+
+    Args:
+        count : Number of elements.
+
+    Returns:
+        String 'i' or 'q'.
+    """
+
+    return 'i' if count < 2 ** 31 - 1 else 'q'
+
+def view(data):
+
+    """Writable NumPy view of a typed array with the dtype of its typecode.
+
+    Args:
+        data : array.array of integers.
+
+    Returns:
+        NumPy array.
+    """
+
+    return np.frombuffer(data, dtype=data.typecode)
+
+def shared_buffers(count):
+
+    """Marked and touched arrays for partitions of at most count elements.
+    Partitions constructed with the same buffers must not be marked at the
+    same time (see Partition).
+
+    Args:
+        count : Largest number of elements.
+
+    Returns:
+        (marked, touched) where marked and touched are typed arrays.
+    """
+
+    code = typecode(count)
+    return typed_array(count + 1, code)[0], typed_array(count + 1, code)[0]
+
+def ranges(begin, end):
+
+    """Concatenation of the ranges range(begin[i], end[i]) for arrays begin
+    and end, computed without a Python loop.
+
+    Args:
+        begin : NumPy array of integers.
+        end   : NumPy array of integers (end >= begin).
+
+    Returns:
+        NumPy array of integers.
+    """
+
+    counts = end - begin
+    total  = int(counts.sum())
+    starts = np.repeat(begin - np.cumsum(counts) + counts, counts)
+    return starts + np.arange(total)
@@ -0,0 +1,235 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextlib import nullcontext
+from pyform.common.disjoint import IntDisjointSet
+from pyform.common.partition import Partition
+
+class Stats(object):
+
+    """Statistics of an algorithm run (see DFA.minimize_valmari and
+    DFA.equivalent_hopcroft_karp). Algorithms fill in an instance passed as
+    their stats argument and call finish once they return, which passes the
+    instance to callback. If the same instance is passed to several runs the
+    times and counts are summed and the peaks are maximized.
+
+    Counters and peaks are recorded by the counting variants of the data
+    structures of the algorithms (CountingPartition, CountingIntDisjointSet
+    and CountingQueue), which are only constructed when statistics are
+    requested, so that runs without statistics execute the same code as
+    before.
+
+    Attributes:
+        phases   : Dictionary mapping phase names to seconds.
+        counters : Dictionary mapping counter names to counts.
+        peaks    : Dictionary mapping names of arrays and queues to their
+            largest sizes.
+        callback : Function called with the instance by finish, or None.
+    """
+
+    def __init__(self, callback=None):
+
+        self.phases   = {}
+        self.counters = {}
+        self.peaks    = {}
+        self.callback = callback
+
+    @contextmanager
+    def phase(self, name):
+
+        """Context manager adding the time spent in its body to phase name.
+
+        Args:
+            name : String.
+        """
+
+        begin = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - begin
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def count(self, name, n=1):
+
+        """Add n to counter name.
+
+        Args:
+            name : String.
+            n    : Integer.
+        """
+
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def peak(self, name, size):
+
+        """Record size as a size of name (only the largest is kept).
+
+        Args:
+            name : String.
+            size : Integer.
+        """
+
+        if size > self.peaks.get(name, -1):
+            self.peaks[name] = size
+
+    def finish(self):
+
+        """Pass the instance to callback if it is not None."""
+
+        if self.callback is not None:
+            self.callback(self)
+
+    def as_dict(self):
+
+        """Return the phases, counters and peaks as a dictionary of copies
+        (suitable for JSON).
+
+        Returns:
+            Dictionary with the keys phases, counters and peaks.
+        """
+
+        return {
+            'phases'   : dict(self.phases),
+            'counters' : dict(self.counters),
+            'peaks'    : dict(self.peaks),
+        }
+
+    def __repr__(self):
+
+        return 'Stats(phases=%r, counters=%r, peaks=%r)' % (
+            self.phases, self.counters, self.peaks)
+
+def phases(stats):
+
+    """Phase context manager factory of stats, or a factory of reusable
+    null contexts if stats is None.
+
+    Args:
+        stats : Stats instance or None.
+
+    Returns:
+        Function of phase names returning context managers.
+    """
+
+    if stats is None:
+        return _skip
+    return stats.phase
+
+_NULL = nullcontext()
+
+def _skip(name):
+
+    return _NULL
+
+class CountingPartition(Partition):
+
+    """Partition that counts calls of mark and splits in a Stats instance.
+    The counters are named <name>_marks and <name>_splits, and the length of
+    the arrays of the partition is recorded as the peak <name>. Construct
+    instances with Partition's constructors and call attach.
+
+    Attributes:
+        stats : Stats instance.
+        name  : Prefix of the counter names.
+    """
+
+    def attach(self, stats, name):
+
+        """Attach stats under name to the partition and record its size.
+
+        Args:
+            stats : Stats instance.
+            name  : String.
+
+        Returns:
+            The partition.
+        """
+
+        self.stats = stats
+        self.name  = name
+        stats.peak(name, len(self.elements))
+        return self
+
+    def mark(self, element):
+
+        self.stats.count(self.name + '_marks')
+        Partition.mark(self, element)
+
+    def split(self):
+
+        size = self.size
+        Partition.split(self)
+        self.stats.count(self.name + '_splits', self.size - size)
+
+    def mark_many(self, elements):
+
+        self.stats.count(self.name + '_marks', len(elements))
+        Partition.mark_many(self, elements)
+
+    def split_many(self):
+
+        size = self.size
+        Partition.split_many(self)
+        self.stats.count(self.name + '_splits', self.size - size)
+
+class DisjointSetCounter(object):
+
+    """Mixin of disjoint sets that counts calls of find and union in a Stats
+    instance (the counters finds and unions; the finds include the two calls
+    made by each union) and records the number of elements as the peak
+    disjoint_set when finish is called.
+
+    Attributes:
+        stats : Stats instance.
+    """
+
+    def __init__(self, stats, *args):
+
+        self.stats = stats
+        super().__init__(*args)
+
+    def find(self, i):
+
+        self.stats.count('finds')
+        return super().find(i)
+
+    def union(self, i, j):
+
+        self.stats.count('unions')
+        return super().union(i, j)
+
+    def finish(self):
+
+        """Record the number of elements of the disjoint set."""
+
+        self.stats.peak('disjoint_set', self.num_elems)
+
+class CountingIntDisjointSet(DisjointSetCounter, IntDisjointSet):
+
+    """IntDisjointSet counting its operations (see DisjointSetCounter)."""
+
+class CountingQueue(deque):
+
+    """Deque that records its largest length as the peak queue of a Stats
+    instance and counts calls of popleft (the counter pairs). Only append
+    and popleft are instrumented.
+
+    Attributes:
+        stats : Stats instance.
+    """
+
+    def __init__(self, stats, iterable=()):
+
+        deque.__init__(self, iterable)
+        self.stats = stats
+
+    def append(self, item):
+
+        deque.append(self, item)
+        self.stats.peak('queue', len(self))
+
+    def popleft(self):
+
+        self.stats.count('pairs')
+        return deque.popleft(self)
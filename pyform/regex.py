@@ -0,0 +1,438 @@
+"""Compilation of regular expressions to minimal DFAs.
+
+Patterns are parsed into syntax trees of nested tuples:
+
+    ('empty',)      the empty word
+    ('set', chars)  a single character in the frozenset chars
+    ('cat', x, y)   concatenation of x and y
+    ('alt', x, y)   union of x and y
+    ('star', x)     Kleene star of x
+    ('opt', x)      x or the empty word
+
+The syntax supports literals, escapes (\\d, \\w, \\s, \\n, \\t and escaped
+metacharacters), the wildcard '.', character classes with ranges and
+negation ([a-z_], [^0-9]), groups, alternation and the quantifiers *, +, ?,
+{m}, {m,} and {m,n}. The wildcard and negated classes denote characters of
+the alphabet given to compile.
+
+Compilation uses the Glushkov (position) construction over the classes of
+characters that no character set of the pattern distinguishes (minterms),
+so large character classes cost one transition per class rather than one
+per character. The NFA is determinized and minimized (with
+DFA.minimize_valmari) over minterms and only then expanded to characters.
+Compiled automata are cached per pattern and alphabet, and compile returns
+copies of them.
+"""
+
+import functools
+import string
+from pyform.automaton.dfa import DFA
+from pyform.automaton.nfa import NFA
+
+# number of compiled automata kept by compile (least recently used first out)
+
+CACHE_SIZE = 256
+
+ESCAPES = {
+    'd' : frozenset(string.digits),
+    'w' : frozenset(string.ascii_letters + string.digits + '_'),
+    's' : frozenset(' \t\n\r\f\v'),
+    'n' : frozenset('\n'),
+    't' : frozenset('\t'),
+}
+
+METACHARACTERS = frozenset('\\.|()[]{}*+?^-')
+
+class Parser(object):
+
+    """Recursive descent parser of regular expressions (see the module
+    docstring for the syntax).
+
+    Attributes:
+        pattern  : String.
+        alphabet : Frozenset of characters denoted by '.' and used to
+            complement negated classes, or None.
+        position : Index of the next character of pattern.
+    """
+
+    def __init__(self, pattern, alphabet=None):
+
+        self.pattern  = pattern
+        self.alphabet = alphabet
+        self.position = 0
+
+    def parse(self):
+
+        """Parse the pattern.
+
+        Returns:
+            Syntax tree (see the module docstring).
+        """
+
+        tree = self.alternation()
+        if self.position < len(self.pattern):
+            self.error('unbalanced parenthesis')
+        return tree
+
+    def error(self, message):
+
+        raise ValueError('%s at position %d: %r' % (
+            message, self.position, self.pattern))
+
+    def peek(self):
+
+        if self.position < len(self.pattern):
+            return self.pattern[self.position]
+        return None
+
+    def take(self):
+
+        char = self.peek()
+        if char is None:
+            self.error('unexpected end of pattern')
+        self.position += 1
+        return char
+
+    def alternation(self):
+
+        tree = self.concatenation()
+        while self.peek() == '|':
+            self.position += 1
+            tree = ('alt', tree, self.concatenation())
+        return tree
+
+    def concatenation(self):
+
+        tree = ('empty',)
+        while self.peek() not in (None, '|', ')'):
+            item = self.repetition()
+            tree = item if tree == ('empty',) else ('cat', tree, item)
+        return tree
+
+    def repetition(self):
+
+        tree = self.atom()
+        while self.peek() in ('*', '+', '?', '{'):
+            char = self.take()
+            if char == '*':
+                tree = ('star', tree)
+            elif char == '+':
+                tree = ('cat', tree, ('star', tree))
+            elif char == '?':
+                tree = ('opt', tree)
+            else:
+                tree = repeat(tree, *self.bounds())
+        return tree
+
+    def bounds(self):
+
+        # the opening brace has been consumed
+
+        low = self.number()
+        if low is None:
+            self.error('expected number')
+        high = low
+        if self.peek() == ',':
+            self.position += 1
+            high = self.number()
+        if self.take() != '}':
+            self.error('expected }')
+        if high is not None and high < low:
+            self.error('invalid bounds')
+        return low, high
+
+    def number(self):
+
+        begin = self.position
+        while self.peek() is not None and self.peek().isdigit():
+            self.position += 1
+        if begin == self.position:
+            return None
+        return int(self.pattern[begin:self.position])
+
+    def atom(self):
+
+        char = self.take()
+        if char == '(':
+            tree = self.alternation()
+            if self.take() != ')':
+                self.error('expected )')
+            return tree
+        if char == '[':
+            return ('set', self.character_class())
+        if char == '.':
+            return ('set', self.universe())
+        if char == '\\':
+            return ('set', self.escape())
+        if char in METACHARACTERS:
+            self.position -= 1
+            self.error('unexpected %r' % (char,))
+        return ('set', frozenset(char))
+
+    def escape(self):
+
+        char = self.take()
+        if char in ESCAPES:
+            return ESCAPES[char]
+        if char in METACHARACTERS:
+            return frozenset(char)
+        self.position -= 1
+        self.error('unknown escape')
+
+    def character_class(self):
+
+        # the opening bracket has been consumed
+
+        negated = self.peek() == '^'
+        if negated:
+            self.position += 1
+
+        chars = set()
+        first = True
+        while first or self.peek() != ']':
+            first = False
+            char  = self.take()
+            if char == '\\':
+                low = self.escape()
+            else:
+                low = frozenset(char)
+            after = self.pattern[self.position + 1:self.position + 2]
+            if self.peek() == '-' and len(low) == 1 and after not in ('', ']'):
+                self.position += 1
+                high = self.take()
+                if high == '\\':
+                    high = self.escape()
+                    if len(high) != 1:
+                        self.error('invalid range')
+                    high = next(iter(high))
+                begin = ord(next(iter(low)))
+                if ord(high) < begin:
+                    self.error('invalid range')
+                chars.update(map(chr, range(begin, ord(high) + 1)))
+            else:
+                chars.update(low)
+        self.position += 1
+
+        return self.universe() - chars if negated else frozenset(chars)
+
+    def universe(self):
+
+        if self.alphabet is None:
+            self.error('pattern requires an alphabet')
+        return self.alphabet
+
+def repeat(tree, low, high):
+
+    """Syntax tree of tree repeated between low and high times (at least low
+    times if high is None)."""
+
+    result = ('empty',)
+    for _ in range(low):
+        result = tree if result == ('empty',) else ('cat', result, tree)
+
+    if high is None:
+        tail = ('star', tree)
+    else:
+        tail = ('empty',)
+        for _ in range(high - low):
+            tail = ('opt', tree if tail == ('empty',) else ('cat', tree, tail))
+
+    if tail == ('empty',):
+        return result
+    return tail if result == ('empty',) else ('cat', result, tail)
+
+def parse(pattern, alphabet=None):
+
+    """Parse a regular expression.
+
+    Args:
+        pattern  : String.
+        alphabet : Iterable of characters (required by '.' and negated
+            classes) or None.
+
+    Returns:
+        Syntax tree (see the module docstring).
+    """
+
+    if alphabet is not None:
+        alphabet = frozenset(alphabet)
+    return Parser(pattern, alphabet).parse()
+
+def minterms(sets, alphabet):
+
+    """Partition the characters of alphabet into classes of characters that
+    belong to the same members of sets.
+
+    Args:
+        sets     : List of frozensets of characters.
+        alphabet : Frozenset of characters.
+
+    Returns:
+        (classes, labels) where classes is a list of frozensets of characters
+        and labels is a list of sets of class ids such that labels[i] is the
+        set of classes whose characters belong to sets[i].
+    """
+
+    members = {}
+    for i, chars in enumerate(sets):
+        for char in chars:
+            if char in alphabet:
+                members.setdefault(char, []).append(i)
+
+    # characters of no set form no class, as no transition reads them
+
+    ids     = {}
+    classes = []
+    labels  = [set() for _ in sets]
+    for char, signature in members.items():
+        signature = tuple(signature)
+        if signature not in ids:
+            ids[signature] = len(classes)
+            classes.append(set())
+            for i in signature:
+                labels[i].add(ids[signature])
+        classes[ids[signature]].add(char)
+
+    return [frozenset(c) for c in classes], labels
+
+def glushkov(tree):
+
+    """Glushkov automaton of a syntax tree. State 0 is the start state and
+    states 1..n are the positions (occurrences of character sets) of tree.
+    Transitions into position p are labelled with index p - 1 of sets.
+
+    Args:
+        tree : Syntax tree.
+
+    Returns:
+        (nfa, sets) where nfa is an NFA whose symbols are indices of the
+        list sets of character sets of the positions.
+    """
+
+    sets   = []
+    follow = {}
+
+    def visit(node):
+
+        # returns (nullable, first, last) and records follow sets
+
+        kind = node[0]
+        if kind == 'empty':
+            return True, set(), set()
+        if kind == 'set':
+            sets.append(node[1])
+            p = len(sets)
+            follow[p] = set()
+            return False, set([p]), set([p])
+        if kind == 'cat':
+            n1, f1, l1 = visit(node[1])
+            n2, f2, l2 = visit(node[2])
+            for p in l1:
+                follow[p] |= f2
+            return (n1 and n2, f1 | f2 if n1 else f1, l1 | l2 if n2 else l2)
+        if kind == 'alt':
+            n1, f1, l1 = visit(node[1])
+            n2, f2, l2 = visit(node[2])
+            return (n1 or n2, f1 | f2, l1 | l2)
+        if kind == 'star' or kind == 'opt':
+            _, f1, l1 = visit(node[1])
+            if kind == 'star':
+                for p in l1:
+                    follow[p] |= f1
+            return (True, f1, l1)
+        raise ValueError('unknown node: %r' % (kind,))
+
+    nullable, first, last = visit(tree)
+
+    delta = {}
+    for q, targets in [(0, first)] + list(follow.items()):
+        for p in targets:
+            if q not in delta:
+                delta[q] = {}
+            if p - 1 not in delta[q]:
+                delta[q][p - 1] = set()
+            delta[q][p - 1].add(p)
+
+    nfa = NFA(
+        states = set(range(len(sets) + 1)),
+        finals = last | set([0]) if nullable else last,
+        start  = 0,
+        sigma  = set(range(len(sets))),
+        delta  = delta
+    )
+    return nfa, sets
+
+def compile(pattern, alphabet=None):
+
+    """Compile a regular expression to a minimal partial DFA over
+    characters. Results are cached (see CACHE_SIZE) per pattern and
+    alphabet; each call returns a copy of the cached automaton, which the
+    caller may modify (see DFA.add_transition).
+
+    Args:
+        pattern  : String.
+        alphabet : Iterable of characters or None. The alphabet of the result
+            is alphabet, or the characters of the pattern if alphabet is None
+            (in which case the pattern must not contain '.' or negated
+            classes).
+
+    Returns:
+        Minimal DFA instance accepting the words over the alphabet matched
+        by the entire pattern.
+    """
+
+    if alphabet is not None:
+        alphabet = frozenset(alphabet)
+    return _copy(_compile(pattern, alphabet))
+
+def _copy(dfa):
+
+    # copying the sets and rows is linear in the size of the automaton,
+    # far below the cost of compiling it again
+
+    return DFA(
+        states = set(dfa.states),
+        finals = set(dfa.finals),
+        start  = dfa.start,
+        sigma  = set(dfa.sigma),
+        delta  = {q : dict(row) for q, row in dfa.delta.items()}
+    )
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _compile(pattern, alphabet):
+
+    tree = parse(pattern, alphabet)
+    nfa, sets = glushkov(tree)
+
+    if alphabet is None:
+        alphabet = frozenset().union(*sets)
+
+    # relabel positions with minterms, then determinize and minimize over
+    # minterms before expanding them to characters
+
+    classes, labels = minterms(sets, alphabet)
+    delta = {}
+    for q, row in nfa.delta.items():
+        delta[q] = {}
+        for i, targets in row.items():
+            for c in labels[i]:
+                if c not in delta[q]:
+                    delta[q][c] = set()
+                delta[q][c] |= targets
+
+    nfa = NFA(nfa.states, nfa.finals, set(range(len(classes))), 0, delta)
+    dfa = nfa.determinize(minimize=True)
+
+    return DFA(
+        states = dfa.states,
+        finals = dfa.finals,
+        start  = dfa.start,
+        sigma  = set(alphabet),
+        delta  = {
+            q : {char : r for c, r in row.items() for char in classes[c]}
+            for q, row in dfa.delta.items()
+        }
+    )
+
+cache_info  = _compile.cache_info
+cache_clear = _compile.cache_clear
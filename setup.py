@@ -10,5 +10,5 @@ setup(
     author_email='portin.daniel@protonmail.com',
     license='MIT',
     packages=find_packages(),
-    install_requires=['bidict']
+    install_requires=['bidict', 'numpy']
 )   
@@ -0,0 +1,74 @@
+from pyform.bench import generators
+from pyform.bench import runner
+from unittest import TestCase
+
+class TestGenerators(TestCase):
+
+    def test_random(self):
+
+        dfa = generators.random_complete(50, 3, seed=4)
+        self.assertEqual(dfa.delta, generators.random_complete(50, 3, 4).delta)
+        self.assertNotEqual(dfa.delta,
+                            generators.random_complete(50, 3, 5).delta)
+        self.assertTrue(all(len(row) == 3 for row in dfa.delta.values()))
+        self.assertEqual(len(dfa.delta), 50)
+
+        partial = generators.random_partial(50, 'ab', density=0.3)
+        self.assertEqual(partial.sigma, set('ab'))
+        self.assertTrue(all(row for row in partial.delta.values()))
+        self.assertLess(sum(map(len, partial.delta.values())), 60)
+
+        nfa = generators.random_nfa(20, 'ab', density=0.1, seed=1)
+        self.assertEqual(nfa.sigma, set('ab'))
+        self.assertEqual(nfa.delta,
+                         generators.random_nfa(20, 'ab', 0.1, seed=1).delta)
+        self.assertTrue(all(targets for row in nfa.delta.values()
+                            for targets in row.values()))
+
+        minimal = generators.random_minimal(50, 2)
+        self.assertLessEqual(len(minimal.states), 50)
+        self.assertEqual(len(minimal.minimize_valmari().states),
+                         len(minimal.states))
+
+    def test_families(self):
+
+        chain = generators.chain(10, 2)
+        self.assertTrue(chain.accepts([0] * 9))
+        self.assertFalse(chain.accepts([0] * 8))
+        self.assertEqual(len(chain.minimize_valmari().states), 10)
+
+        for size in (2, 5, 64, 100):
+            dfa = generators.de_bruijn(size)
+            self.assertEqual(len(dfa.states),
+                             1 << (size.bit_length() - 1))
+            self.assertEqual(len(dfa.minimize_valmari().states),
+                             len(dfa.states))
+
+        nfa = generators.nth_from_end(3)
+        self.assertTrue(nfa.accepts('babb'))
+        self.assertFalse(nfa.accepts('bbab'))
+        self.assertEqual(len(nfa.determinize().states), 8)
+
+        dfa  = generators.random_partial(30, 2)
+        copy = generators.permuted(dfa, seed=3)
+        self.assertIsNotNone(dfa.isomorphic(copy))
+
+class TestRunner(TestCase):
+
+    def test_run_and_compare(self):
+
+        operations = ['minimize_valmari', 'isomorphic']
+        results = runner.run(sizes=[20], generators=['complete', 'chain'],
+                             operations=operations, repeat=1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(r['error'] is None for r in results))
+
+        baseline = [dict(r, seconds=2 * r['seconds']) for r in results]
+        for result, ratio in runner.compare(baseline, results):
+            self.assertAlmostEqual(ratio, 0.5)
+
+    def test_errors(self):
+
+        seconds, error = runner.measure(lambda: 1 // 0, (), 3)
+        self.assertIsNone(seconds)
+        self.assertIn('ZeroDivisionError', error)
@@ -0,0 +1,137 @@
+from pyform.automaton.dfa import DFA
+from pyform.automaton.compact import CompactDFA
+from unittest import TestCase
+
+def example():
+
+    return DFA(
+        states = set([0,1,2,3,4,5,6,7]),
+        finals = set([1,2,3,4,5,6]),
+        start  = 0,
+        sigma  = set(['a','b']),
+        delta  = {
+            0 : {'a' : 1, 'b' : 4},
+            1 : {'a' : 2, 'b' : 3},
+            2 : {'a' : 7, 'b' : 7},
+            3 : {'a' : 7, 'b' : 3},
+            4 : {'a' : 5, 'b' : 6},
+            5 : {'a' : 7, 'b' : 7},
+            6 : {'a' : 7, 'b' : 6},
+            7 : {'a' : 7, 'b' : 7}
+        }
+    )
+
+class TestCompactDFA(TestCase):
+
+    def test_round_trip(self):
+
+        dfa = DFA(
+            states = set([3,5,9]),
+            finals = set([9]),
+            start  = 5,
+            sigma  = set(['a','b','c']),
+            delta  = {
+                5 : {'a' : 3, 'c' : 9},
+                3 : {'b' : 9}
+            }
+        )
+
+        compact = CompactDFA.from_dfa(dfa)
+        result  = compact.to_dfa()
+
+        self.assertEqual(compact.table.shape, (3, 3))
+        self.assertEqual(result.states, dfa.states)
+        self.assertEqual(result.finals, dfa.finals)
+        self.assertEqual(result.start, dfa.start)
+        self.assertEqual(result.sigma, dfa.sigma)
+        self.assertEqual(result.delta, dfa.delta)
+
+    def test_delta_view(self):
+
+        dfa     = example()
+        compact = dfa.compact()
+
+        self.assertEqual(set(compact.iterate()), set(dfa.iterate()))
+        self.assertEqual(dict(compact.delta[3]), {'a' : 7, 'b' : 3})
+        self.assertEqual(compact.delta[3].get('c', -5), -5)
+        self.assertNotIn(8, compact.delta)
+
+    def test_minimize_valmari(self):
+
+        dfa     = example()
+        compact = dfa.compact()
+
+        self.assertIsNotNone(
+            compact.minimize_valmari().isomorphic(dfa.minimize_valmari()))
+
+    def test_equivalent_hopcroft_karp(self):
+
+        dfa     = example()
+        compact = dfa.compact()
+        minimal = dfa.minimize_valmari().compact()
+
+        self.assertTrue(compact.equivalent_hopcroft_karp(minimal)[0])
+        self.assertTrue(compact.equivalent_hopcroft_karp(dfa)[0])
+        self.assertTrue(dfa.equivalent_hopcroft_karp(compact)[0])
+
+        other = DFA(
+            states = set([0,1]),
+            finals = set([1]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {0 : {'a' : 1}, 1 : {'a' : 1}}
+        ).compact()
+
+        equivalent, witness = compact.equivalent_hopcroft_karp(other)
+        self.assertFalse(equivalent)
+        self.assertEqual(witness, ['b'])
+
+    def test_product(self):
+
+        dfa     = example()
+        compact = dfa.compact()
+
+        expected = dfa.product(dfa, lambda a, b: a and not b)
+        result   = compact.product(compact, lambda a, b: a and not b)
+
+        self.assertIsInstance(result, CompactDFA)
+        self.assertTrue(result.equivalent_hopcroft_karp(expected)[0])
+
+        expected = dfa.product(dfa, lambda a, b: a == b)
+        result   = compact.product(dfa, lambda a, b: a == b)
+
+        self.assertTrue(result.equivalent_hopcroft_karp(expected)[0])
+
+class TestRunMany(TestCase):
+
+    def test_run_many(self):
+
+        dfa   = example()
+        words = ['', 'a', 'ab', 'abba', 'bbbb', 'aaa', 'bab', 'abc', 'c']
+
+        self.assertEqual(
+            dfa.run_many(words).tolist(),
+            [dfa.run(word) if dfa.run(word) is not None
+             else CompactDFA.SENTINEL for word in words])
+        self.assertEqual(
+            dfa.accepts_many(words).tolist(),
+            [dfa.accepts(word) for word in words])
+
+    def test_run_many_partial(self):
+
+        dfa = DFA(
+            states = set([10,11,12]),
+            finals = set([12]),
+            start  = 10,
+            sigma  = set([0,1]),
+            delta  = {10 : {0 : 11}, 11 : {1 : 12}, 12 : {0 : 12}}
+        )
+
+        words = [[0, 1], [0, 1, 0, 0], [1], [0, 0, 1], [], b'\x00\x01']
+
+        self.assertEqual(
+            dfa.run_many(words).tolist(), [12, 12, -1, -1, 10, 12])
+        self.assertEqual(
+            dfa.accepts_many([b'\x00\x01', b'\x00', b'\x02', b'']).tolist(),
+            [True, False, False, False])
+        self.assertEqual(dfa.accepts_many([]).tolist(), [])
@@ -0,0 +1,75 @@
+import random
+from pyform.automaton.compact import CompactDFA
+from pyform.automaton.daciuk import DaciukBuilder
+from pyform.automaton.dfa import DFA
+from unittest import TestCase
+
+def trie(words):
+
+    delta, finals = {0 : {}}, set()
+    for word in words:
+        q = 0
+        for a in word:
+            if a not in delta[q]:
+                delta[q][a] = len(delta)
+                delta[len(delta)] = {}
+            q = delta[q][a]
+        finals.add(q)
+
+    return DFA(
+        states = set(delta),
+        finals = finals,
+        start  = 0,
+        sigma  = set(a for word in words for a in word),
+        delta  = delta
+    )
+
+class TestDaciukBuilder(TestCase):
+
+    def test_minimal(self):
+
+        words = ['aa', 'ab', 'ba', 'bb', 'bba']
+        dfa   = DFA.from_words(words)
+        self.assertEqual(len(dfa.states), 5)
+        self.assertIsNotNone(dfa.isomorphic(trie(words).minimize_valmari()))
+        for word in ['', 'a', 'aa', 'bba', 'bbb', 'abb']:
+            self.assertEqual(dfa.accepts(word), word in words)
+
+    def test_random(self):
+
+        rng = random.Random(3)
+        for _ in range(30):
+            words = sorted(set(
+                ''.join(rng.choice('abc') for _ in range(rng.randrange(6)))
+                for _ in range(rng.randrange(40))))
+            expected = trie(words).minimize_valmari()
+            dfa      = DFA.from_words(words)
+            compact  = DFA.from_words(words, compact=True)
+            self.assertIsInstance(compact, CompactDFA)
+            self.assertIsNotNone(dfa.isomorphic(expected))
+            self.assertIsNotNone(compact.to_dfa().isomorphic(expected))
+
+    def test_edge_cases(self):
+
+        empty = DFA.from_words([])
+        self.assertEqual(len(empty.states), 1)
+        self.assertFalse(empty.accepts(''))
+
+        dfa = DFA.from_words(['', 'x', 'x', 'xy'])
+        self.assertEqual(len(dfa.states), 3)
+        self.assertTrue(dfa.accepts(''))
+
+        tuples = DFA.from_words([(1, 2), (1, 3), (2,)])
+        self.assertTrue(tuples.accepts([1, 3]))
+        self.assertFalse(tuples.accepts([2, 2]))
+
+    def test_errors(self):
+
+        with self.assertRaises(ValueError):
+            DFA.from_words(['b', 'a'])
+
+        builder = DaciukBuilder()
+        builder.add('a')
+        builder.finish()
+        with self.assertRaises(ValueError):
+            builder.add('b')
@@ -1,4 +1,7 @@
+import itertools
+import random
 from pyform.automaton.dfa import DFA
+from pyform.automaton.valmari import ArrayValmariState
 from unittest import TestCase
 
 class TestIsomorphic(TestCase):
@@ -7,11 +10,267 @@ class TestIsomorphic(TestCase):
 
 class TestEquivalentHopcroftKarp(TestCase):
 
-    pass
+    def random_dfa(self, rng, sigma):
+
+        states = set(range(6))
+        return DFA(
+            states = states,
+            finals = set(q for q in states if rng.random() < 0.3),
+            start  = 0,
+            sigma  = set(sigma),
+            delta  = {q : {a : rng.randrange(6) for a in sigma
+                           if rng.random() < 0.7} for q in states}
+        )
+
+    def test_union_alphabet(self):
+
+        # the symbol b only occurs in the argument automaton
+
+        dfa1 = DFA(set([0]), set([0]), set(['a']), 0, {0 : {'a' : 0}})
+        dfa2 = DFA(set([0,1]), set([0,1]), set(['a','b']), 0,
+                   {0 : {'a' : 0, 'b' : 1}})
+
+        self.assertEqual(dfa1.equivalent_hopcroft_karp(dfa2), (False, ['b']))
+        self.assertEqual(dfa2.equivalent_hopcroft_karp(dfa1), (False, ['b']))
+        self.assertEqual(dfa1.equivalent_hopcroft_karp(dfa2, compress=True),
+                         (False, ['b']))
+
+    def test_shortest_witness(self):
+
+        rng = random.Random(7)
+        xor = lambda a, b: a != b
+        for _ in range(50):
+            dfa1 = self.random_dfa(rng, 'ab')
+            dfa2 = self.random_dfa(rng, 'abc')
+            equivalent, witness = dfa1.equivalent_hopcroft_karp(dfa2)
+            found, shortest = dfa1.product_check(dfa2, xor)
+            self.assertEqual(equivalent, not found)
+            if not equivalent:
+                self.assertEqual(len(witness), len(shortest))
+                self.assertNotEqual(dfa1.accepts(witness),
+                                    dfa2.accepts(witness))
+
+    def test_equivalent_many(self):
+
+        rng  = random.Random(3)
+        dfa  = self.random_dfa(rng, 'ab')
+        dfas = [dfa.minimize(), dfa.compact()] + \
+               [self.random_dfa(rng, 'ab') for _ in range(10)]
+
+        results = DFA.equivalent_many(dfa, dfas)
+        self.assertEqual(results[:2], [(True, None), (True, None)])
+        self.assertEqual(results, [dfa.equivalent_hopcroft_karp(other)
+                                   for other in dfas])
 
 class TestProduct(TestCase):
 
-    pass
+    def setUp(self):
+
+        # words over {a, b} with an even number of a's and words ending in b
+
+        self.even = DFA(
+            states = set([0,1]),
+            finals = set([0]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {0 : {'a' : 1, 'b' : 0}, 1 : {'a' : 0, 'b' : 1}}
+        )
+        self.ends = DFA(
+            states = set([0,1]),
+            finals = set([1]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {0 : {'a' : 0, 'b' : 1}, 1 : {'a' : 0, 'b' : 1}}
+        )
+        self.aab = DFA(
+            states = set([0,1,2,3]),
+            finals = set([3]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {0 : {'a' : 1}, 1 : {'a' : 2}, 2 : {'b' : 3}}
+        )
+
+    def test_is_empty(self):
+
+        self.assertEqual(self.aab.is_empty(), (False, ['a','a','b']))
+        self.assertEqual(self.even.is_empty(), (False, []))
+        empty = DFA(set([0,1]), set([1]), set(['a']), 0, {1 : {'a' : 1}})
+        self.assertEqual(empty.is_empty(), (True, None))
+
+    def test_intersects(self):
+
+        self.assertEqual(self.even.intersects(self.ends), (True, ['b']))
+        self.assertEqual(self.aab.intersects(self.ends),
+                         (True, ['a','a','b']))
+        self.assertEqual(self.aab.intersects(self.aab.product(
+            self.aab, lambda a, b: False)), (False, None))
+
+    def test_includes(self):
+
+        self.assertEqual(self.ends.includes(self.aab), (True, None))
+        self.assertEqual(self.even.includes(self.aab), (True, None))
+        self.assertEqual(self.aab.includes(self.ends), (False, ['b']))
+
+    def test_product_check(self):
+
+        # complement of a partial automaton requires the dead pair
+
+        found, witness = self.aab.product_check(
+            self.aab, lambda a, b: not a and not b)
+        self.assertTrue(found)
+        self.assertEqual(witness, [])
+
+        found, witness = self.aab.product_check(
+            self.aab, lambda a, b: a != b)
+        self.assertEqual((found, witness), (False, None))
+
+        nonempty = DFA(set([0,1]), set([0,1]), set(['a','b']), 0,
+                       {0 : {'a' : 1}, 1 : {'a' : 1}})
+        found, witness = nonempty.product_check(
+            nonempty, lambda a, b: not a and not b)
+        self.assertEqual(witness, ['b'])
+
+    def test_product(self):
+
+        product = self.even.product(self.ends, lambda a, b: a and b)
+        self.assertTrue(product.accepts('aab'))
+        self.assertFalse(product.accepts('ab'))
+        self.assertEqual(product.is_empty(), (False, ['b']))
+
+    def test_product_many(self):
+
+        dfas = [self.even, self.ends, self.aab, self.even]
+        functions = [
+            lambda a, b, c, d: a and b and not c,
+            lambda a, b, c, d: a or c,
+            lambda a, b, c, d: not (a or b or c),
+            lambda a, b, c, d: (a != b) != (c and d),
+        ]
+
+        for f in functions:
+            steps   = []
+            product = DFA.product_many(dfas, f, steps=steps)
+            self.assertProduct(product, dfas, f)
+            self.assertEqual(product.minimize().fingerprint(),
+                             product.fingerprint())
+            self.assertEqual(len(steps), len(dfas) - 1)
+            self.assertEqual(
+                sorted(steps[-1].left + steps[-1].right), list(range(4)))
+
+        for f in (all, any, lambda bits: _majority(*bits)):
+            product = DFA.product_many(
+                dfas[:3], lambda *bits: f(bits), monotone=True)
+            self.assertProduct(product, dfas[:3], lambda *bits: f(bits))
+
+        single = DFA.product_many([self.aab], lambda a: not a)
+        self.assertProduct(single, [self.aab], lambda a: not a)
+        self.assertRaises(ValueError, DFA.product_many, [], lambda: True)
+
+    def test_product_many_workers(self):
+
+        dfas    = [self.even, self.ends, self.aab]
+        steps   = []
+        product = DFA.product_many(dfas, _majority, workers=2, steps=steps,
+                                   monotone=True)
+        self.assertProduct(product, dfas, _majority)
+        self.assertEqual(len(steps), 2)
+
+    def assertProduct(self, product, dfas, f, length=6):
+
+        # every word over {a, b} of length at most length
+
+        words = [[]]
+        for _ in range(length):
+            words = [[]] + [w + [a] for w in words for a in 'ab']
+        words = set(tuple(w) for w in words)
+
+        for word in words:
+            self.assertEqual(product.accepts(word),
+                             bool(f(*(dfa.accepts(word) for dfa in dfas))))
+
+def _majority(*bits):
+
+    return sum(bits) >= 2
+
+class TestCounting(TestCase):
+
+    def setUp(self):
+
+        # words over {a, b} without two consecutive b's (Fibonacci counts),
+        # with a useless state 3
+
+        self.fib = DFA(
+            states = set([0,1,2,3]),
+            finals = set([0,1]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {
+                0 : {'a' : 0, 'b' : 1},
+                1 : {'a' : 0, 'b' : 2},
+                2 : {'a' : 3}
+            }
+        )
+
+    def test_count(self):
+
+        fib = [1, 2]
+        for _ in range(3000):
+            fib.append(fib[-1] + fib[-2])
+
+        self.assertEqual([self.fib.count(n) for n in range(8)], fib[:8])
+        self.assertEqual(self.fib.count(3000), fib[3000])
+        self.assertEqual(self.fib.count(5, upto=True), sum(fib[:6]))
+        self.assertEqual(self.fib.count(0, upto=True), 1)
+        with self.assertRaises(ValueError):
+            self.fib.count(-1)
+
+        empty = DFA(set([0]), set(), set(['a']), 0, {0 : {'a' : 0}})
+        self.assertEqual(empty.count(10, upto=True), 0)
+
+    def test_enumerate(self):
+
+        words = list(self.fib.enumerate(max_length=3))
+        self.assertEqual(words[:6], [[], ['a'], ['b'], ['a','a'], ['a','b'],
+                                     ['b','a']])
+        self.assertEqual(len(words), self.fib.count(3, upto=True))
+
+        finite = DFA(set([0,1,2]), set([1,2]), set(['a','b']), 0,
+                     {0 : {'b' : 1, 'a' : 2}, 2 : {'a' : 1}})
+        self.assertEqual(list(finite.enumerate()), [['a'], ['b'], ['a','a']])
+
+        # a productive cycle that is unreachable from the start state does
+        # not make the finite language infinite
+
+        unreachable = DFA(
+            states = set([0,1]),
+            finals = set([0]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {1 : {'a' : 1, 'b' : 0}}
+        )
+        self.assertEqual(list(unreachable.enumerate()), [[]])
+
+    def test_random(self):
+
+        rng = random.Random(4)
+        for _ in range(20):
+            states = set(range(5))
+            dfa = DFA(
+                states = states,
+                finals = set(q for q in states if rng.random() < 0.4),
+                start  = 0,
+                sigma  = set([0,1,2]),
+                delta  = {q : {a : rng.randrange(5) for a in range(3)
+                               if rng.random() < 0.6} for q in states}
+            )
+
+            expected = [list(w) for n in range(6)
+                        for w in itertools.product(range(3), repeat=n)
+                        if dfa.accepts(list(w))]
+            self.assertEqual(list(dfa.enumerate(max_length=5)), expected)
+            for n in range(6):
+                self.assertEqual(dfa.count(n), sum(1 for w in expected
+                                                   if len(w) == n))
 
 class TestMinimizeValmari(TestCase):
 
@@ -187,6 +446,368 @@ class TestMinimizeValmari(TestCase):
         self.assertIsNotNone(dfa_min.isomorphic(expected))
         self.assertTrue(dfa_min.equivalent_hopcroft_karp(dfa)[0])
 
+    def test_minimize_valmari_numpy(self):
+
+        rng = random.Random(3)
+        for _ in range(50):
+            n = rng.randrange(1, 30)
+            dfa = DFA(
+                states = set(range(n)),
+                finals = set(q for q in range(n) if rng.random() < 0.3),
+                start  = rng.randrange(n),
+                sigma  = set('abc'),
+                delta  = {
+                    q : {a : rng.randrange(n) for a in 'abc'
+                         if rng.random() < 0.7}
+                    for q in range(n)
+                }
+            )
+
+            expected = dfa.minimize_valmari()
+            result   = dfa.minimize_valmari(engine='numpy')
+            self.assertIsNotNone(result.isomorphic(expected))
+            self.assertEqual(len(result.states), len(expected.states))
+            self.assertEqual(result.sigma, expected.sigma)
+            self.assertTrue(result.equivalent_hopcroft_karp(dfa)[0])
+
+            result = dfa.compact().minimize_valmari(engine='numpy')
+            self.assertIsNotNone(result.isomorphic(expected))
+
+    def test_minimize_valmari_numpy_vectorized(self):
+
+        # process every frontier, block and cord with NumPy
+
+        frontier, batch = ArrayValmariState.FRONTIER, ArrayValmariState.BATCH
+        ArrayValmariState.FRONTIER, ArrayValmariState.BATCH = 0, 0
+
+        try:
+            self.test_minimize_valmari_numpy()
+        finally:
+            ArrayValmariState.FRONTIER = frontier
+            ArrayValmariState.BATCH    = batch
+
+class TestMinimize(TestCase):
+
+    def test_strategies(self):
+
+        rng = random.Random(5)
+        for _ in range(50):
+            n = rng.randrange(1, 30)
+            dfa = DFA(
+                states = set(range(n)),
+                finals = set(q for q in range(n) if rng.random() < 0.3),
+                start  = rng.randrange(n),
+                sigma  = set('abc'),
+                delta  = {
+                    q : {a : rng.randrange(n) for a in 'abc'
+                         if rng.random() < 0.8}
+                    for q in range(n)
+                }
+            )
+
+            expected = dfa.minimize_valmari()
+            for strategy in ('valmari', 'hopcroft', 'moore', 'auto'):
+                result = dfa.minimize(strategy)
+                self.assertIsNotNone(result.isomorphic(expected))
+                self.assertEqual(len(result.states), len(expected.states))
+                self.assertEqual(result.sigma, expected.sigma)
+
+    def test_unknown_strategy(self):
+
+        dfa = DFA(set([0]), set(), set(), 0, {})
+        self.assertRaises(ValueError, dfa.minimize, 'brzozowski')
+
+class TestCanonical(TestCase):
+
+    def setUp(self):
+
+        self.dfa = DFA(
+            states = set([0,1,2,3,4,5,6,7]),
+            finals = set([1,2,3,4,5,6]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {
+                0 : {'a' : 1, 'b' : 4},
+                1 : {'a' : 2, 'b' : 3},
+                2 : {'a' : 7, 'b' : 7},
+                3 : {'a' : 7, 'b' : 3},
+                4 : {'a' : 5, 'b' : 6},
+                5 : {'a' : 7, 'b' : 7},
+                6 : {'a' : 7, 'b' : 6},
+                7 : {'a' : 7, 'b' : 7}
+            }
+        )
+
+    def test_canonical(self):
+
+        canonical = self.dfa.canonical()
+        self.assertEqual(canonical.states, set([0,1,2,3]))
+        self.assertEqual(canonical.finals, set([1,2,3]))
+        self.assertEqual(canonical.start, 0)
+        self.assertEqual(canonical.delta, {
+            0 : {'a' : 1, 'b' : 1},
+            1 : {'a' : 2, 'b' : 3},
+            3 : {'b' : 3}
+        })
+        self.assertIs(self.dfa.canonical(), canonical)
+
+    def test_fingerprint(self):
+
+        # rename states and add an unused symbol
+
+        renamed = DFA(
+            states = set(q + 10 for q in self.dfa.states),
+            finals = set(q + 10 for q in self.dfa.finals),
+            start  = 10,
+            sigma  = set(['a','b','c']),
+            delta  = {
+                q + 10 : {a : r + 10 for a, r in m.items()}
+                for q, m in self.dfa.delta.items()
+            }
+        )
+
+        other = DFA(
+            states = set([0,1]),
+            finals = set([1]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {0 : {'a' : 1, 'b' : 1}, 1 : {'a' : 1, 'b' : 1}}
+        )
+
+        self.assertEqual(self.dfa.fingerprint(), renamed.fingerprint())
+        self.assertEqual(self.dfa.fingerprint(),
+                         self.dfa.minimize_valmari().fingerprint())
+        self.assertNotEqual(self.dfa.fingerprint(), other.fingerprint())
+
+class TestReachability(TestCase):
+
+    def setUp(self):
+
+        # state 4 is unreachable and state 5 is unproductive; state 2 has
+        # two predecessors on symbol a
+
+        self.dfa = DFA(
+            states = set([1,2,3,4,5]),
+            finals = set([3]),
+            start  = 1,
+            sigma  = set(['a','b']),
+            delta  = {
+                1 : {'a' : 2, 'b' : 5},
+                2 : {'a' : 3},
+                4 : {'a' : 2},
+                5 : {'a' : 5}
+            }
+        )
+
+    def test_reachable(self):
+
+        self.assertEqual(self.dfa.reachable([1], 'ab'), set([1,2,3,5]))
+        self.assertEqual(self.dfa.reachable([1], 'b'), set([1,5]))
+        self.assertEqual(self.dfa.reachable([1,9], 'a'), set([1,2,3,9]))
+        self.assertEqual(self.dfa.transition([1,2], 'ab'), set([2,3,5]))
+        self.assertIs(self.dfa.adjacency(), self.dfa.adjacency())
+
+    def test_productive(self):
+
+        self.assertEqual(self.dfa.productive([3], 'ab'), set([1,2,3,4]))
+        self.assertEqual(self.dfa.productive([3], 'b'), set([3]))
+        self.assertEqual(self.dfa.productive([2], 'a'), set([1,2,4]))
+
+    def test_trim(self):
+
+        trimmed = self.dfa.trim()
+        self.assertEqual(trimmed.states, set([1,2,3]))
+        self.assertEqual(trimmed.delta, {1 : {'a' : 2}, 2 : {'a' : 3}})
+        self.assertEqual(trimmed.finals, set([3]))
+        self.assertEqual(trimmed.sigma, self.dfa.sigma)
+
+        empty = DFA(states=set([0,1]), finals=set(), start=0,
+                    sigma=set('a'), delta={0 : {'a' : 1}}).trim()
+        self.assertEqual((empty.states, empty.delta), (set([0]), {}))
+
+    def test_random(self):
+
+        rng = random.Random(5)
+        for _ in range(20):
+            states = list(range(10, 10 + rng.randrange(1, 200)))
+            dfa = DFA(
+                states = set(states),
+                finals = set(rng.sample(states, min(3, len(states)))),
+                start  = states[0],
+                sigma  = set('abc'),
+                delta  = {}
+            )
+            for q in states:
+                for a in 'abc':
+                    if rng.random() < 0.4:
+                        dfa.delta.setdefault(q, {})[a] = rng.choice(states)
+
+            # expand every frontier with NumPy
+
+            for forwards in (True, False):
+                dfa.adjacency(forwards).FRONTIER = 0
+
+            forward = set([dfa.start])
+            stack   = [dfa.start]
+            while stack:
+                for a, r in dfa.delta.get(stack.pop(), {}).items():
+                    if a != 'c' and r not in forward:
+                        forward.add(r)
+                        stack.append(r)
+            self.assertEqual(dfa.reachable([dfa.start], 'ab'), forward)
+
+            backward = set(q for q in states
+                           if dfa.reachable([q], 'abc') & dfa.finals)
+            self.assertEqual(dfa.productive(dfa.finals, 'abc'), backward)
+
+class TestMutation(TestCase):
+
+    def setUp(self):
+
+        self.dfa = DFA(
+            states = set([0,1,2,3]),
+            finals = set([2]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {0 : {'a' : 1}, 1 : {'a' : 2}, 3 : {'a' : 2}}
+        )
+
+    def test_mutation(self):
+
+        dfa = self.dfa
+        fingerprint = dfa.fingerprint()
+        self.assertEqual(set(dfa.accessible()), set([0,1,2]))
+        self.assertEqual(set(dfa.coaccessible()), set([0,1,2,3]))
+
+        # edits outside the useful part keep the canonical form
+
+        canonical = dfa.canonical()
+        dfa.add_state(4)
+        dfa.add_transition(3, 'b', 4)
+        dfa.add_transition(4, 'c', 3)
+        self.assertIs(dfa.canonical(), canonical)
+        self.assertIn('c', dfa.sigma)
+        self.assertEqual(set(dfa.coaccessible()), set([0,1,2,3,4]))
+
+        dfa.add_transition(1, 'b', 3)
+        self.assertEqual(set(dfa.accessible()), set([0,1,2,3,4]))
+        self.assertNotEqual(dfa.fingerprint(), fingerprint)
+        self.assertEqual(dfa.reachable([0], 'ab'), set([0,1,2,3,4]))
+        self.assertEqual(dfa.productive([3], 'a'), set([3]))
+
+        self.assertEqual(dfa.remove_transition(1, 'b'), 3)
+        self.assertEqual(set(dfa.accessible()), set([0,1,2]))
+        self.assertEqual(dfa.fingerprint(), fingerprint)
+
+        dfa.set_final(2, False)
+        self.assertEqual(set(dfa.coaccessible()), set())
+        self.assertEqual(dfa.trim().states, set([0]))
+        dfa.set_final(1)
+        self.assertEqual(set(dfa.coaccessible()), set([0,1]))
+
+        with self.assertRaises(ValueError):
+            dfa.remove_transition(2, 'a')
+        with self.assertRaises(ValueError):
+            dfa.add_transition(0, 'a', 9)
+
+    def test_random(self):
+
+        rng = random.Random(8)
+        for _ in range(50):
+            states = list(range(rng.randrange(1, 10)))
+            dfa = DFA(
+                states = set(states),
+                finals = set(q for q in states if rng.random() < 0.3),
+                start  = 0,
+                sigma  = set('ab'),
+                delta  = {}
+            )
+            dfa.fingerprint()
+            for _ in range(20):
+                choice = rng.random()
+                if choice < 0.5:
+                    dfa.add_transition(rng.choice(states), rng.choice('ab'),
+                                       rng.choice(states))
+                elif choice < 0.8 and dfa.delta:
+                    q = rng.choice(list(dfa.delta))
+                    dfa.remove_transition(q, rng.choice(list(dfa.delta[q])))
+                else:
+                    dfa.set_final(rng.choice(states), rng.random() < 0.5)
+
+                fresh = DFA(
+                    states = set(dfa.states),
+                    finals = set(dfa.finals),
+                    start  = dfa.start,
+                    sigma  = set(dfa.sigma),
+                    delta  = {q : dict(m) for q, m in dfa.delta.items()}
+                )
+                self.assertEqual(set(dfa.accessible()),
+                                 fresh.reachable([0], 'ab'))
+                self.assertEqual(set(dfa.coaccessible()),
+                                 fresh.productive(dfa.finals, 'ab'))
+                self.assertEqual(dfa.fingerprint(), fresh.fingerprint())
+
+class TestCompressAlphabet(TestCase):
+
+    def example(self, seed, num_states=12):
+
+        # symbols 0-63 act like their residues modulo 4 (except symbol 5)
+
+        rng   = random.Random(seed)
+        delta = {}
+        for q in range(num_states):
+            rows = [rng.randrange(num_states) if rng.random() < 0.8 else None
+                    for _ in range(5)]
+            delta[q] = {a : rows[4 if a == 5 else a % 4] for a in range(64)
+                        if rows[4 if a == 5 else a % 4] is not None}
+
+        return DFA(
+            states = set(range(num_states)),
+            finals = set(q for q in range(num_states) if rng.random() < 0.4),
+            start  = 0,
+            sigma  = set(range(64)),
+            delta  = delta
+        )
+
+    def test_compress(self):
+
+        dfa = self.example(0)
+        reduced, classes = dfa.compress_alphabet()
+        self.assertEqual(len(reduced.sigma), 5)
+        self.assertEqual(classes[0], classes[8])
+        self.assertNotEqual(classes[1], classes[5])
+        self.assertEqual(classes[5], 4)
+        for word in ([1, 2, 3], [5, 9, 60], [0, 0, 5, 4]):
+            self.assertEqual(dfa.run(word),
+                             reduced.run([classes[a] for a in word]))
+
+        expanded = reduced.expand_alphabet(classes)
+        self.assertEqual(expanded.delta, dfa.delta)
+        self.assertEqual(expanded.sigma, dfa.sigma)
+
+    def test_algorithms(self):
+
+        for seed in range(10):
+            dfa1 = self.example(seed)
+            dfa2 = self.example(seed + 100)
+            self.assertIsNotNone(dfa1.minimize(compress=True)
+                                 .isomorphic(dfa1.minimize()))
+
+            equivalent, witness = dfa1.equivalent_hopcroft_karp(
+                dfa2, compress=True)
+            self.assertEqual(equivalent,
+                             dfa1.equivalent_hopcroft_karp(dfa2)[0])
+            if not equivalent:
+                self.assertNotEqual(dfa1.accepts(witness),
+                                    dfa2.accepts(witness))
+            self.assertTrue(dfa1.equivalent_hopcroft_karp(
+                dfa1.minimize(), compress=True)[0])
+
+            f = lambda a, b: a and not b
+            self.assertIsNotNone(dfa1.product(dfa2, f, compress=True)
+                                 .minimize()
+                                 .isomorphic(dfa1.product(dfa2, f).minimize()))
+
 if __name__ == '__main__':
     
     unittest.main()
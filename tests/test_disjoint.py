@@ -0,0 +1,85 @@
+import numpy as np
+from pyform.automaton.dfa import DFA
+from pyform.common.disjoint import DisjointSet
+from pyform.common.disjoint import IntDisjointSet
+from unittest import TestCase
+
+def classes(partition):
+
+    return sorted(sorted(equiv) for equiv in partition.values())
+
+class TestIntDisjointSet(TestCase):
+
+    def setUp(self):
+
+        rng = np.random.default_rng(3)
+        self.pairs = rng.integers(200, size=(150, 2))
+
+    def test_union_find(self):
+
+        equiv = IntDisjointSet(200)
+        other = DisjointSet(range(200))
+        for i, j in self.pairs.tolist():
+            self.assertEqual(equiv.find(equiv.union(i, j)), equiv.find(j))
+            other.union(i, j)
+
+        self.assertEqual(equiv.num_equiv, other.num_equiv)
+        self.assertEqual(classes(equiv.partition()),
+                         classes(other.partition()))
+
+    def test_bulk(self):
+
+        equiv = IntDisjointSet(200)
+        other = IntDisjointSet(200)
+        for i, j in self.pairs.tolist():
+            other.union(i, j)
+
+        merged = equiv.union_many(self.pairs)
+        self.assertEqual(merged, 200 - other.num_equiv)
+        self.assertEqual(equiv.num_equiv, other.num_equiv)
+        self.assertEqual(classes(equiv.partition()),
+                         classes(other.partition()))
+
+        items = np.arange(200)
+        roots = equiv.find_many(items)
+        self.assertEqual(roots.tolist(), [equiv.find(i) for i in range(200)])
+        self.assertEqual(equiv.union_many([(0, 1), (1, 0)]),
+                         int(roots[0] != roots[1]))
+        self.assertEqual(equiv.union_many([]), 0)
+
+    def test_bulk_chain(self):
+
+        # pairs (i, i + 1) link every representative to its predecessor in
+        # one round
+
+        n     = 100000
+        items = np.arange(n)
+        for pairs in (np.stack([items[:-1], items[1:]], axis=1),
+                      np.stack([items[1:], items[:-1]], axis=1)[::-1]):
+            equiv = IntDisjointSet(n)
+            self.assertEqual(equiv.union_many(pairs), n - 1)
+            self.assertEqual(equiv.num_equiv, 1)
+            self.assertEqual(equiv.parent_view.tolist(), [0] * n)
+            self.assertEqual(equiv.find_many(items).tolist(), [0] * n)
+
+        equiv = IntDisjointSet(10)
+        for i in range(9):
+            equiv.parent[i + 1] = i
+        equiv.compress()
+        self.assertEqual(equiv.parent_view.tolist(), [0] * 10)
+
+    def test_sparse_states(self):
+
+        # equivalence of automata with sparse and negative states is decided
+        # on renumbered states
+
+        for states in ([-5, 0], [0, 10 ** 9]):
+            dfa = DFA(
+                states = set(states),
+                finals = set(states[1:]),
+                start  = states[0],
+                sigma  = set('a'),
+                delta  = {states[0] : {'a' : states[1]}}
+            )
+            self.assertEqual(dfa.equivalent_hopcroft_karp(
+                dfa.minimize_hopcroft()), (True, None))
@@ -0,0 +1,115 @@
+import io
+import os
+import tempfile
+from itertools import product
+from pyform.automaton.dfa import DFA
+from pyform.automaton.lazy import LazyDFA
+from pyform.automaton.nfa import NFA
+from pyform.automaton.stream import DEAD
+from pyform.bench.generators import nth_from_end
+from unittest import TestCase
+
+class TestLazyDFA(TestCase):
+
+    def setUp(self):
+
+        self.nfa   = nth_from_end(4)
+        self.dfa   = self.nfa.determinize()
+        self.words = [
+            word for n in range(9) for word in product('ab', repeat=n)
+        ]
+
+    def test_accepts(self):
+
+        for eviction in ('flush', 'lru'):
+            for capacity in (1, 3, 1 << 12):
+                lazy = LazyDFA.from_nfa(self.nfa, capacity, eviction)
+                self.assertEqual(list(lazy.accepts_many(self.words)),
+                                 list(self.dfa.accepts_many(self.words)))
+                self.assertLessEqual(len(lazy.cache), capacity)
+                self.assertFalse(lazy.accepts('abbbc'))
+                self.assertIsNone(lazy.run('c'))
+
+    def test_counters(self):
+
+        lazy = LazyDFA.from_nfa(self.nfa)
+        lazy.run_many(self.words)
+        self.assertEqual(len(lazy.cache), 16)
+        self.assertEqual(lazy.misses, 32)
+        self.assertEqual(lazy.evictions, 0)
+
+        misses = lazy.misses
+        lazy.run_many(self.words)
+        self.assertEqual(lazy.misses, misses)
+        self.assertGreater(lazy.hits, 0)
+
+        lazy = LazyDFA.from_nfa(self.nfa, capacity=8, eviction='flush')
+        lazy.run_many(self.words)
+        self.assertGreater(lazy.flushes, 0)
+        self.assertEqual(lazy.evictions % 8, 0)
+
+        self.assertRaises(ValueError, LazyDFA.from_nfa, self.nfa, 8, 'fifo')
+        self.assertRaises(ValueError, LazyDFA.from_nfa, self.nfa, 0)
+
+    def test_product(self):
+
+        even = DFA(set([0,1]), set([0]), set('ab'), 0,
+                   {0 : {'a' : 1, 'b' : 0}, 1 : {'a' : 0, 'b' : 1}})
+        aab  = DFA(set([0,1,2,3]), set([3]), set('ab'), 0,
+                   {0 : {'a' : 1}, 1 : {'a' : 2}, 2 : {'b' : 3}})
+
+        for f in (lambda a, b: a and not b, lambda a, b: not a and not b):
+            lazy     = LazyDFA.from_product([even, aab], f, capacity=2,
+                                            eviction='lru')
+            expected = DFA.product_many([even, aab], f)
+            self.assertEqual(list(lazy.accepts_many(self.words)),
+                             list(expected.accepts_many(self.words)))
+
+    def test_matcher(self):
+
+        data = b'abaabbbaba' * 20
+        nfa  = nth_from_end(3, b'ab')
+        dfa  = nfa.determinize()
+        lazy = LazyDFA.from_nfa(nfa, capacity=4, eviction='lru')
+
+        matcher  = lazy.matcher()
+        expected = [i + 3 for i in range(len(data) - 2) if data[i] == 97]
+        positions = []
+        for i in range(0, len(data), 7):
+            positions.extend(matcher.matches(data[i:i + 7]))
+        self.assertEqual(positions, expected)
+        self.assertEqual(matcher.accepting, dfa.accepts(data))
+
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+        try:
+            matcher = lazy.matcher()
+            self.assertEqual(matcher.scan(f.name, limit=50),
+                             dfa.accepts(data[:50]))
+            state, offset = matcher.snapshot()
+            resumed = lazy.matcher(state, offset)
+            self.assertEqual(list(resumed.finditer(f.name, chunk_size=9)),
+                             [p for p in expected if p > 50])
+        finally:
+            os.unlink(f.name)
+
+    def test_resume_dead_state(self):
+
+        # words starting with abc
+
+        nfa = NFA(set([0,1,2,3]), set([3]), set('abcz'), 0, {
+            0 : {'a' : set([1])}, 1 : {'b' : set([2])}, 2 : {'c' : set([3])},
+            3 : {a : set([3]) for a in 'abcz'}
+        })
+        lazy = LazyDFA.from_nfa(nfa)
+
+        matcher = lazy.matcher()
+        matcher.feed('abz')
+        state, offset = matcher.snapshot()
+        self.assertIs(state, DEAD)
+
+        resumed = lazy.matcher(state, offset)
+        self.assertIsNone(resumed.feed('abc'))
+        self.assertFalse(resumed.accepting)
+        self.assertEqual(resumed.offset, 6)
+        self.assertFalse(lazy.matcher().scan(io.StringIO('abzabc')))
@@ -0,0 +1,144 @@
+import random
+from itertools import product
+from pyform.automaton.nfa import NFA
+from pyform.bench import generators
+from pyform.bench.generators import nth_from_end
+from unittest import TestCase
+
+class TestNFA(TestCase):
+
+    def setUp(self):
+
+        # (ab)* a? with epsilon transitions, including an epsilon cycle
+
+        self.nfa = NFA(
+            states = set([0,1,2,3]),
+            finals = set([3]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {
+                0 : {None : set([3]), 'a' : set([1])},
+                1 : {'b' : set([2]), None : set([3])},
+                2 : {None : set([0])},
+                3 : {None : set([2])}
+            }
+        )
+
+    def test_closures(self):
+
+        names, closures = self.nfa.closures()
+        self.assertEqual(names, [0,1,2,3])
+        self.assertEqual(closures, [0b1101, 0b1111, 0b1101, 0b1101])
+
+    def test_accepts(self):
+
+        nfa = nth_from_end(3)
+        self.assertTrue(nfa.accepts('abb'))
+        self.assertTrue(nfa.accepts('baabb'))
+        self.assertFalse(nfa.accepts('ab'))
+        self.assertFalse(nfa.accepts('bbab'))
+
+    def test_determinize(self):
+
+        for nfa in (self.nfa, nth_from_end(4)):
+            for minimize in (False, True):
+                dfa = nfa.determinize(minimize=minimize)
+                for n in range(7):
+                    for word in product('ab', repeat=n):
+                        self.assertEqual(dfa.accepts(word), nfa.accepts(word))
+
+    def test_determinize_blowup(self):
+
+        for n in range(1, 8):
+            dfa = nth_from_end(n).determinize()
+            self.assertEqual(len(dfa.states), 2 ** n)
+            minimal = nth_from_end(n).determinize(minimize=True)
+            self.assertEqual(len(minimal.states), 2 ** n)
+
+    def test_determinize_empty(self):
+
+        nfa = NFA(set([0,1]), set([1]), set(['a']), 0, {1 : {'a' : set([1])}})
+        dfa = nfa.determinize()
+        self.assertEqual(len(dfa.states), 1)
+        self.assertEqual(dfa.delta, {})
+        self.assertEqual(dfa.finals, set())
+
+    def test_equivalent_hkc(self):
+
+        # the language (a|ab)* of the epsilon automaton without epsilon
+        # transitions
+
+        plain = NFA(
+            states = set([0,1]),
+            finals = set([0]),
+            start  = 0,
+            sigma  = set(['a','b']),
+            delta  = {0 : {'a' : set([0,1])}, 1 : {'b' : set([0])}}
+        )
+        self.assertEqual(self.nfa.equivalent_hkc(plain), (True, None))
+        self.assertEqual(nth_from_end(4).equivalent_hkc(nth_from_end(4)),
+                         (True, None))
+
+        equivalent, witness = nth_from_end(3).equivalent_hkc(nth_from_end(4))
+        self.assertFalse(equivalent)
+        self.assertEqual(len(witness), 3)
+        self.assertNotEqual(nth_from_end(3).accepts(witness),
+                            nth_from_end(4).accepts(witness))
+
+        # the symbol c only occurs in the argument automaton
+
+        other = NFA(set([0,1]), set([0]), set(['a','b','c']), 0,
+                    {0 : {'a' : set([0,1]), 'c' : set([0])},
+                     1 : {'b' : set([0])}})
+        self.assertEqual(plain.equivalent_hkc(other), (False, ['c']))
+
+    def test_includes_antichain(self):
+
+        ab = NFA(set([0,1,2]), set([2]), set(['a','b']), 0,
+                 {0 : {'a' : set([1])}, 1 : {'b' : set([2])}})
+        self.assertEqual(self.nfa.includes_antichain(ab), (True, None))
+        self.assertEqual(ab.includes_antichain(self.nfa), (False, []))
+        self.assertEqual(nth_from_end(2).includes_antichain(nth_from_end(2)),
+                         (True, None))
+
+        included, witness = nth_from_end(2).includes_antichain(nth_from_end(3))
+        self.assertFalse(included)
+        self.assertEqual(len(witness), 3)
+        self.assertTrue(nth_from_end(3).accepts(witness))
+        self.assertFalse(nth_from_end(2).accepts(witness))
+
+    def test_random_checks(self):
+
+        # compare with the determinized automata on random pairs, including
+        # pairs of an automaton and a copy with one transition removed
+
+        rng = random.Random(2)
+        for seed in range(60):
+            nfa1  = generators.random_nfa(6, 2, density=0.2, seed=seed)
+            delta = {q : {a : set(t) for a, t in row.items()}
+                     for q, row in nfa1.delta.items()}
+            q, a, r = rng.choice(sorted(nfa1.iterate()))
+            delta[q][a].discard(r)
+            nfa2  = NFA(set(nfa1.states), set(nfa1.finals), set(nfa1.sigma),
+                        0, delta)
+
+            dfa1 = nfa1.determinize()
+            dfa2 = nfa2.determinize()
+
+            equivalent, witness = nfa1.equivalent_hkc(nfa2)
+            expected = dfa1.equivalent_hopcroft_karp(dfa2)
+            self.assertEqual(equivalent, expected[0])
+            if not equivalent:
+                self.assertEqual(len(witness), len(expected[1]))
+                self.assertNotEqual(nfa1.accepts(witness),
+                                    nfa2.accepts(witness))
+
+            self.assertEqual(nfa1.includes_antichain(nfa2), (True, None))
+            included, witness = nfa2.includes_antichain(nfa1)
+            found, expected = dfa2.product_check(
+                dfa1, lambda a, b: b and not a)
+            self.assertEqual(included, not found)
+            if not included:
+                self.assertEqual(len(witness), len(expected))
+                self.assertTrue(nfa1.accepts(witness))
+                self.assertFalse(nfa2.accepts(witness))
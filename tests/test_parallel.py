@@ -0,0 +1,56 @@
+import os
+import random
+import tempfile
+from pyform.automaton.dfa import DFA
+from unittest import TestCase
+
+class TestRunParallel(TestCase):
+
+    def setUp(self):
+
+        rng = random.Random(7)
+        self.dfa = DFA(
+            states = set(range(20)),
+            finals = set(range(0, 20, 3)),
+            start  = 4,
+            sigma  = set(range(256)),
+            delta  = {
+                q : {a : rng.randrange(20) for a in range(256)}
+                for q in range(20)
+            }
+        )
+        self.data = bytes(rng.randrange(256) for _ in range(5000))
+
+    def test_run_parallel(self):
+
+        expected = self.dfa.run(self.data)
+        for chunk_size in (1, 333, 5000, None):
+            self.assertEqual(
+                self.dfa.run_parallel(self.data, workers=1,
+                                      chunk_size=chunk_size),
+                expected)
+        self.assertEqual(
+            self.dfa.run_parallel(self.data, workers=2), expected)
+
+    def test_run_parallel_partial(self):
+
+        del self.dfa.delta[3][17]
+        data = [17, 17, 17] * 1000 + [3]
+        self.assertEqual(self.dfa.run_parallel(data, workers=1,
+                                               chunk_size=100),
+                         self.dfa.run(data))
+        self.assertIsNone(self.dfa.run_parallel(data + [999], workers=1))
+
+    def test_scan_parallel(self):
+
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(self.data)
+        try:
+            expected = self.dfa.run(self.data)
+            self.assertEqual(
+                self.dfa.scan_parallel(f.name, workers=1, chunk_size=777),
+                expected)
+            self.assertEqual(
+                self.dfa.scan_parallel(f.name, workers=3), expected)
+        finally:
+            os.unlink(f.name)
@@ -0,0 +1,43 @@
+import numpy as np
+from pyform.common.partition import Partition
+from pyform.common.partition import shared_buffers
+from pyform.common.partition import typecode
+from pyform.common.partition import view
+from unittest import TestCase
+
+class TestPartition(TestCase):
+
+    def test_layout(self):
+
+        partition = Partition(10, key=lambda e: e % 3)
+        self.assertFalse(hasattr(partition, '__dict__'))
+        self.assertEqual(partition.elements.typecode, 'i')
+        self.assertEqual(typecode(2 ** 40), 'q')
+        self.assertEqual(view(partition.setof).dtype, np.int32)
+        self.assertEqual(sorted(map(sorted, partition.partitions())),
+                         [[0, 3, 6, 9], [1, 4, 7], [2, 5, 8]])
+
+    def test_shared_buffers(self):
+
+        buffers = shared_buffers(12)
+        blocks  = Partition(6, None, buffers)
+        cords   = Partition.from_keys(np.arange(12) % 2, buffers)
+        self.assertIs(blocks.marked, cords.marked)
+        self.assertIs(blocks.touched, cords.touched)
+
+        # splits leave the shared buffers empty for the other partition
+
+        for element in (1, 2, 3):
+            blocks.mark(element)
+        blocks.split()
+        cords.mark_many(np.array([0, 2, 5]))
+        self.assertEqual(cords.split_many(), 2)
+        for element in (4, 5):
+            blocks.mark(element)
+        blocks.split()
+
+        self.assertEqual(sorted(map(sorted, blocks.partitions())),
+                         [[0], [1, 2, 3], [4, 5]])
+        self.assertEqual(sorted(map(sorted, cords.partitions())),
+                         [[0, 2], [1, 3, 7, 9, 11], [4, 6, 8, 10], [5]])
+        self.assertFalse(any(blocks.marked))
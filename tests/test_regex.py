@@ -0,0 +1,68 @@
+import re
+from itertools import product
+from pyform import regex
+from unittest import TestCase
+
+class TestRegex(TestCase):
+
+    def assertMatches(self, pattern, alphabet, length=5):
+
+        dfa = regex.compile(pattern, alphabet)
+        for n in range(length + 1):
+            for word in product(sorted(alphabet), repeat=n):
+                word = ''.join(word)
+                self.assertEqual(
+                    dfa.accepts(word),
+                    re.fullmatch(pattern, word) is not None,
+                    (pattern, word)
+                )
+
+    def test_compile(self):
+
+        patterns = [
+            '', 'a', 'ab|c', '(ab)*', 'a+b?', 'a*b*c*', '(a|b)*abb',
+            '.*a.{2}', '[a-b]c', '[^a]*', 'a{2}', 'a{1,}b', '(ab|c){0,2}',
+            '(a|)b', '[]a]|\\.', '\\d\\w', 'a|b|c+|(a*c)*', '((a))*',
+        ]
+        for pattern in patterns:
+            self.assertMatches(pattern, 'abc.]1')
+
+    def test_minimal(self):
+
+        # words whose third symbol from the end is a have 8 states
+
+        dfa = regex.compile('[ab]*a[ab][ab]')
+        self.assertEqual(len(dfa.states), 8)
+        self.assertEqual(dfa.sigma, set('ab'))
+        self.assertEqual(
+            dfa.fingerprint(),
+            regex.compile('(a|b)*a(a|b){2}', 'ab').fingerprint()
+        )
+
+    def test_cache(self):
+
+        regex.cache_clear()
+        dfa = regex.compile('(ab)*', 'ab')
+        self.assertEqual(regex.compile('(ab)*', ['b', 'a']).fingerprint(),
+                         dfa.fingerprint())
+        self.assertFalse(regex.compile('(ab)*', 'abc').accepts('c'))
+        self.assertEqual(regex.cache_info().hits, 1)
+
+        # modifying a compiled automaton does not modify the cached one
+
+        dfa.set_final(dfa.start, False)
+        dfa.add_transition(dfa.start, 'b', dfa.start)
+        self.assertFalse(dfa.accepts(''))
+        other = regex.compile('(ab)*', 'ab')
+        self.assertIsNot(other, dfa)
+        self.assertTrue(other.accepts(''))
+        self.assertFalse(other.accepts('b'))
+        self.assertTrue(other.accepts('abab'))
+        self.assertEqual(regex.cache_info().hits, 2)
+
+    def test_errors(self):
+
+        for pattern in ('(a', 'a)', '*', '[a', 'a{2,1}', '[z-a]', '\\q'):
+            self.assertRaises(ValueError, regex.compile, pattern, 'az')
+        self.assertRaises(ValueError, regex.compile, '.')
+        self.assertRaises(ValueError, regex.compile, '[^a]')
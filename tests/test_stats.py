@@ -0,0 +1,70 @@
+from pyform.bench.generators import chain
+from pyform.bench.generators import random_partial
+from pyform.common.stats import Stats
+from unittest import TestCase
+
+PHASES = ['reachability', 'co-reachability', 'partitioning', 'refinement',
+          'reconstruction']
+
+class TestStats(TestCase):
+
+    def test_minimize_valmari(self):
+
+        dfa = random_partial(300, 3, density=0.7, seed=2)
+        for engine in ('python', 'numpy'):
+            stats   = Stats()
+            minimal = dfa.minimize_valmari(engine=engine, stats=stats)
+            self.assertEqual(minimal.delta,
+                             dfa.minimize_valmari(engine=engine).delta)
+
+            self.assertEqual(sorted(stats.phases), sorted(PHASES))
+            self.assertTrue(all(t >= 0 for t in stats.phases.values()))
+
+            # every block except the initial ones (final and nonfinal states
+            # in the numpy engine) is created by a split
+
+            initial = 1 if engine == 'python' else 2
+            self.assertEqual(stats.counters['blocks_splits'],
+                             len(minimal.states) - initial)
+            self.assertGreater(stats.counters['blocks_marks'], 0)
+            self.assertGreater(stats.counters['cords_marks'], 0)
+            self.assertEqual(stats.peaks['blocks'], 300)
+            self.assertEqual(stats.peaks['transitions'],
+                             sum(map(len, dfa.delta.values())))
+
+    def test_hopcroft_karp(self):
+
+        dfa    = chain(20)
+        stats  = Stats()
+        result = dfa.equivalent_hopcroft_karp(dfa.minimize_valmari(), stats)
+        self.assertEqual(result, (True, None))
+
+        # the pairs of equal states of the chain and the pair of dummy states
+        # are merged once each
+
+        self.assertEqual(stats.counters['unions'], 21)
+        self.assertEqual(stats.counters['finds'], 2 * stats.counters['pairs']
+                                                  + 2 * 21)
+        self.assertEqual(stats.peaks['disjoint_set'], 42)
+        self.assertEqual(list(stats.phases), ['search'])
+
+        other = chain(21)
+        stats = Stats()
+        self.assertFalse(dfa.equivalent_hopcroft_karp(other, stats)[0])
+        self.assertIn('disjoint_set', stats.peaks)
+
+    def test_callback(self):
+
+        reports = []
+        stats   = Stats(callback=reports.append)
+        dfa     = chain(10)
+
+        dfa.minimize_valmari(stats=stats)
+        dfa.minimize_valmari(stats=stats)
+        self.assertEqual(reports, [stats, stats])
+        self.assertEqual(stats.counters['blocks_splits'], 18)
+
+        report = stats.as_dict()
+        self.assertEqual(sorted(report), ['counters', 'peaks', 'phases'])
+        report['counters'].clear()
+        self.assertTrue(stats.counters)
@@ -0,0 +1,96 @@
+import os
+import random
+import tempfile
+from pyform.automaton.dfa import DFA
+from pyform.automaton.storage import MappedDFA
+from unittest import TestCase
+
+class TestStorage(TestCase):
+
+    def setUp(self):
+
+        rng = random.Random(0)
+        self.dfa = DFA(
+            states = set(range(10, 60)),
+            finals = set(q for q in range(10, 60) if rng.random() < 0.3),
+            start  = 12,
+            sigma  = set(['a', 'b', 0, -3, 1 << 70, b'x', True]),
+            delta  = {}
+        )
+        for q in range(10, 60):
+            for a in self.dfa.sigma:
+                if rng.random() < 0.6:
+                    self.dfa.delta.setdefault(q, {})[a] = rng.randrange(10, 60)
+
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+
+        os.unlink(self.path)
+
+    def test_roundtrip(self):
+
+        self.dfa.save(self.path)
+        for mmap in (True, False):
+            loaded = DFA.load(self.path, mmap=mmap)
+            self.assertIsInstance(loaded, MappedDFA)
+
+            dfa = loaded.to_dfa()
+            self.assertEqual(dfa.states, self.dfa.states)
+            self.assertEqual(dfa.finals, self.dfa.finals)
+            self.assertEqual(dfa.start, self.dfa.start)
+            self.assertEqual(dfa.sigma, self.dfa.sigma)
+            self.assertEqual(dfa.delta, self.dfa.delta)
+            self.assertEqual(loaded.fingerprint(), self.dfa.fingerprint())
+            del dfa, loaded
+
+    def test_views(self):
+
+        self.dfa.save(self.path)
+        loaded = DFA.load(self.path)
+        ids    = {q : i for i, q in enumerate(loaded.names.tolist())}
+
+        for q in self.dfa.states:
+            self.assertEqual(ids[q] in loaded.finals, q in self.dfa.finals)
+            row = self.dfa.delta.get(q, {})
+            self.assertEqual(ids[q] in loaded.delta, bool(row))
+            if row:
+                self.assertEqual(dict(loaded.delta[ids[q]].items()),
+                                 {a : ids[r] for a, r in row.items()})
+                for a in self.dfa.sigma:
+                    self.assertEqual(loaded.step(ids[q], a),
+                                     ids.get(row.get(a)))
+
+        self.assertEqual(len(loaded.finals), len(self.dfa.finals))
+        self.assertIsNone(loaded.step(0, 'missing'))
+        self.assertFalse(loaded.labels.flags.writeable)
+
+    def test_run(self):
+
+        self.dfa.save(self.path)
+        loaded = DFA.load(self.path)
+        names  = loaded.names.tolist()
+        rng    = random.Random(1)
+        sigma  = sorted(self.dfa.sigma, key=repr)
+        words  = [[rng.choice(sigma) for _ in range(rng.randrange(6))]
+                  for _ in range(200)]
+
+        for word in words:
+            state = loaded.run(word)
+            self.assertEqual(None if state is None else names[state],
+                             self.dfa.run(word))
+        self.assertEqual(loaded.accepts_many(words).tolist(),
+                         [self.dfa.accepts(word) for word in words])
+        self.assertEqual(loaded.minimize().fingerprint(),
+                         self.dfa.fingerprint())
+        del loaded
+
+    def test_errors(self):
+
+        with open(self.path, 'wb') as f:
+            f.write(b'\0' * 256)
+        self.assertRaises(ValueError, DFA.load, self.path, False)
+
+        dfa = DFA(set([0]), set(), set([(1, 2)]), 0, {0 : {(1, 2) : 0}})
+        self.assertRaises(ValueError, dfa.save, self.path)
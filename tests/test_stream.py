@@ -0,0 +1,121 @@
+import io
+import os
+import pickle
+import tempfile
+from pyform.automaton.dfa import DFA
+from pyform.automaton.stream import DEAD
+from pyform.automaton.stream import StreamMatcher
+from unittest import TestCase
+
+def ending_with(suffix, sigma):
+
+    """DFA accepting words over sigma ending with suffix (KMP automaton)."""
+
+    delta = {}
+    for q in range(len(suffix) + 1):
+        delta[q] = {}
+        for a in sigma:
+            word = suffix[:q] + [a]
+            k = min(len(word), len(suffix))
+            while word[len(word) - k:] != suffix[:k]:
+                k -= 1
+            delta[q][a] = k
+
+    return DFA(
+        states = set(range(len(suffix) + 1)),
+        finals = set([len(suffix)]),
+        start  = 0,
+        sigma  = set(sigma),
+        delta  = delta
+    )
+
+class TestStreamMatcher(TestCase):
+
+    def setUp(self):
+
+        self.data = b'xxabcabcxabcab' * 50
+        self.dfa  = ending_with(list(b'abc'), list(b'abcx'))
+        self.expected = [
+            i + 3 for i in range(len(self.data))
+            if self.data[i:i + 3] == b'abc'
+        ]
+
+    def test_feed_chunks(self):
+
+        matcher = StreamMatcher(self.dfa)
+        positions = []
+        for i in range(0, len(self.data), 7):
+            positions.extend(matcher.matches(self.data[i:i + 7]))
+
+        self.assertEqual(positions, self.expected)
+        self.assertEqual(matcher.offset, len(self.data))
+        self.assertEqual(
+            StreamMatcher(self.dfa).feed(self.data), self.dfa.run(self.data))
+
+    def test_scan_path_and_resume(self):
+
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(self.data)
+        try:
+            matcher = StreamMatcher(self.dfa)
+            self.assertEqual(list(matcher.finditer(f.name, chunk_size=5)),
+                             self.expected)
+
+            first = StreamMatcher(self.dfa)
+            first.scan(f.name, chunk_size=16, limit=100)
+            state, offset = first.snapshot()
+            self.assertEqual(offset, 100)
+
+            second = StreamMatcher(self.dfa, state, offset)
+            positions = list(second.finditer(f.name, chunk_size=16))
+            self.assertEqual(positions, [p for p in self.expected if p > 100])
+            self.assertEqual(second.state, self.dfa.run(self.data))
+        finally:
+            os.unlink(f.name)
+
+    def test_file_objects(self):
+
+        matcher = StreamMatcher(self.dfa)
+        self.assertEqual(list(matcher.finditer(io.BytesIO(self.data), 8)),
+                         self.expected)
+
+        dfa = ending_with(list('abc'), list('abcx'))
+        matcher = StreamMatcher(dfa)
+        text = io.StringIO(self.data.decode())
+        self.assertEqual(list(matcher.finditer(text, 8)), self.expected)
+
+    def test_dead_state(self):
+
+        matcher = StreamMatcher(self.dfa)
+        self.assertIsNone(matcher.feed(b'abz'))
+        self.assertEqual(matcher.matches(b'abc'), [])
+        self.assertEqual(matcher.offset, 6)
+        self.assertFalse(matcher.accepting)
+
+    def test_resume_dead_state(self):
+
+        # words starting with abc
+
+        dfa = DFA(
+            states = set([0,1,2,3]),
+            finals = set([3]),
+            start  = 0,
+            sigma  = set(b'abcz'),
+            delta  = {0 : {97 : 1}, 1 : {98 : 2}, 2 : {99 : 3},
+                      3 : {a : 3 for a in b'abcz'}}
+        )
+
+        matcher = StreamMatcher(dfa)
+        matcher.feed(b'abz')
+        snapshot = matcher.snapshot()
+        self.assertEqual(snapshot, (DEAD, 3))
+        self.assertIs(pickle.loads(pickle.dumps(snapshot))[0], DEAD)
+
+        resumed = StreamMatcher(dfa, *snapshot)
+        self.assertIsNone(resumed.feed(b'abc'))
+        self.assertFalse(resumed.accepting)
+        self.assertEqual(resumed.offset, 6)
+
+        resumed.reset()
+        self.assertEqual(resumed.feed(b'abc'), 3)
+        self.assertTrue(resumed.accepting)
@@ -0,0 +1,130 @@
+import random
+from pyform.automaton.dfa import DFA
+from pyform.automaton.symbolic import RangeDFA
+from pyform.automaton.symbolic import boundaries
+from unittest import TestCase
+
+def identifiers():
+
+    # identifiers of ASCII letters, digits and CJK ideographs; states 1 and 2
+    # are equivalent
+
+    letters = [(65, 90, 1), (95, 95, 2), (97, 122, 1), (0x4e00, 0x9fff, 2)]
+    digits  = [(48, 57, 2)]
+
+    return RangeDFA(
+        states = set([0,1,2]),
+        finals = set([1,2]),
+        start  = 0,
+        delta  = {
+            0 : letters,
+            1 : digits[:1] + letters,
+            2 : [(48, 57, 1)] + [(lo, hi, 1) for lo, hi, r in letters]
+        }
+    )
+
+def random_range_dfa(rng, num_states=6, limit=300):
+
+    delta = {}
+    for q in range(num_states):
+        cuts = sorted(rng.sample(range(limit), 6))
+        delta[q] = [(lo, hi, rng.randrange(num_states))
+                    for lo, hi in zip(cuts[::2], cuts[1::2])
+                    if rng.random() < 0.8]
+
+    return RangeDFA(
+        states = set(range(num_states)),
+        finals = set(q for q in range(num_states) if rng.random() < 0.5),
+        start  = 0,
+        delta  = delta
+    )
+
+class TestRangeDFA(TestCase):
+
+    def test_run(self):
+
+        dfa = identifiers()
+        dfa.validate()
+        self.assertTrue(dfa.accepts('x'))
+        self.assertTrue(dfa.accepts('_tmp42'))
+        self.assertTrue(dfa.accepts('字符a1'))
+        self.assertFalse(dfa.accepts('1x'))
+        self.assertFalse(dfa.accepts('a\U0001f600'))
+        self.assertFalse(dfa.accepts(''))
+        self.assertEqual(dfa.run([97, 0x4e00]), 2)
+        self.assertEqual(dfa.step(0, 0x9fff), 2)
+        self.assertIsNone(dfa.step(0, 0xa000))
+
+    def test_validate(self):
+
+        dfa = RangeDFA(set([0]), set(), 0, {0 : [(5, 9, 0), (9, 12, 0)]})
+        with self.assertRaises(ValueError):
+            dfa.validate()
+        dfa = RangeDFA(set([0]), set(), 0, {0 : [(5, 9, 1)]})
+        with self.assertRaises(ValueError):
+            dfa.validate()
+
+    def test_minimize(self):
+
+        dfa     = identifiers()
+        minimal = dfa.minimize()
+        self.assertEqual(len(minimal.states), 2)
+        self.assertTrue(dfa.equivalent(minimal)[0])
+        self.assertEqual(max(len(row) for row in minimal.delta.values()), 5)
+        self.assertEqual(boundaries([minimal])[:3], [0, 48, 58])
+
+    def test_product(self):
+
+        dfa   = identifiers()
+        lower = RangeDFA(set([0]), set([0]), 0, {0 : [(97, 122, 0)]})
+
+        both = dfa.product(lower, lambda a, b: a and b)
+        self.assertTrue(both.accepts('abc'))
+        self.assertFalse(both.accepts('aBc'))
+        self.assertFalse(both.accepts(''))
+
+        neither = dfa.product(lower, lambda a, b: not a and not b)
+        self.assertTrue(neither.accepts('1'))
+        self.assertTrue(neither.accepts('\U0001f600'))
+        self.assertFalse(neither.accepts('字'))
+
+        equivalent, witness = dfa.equivalent(both)
+        self.assertFalse(equivalent)
+        self.assertNotEqual(dfa.accepts(witness), both.accepts(witness))
+
+    def test_random(self):
+
+        rng = random.Random(5)
+        for _ in range(30):
+            dfa1 = random_range_dfa(rng)
+            dfa2 = random_range_dfa(rng)
+            f    = lambda a, b: a != b
+            expected = dfa1.to_dfa().product(dfa2.to_dfa(), f).minimize()
+            product  = dfa1.product(dfa2, f).minimize()
+
+            for _ in range(50):
+                word = [rng.randrange(310) for _ in range(rng.randrange(4))]
+                self.assertEqual(dfa1.accepts(word),
+                                 dfa1.to_dfa().accepts(word))
+                self.assertEqual(product.accepts(word),
+                                 dfa1.accepts(word) != dfa2.accepts(word))
+
+            self.assertEqual(dfa1.equivalent(dfa2)[0],
+                             product.to_dfa().is_empty()[0])
+            self.assertLessEqual(len(product.states), len(expected.states) + 1)
+
+    def test_round_trip(self):
+
+        dfa = DFA(
+            states = set([0,1]),
+            finals = set([1]),
+            start  = 0,
+            sigma  = set('abcxyz'),
+            delta  = {0 : {'a' : 1, 'b' : 1, 'c' : 1, 'x' : 0, 'z' : 1}}
+        )
+
+        ranges = RangeDFA.from_dfa(dfa, ord)
+        self.assertEqual(ranges.delta[0], [(97, 99, 1), (120, 120, 0),
+                                           (122, 122, 1)])
+        self.assertEqual(ranges.to_dfa(chr).delta, dfa.delta)
+        self.assertTrue(ranges.accepts('xxb'))